@@ -0,0 +1,69 @@
+"""页面指纹性能对比：原BeautifulSoup+MD5实现 与 lxml+blake2b指纹引擎
+
+用法: python benchmarks/bench_fingerprint.py [--iterations 200] [--dir page_source]
+"""
+import os
+import re
+import sys
+import glob
+import time
+import hashlib
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from utils.fingerprint import FingerprintEngine
+
+
+def legacy_content_hash(content):
+    """原WebPageValidator.calculate_content_hash的整页哈希实现"""
+    soup = BeautifulSoup(content, 'lxml')
+    for script in soup(['script', 'style']):
+        script.extract()
+    content_text = soup.get_text()
+    content_text = re.sub(r'\s+', ' ', content_text).strip()
+    return hashlib.md5(content_text.encode('utf-8')).hexdigest()
+
+
+def measure(func, content, iterations):
+    """返回单次调用的平均耗时（毫秒）"""
+    func(content)  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(content)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面指纹性能对比')
+    parser.add_argument('--iterations', type=int, default=200, help='每个页面的重复次数')
+    parser.add_argument('--dir', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'page_source'),
+                        help='HTML样例目录')
+    args = parser.parse_args()
+
+    files = sorted(glob.glob(os.path.join(args.dir, '*.html')))
+    if not files:
+        print(f"未找到HTML样例: {args.dir}")
+        return
+
+    engine = FingerprintEngine.from_settings()
+    print(f"{'页面':<50} {'大小(KB)':>9} {'原实现(ms)':>11} {'新引擎(ms)':>11} {'加速比':>7}")
+
+    total_legacy = total_engine = 0.0
+    for path in files:
+        with open(path, 'rb') as f:
+            content = f.read()
+        legacy_ms = measure(legacy_content_hash, content, args.iterations)
+        engine_ms = measure(engine.fingerprint, content, args.iterations)
+        total_legacy += legacy_ms
+        total_engine += engine_ms
+        name = os.path.basename(path)
+        print(f"{name[:50]:<50} {len(content) / 1024:>9.1f} {legacy_ms:>11.3f} {engine_ms:>11.3f} {legacy_ms / engine_ms:>6.1f}x")
+
+    print(f"{'合计':<50} {'':>9} {total_legacy:>11.3f} {total_engine:>11.3f} {total_legacy / total_engine:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
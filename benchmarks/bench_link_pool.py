@@ -0,0 +1,176 @@
+"""链接库加载耗时对比：pandas逐行(iterrows)加载 与 流式csv/json加载
+
+用法: python benchmarks/bench_link_pool.py [--sections 50000] [--repeat 3]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.link_pool_loader import LinkPoolLoader
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CHECK_INTERVAL = 300
+FREQUENCIES = ['hourly', 'daily', 'weekly', 'monthly', '3600']
+
+
+def build_pool(directory, sections):
+    """生成同样栏目的CSV和JSON链接库样例"""
+    rng = random.Random(42)
+    rows = [{
+        'name': f"栏目{i}",
+        'url': f"https://www.example{i % 200}.gov.cn/xxgk/zcfb/s{i}/",
+        'priority': rng.randint(1, 10),
+        'last_crawled': '2025-03-08 21:01:20' if i % 3 == 0 else '',
+        'frequency': rng.choice(FREQUENCIES),
+    } for i in range(sections)]
+
+    csv_path = os.path.join(directory, 'synthetic.csv')
+    with open(csv_path, 'w', encoding='utf-8') as f:
+        f.write('名称,链接,优先级,上次爬取时间,爬取频率\n')
+        for row in rows:
+            f.write(f"{row['name']},{row['url']},{row['priority']},{row['last_crawled']},{row['frequency']}\n")
+
+    json_path = os.path.join(directory, 'synthetic.json')
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({'name': '合成站点', 'sections': [
+            {'name': row['name'], 'url': row['url'], 'priority': row['priority'], 'last_crawled': row['last_crawled']}
+            for row in rows
+        ]}, f, ensure_ascii=False, indent=2)
+    return csv_path, json_path
+
+
+def legacy_csv(file_path, site_name):
+    """原PolicyMonitor.reload_site的CSV加载（去掉逐行日志）：每行重新判断列名"""
+    import pandas as pd
+    df = pd.read_csv(file_path)
+    site_data = {'name': site_name, 'sections': []}
+    for _, row in df.iterrows():
+        if 'section_name' in df.columns:
+            name_col = 'section_name'
+        elif '名称' in df.columns:
+            name_col = '名称'
+        else:
+            name_col = df.columns[0]
+        if 'url' in df.columns:
+            url_col = 'url'
+        elif '链接' in df.columns:
+            url_col = '链接'
+        else:
+            url_col = df.columns[1]
+        if 'priority' in df.columns:
+            priority_col = 'priority'
+        elif '优先级' in df.columns:
+            priority_col = '优先级'
+        else:
+            priority_col = None
+        if 'check_interval' in df.columns:
+            check_interval_col = 'check_interval'
+        elif '爬取频率' in df.columns:
+            check_interval_col = '爬取频率'
+        else:
+            check_interval_col = None
+
+        priority = 5
+        if priority_col and priority_col in df.columns:
+            try:
+                priority_value = row[priority_col]
+                if not pd.isna(priority_value):
+                    priority = int(float(priority_value))
+            except (ValueError, TypeError):
+                pass
+
+        check_interval = DEFAULT_CHECK_INTERVAL
+        if check_interval_col and check_interval_col in df.columns:
+            try:
+                interval_value = row[check_interval_col]
+                if not pd.isna(interval_value):
+                    if isinstance(interval_value, (int, float)):
+                        check_interval = int(interval_value)
+                    elif interval_value.lower() == 'daily':
+                        check_interval = 86400
+                    elif interval_value.lower() == 'weekly':
+                        check_interval = 604800
+                    elif interval_value.lower() == 'monthly':
+                        check_interval = 2592000
+            except (ValueError, TypeError, AttributeError):
+                pass
+
+        site_data['sections'].append({
+            'name': row.get(name_col, ''),
+            'url': row.get(url_col, ''),
+            'priority': priority,
+            'next_check': datetime.now().timestamp(),
+            'check_interval': check_interval
+        })
+    return site_data
+
+
+def comparable(site_data):
+    """去掉加载时刻生成的next_check，便于对比两种实现的结果"""
+    return [{key: value for key, value in section.items() if key != 'next_check'}
+            for section in site_data['sections']]
+
+
+def measure(func, repeat):
+    """返回多次调用中的最短耗时（毫秒）"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def import_time(module):
+    """在新进程中测量导入模块的耗时（毫秒）"""
+    code = f"import time; s = time.perf_counter(); import {module}; print((time.perf_counter() - s) * 1000)"
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                            cwd=ROOT).stdout
+    return float(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='链接库加载耗时对比')
+    parser.add_argument('--sections', type=int, default=50000, help='合成链接库的栏目数')
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，取最短耗时')
+    args = parser.parse_args()
+
+    loader = LinkPoolLoader(DEFAULT_CHECK_INTERVAL)
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path, json_path = build_pool(directory, args.sections)
+
+        # 'hourly'等未识别的频率使用默认间隔；pandas把混合列读成字符串，'3600'也退回默认间隔，
+        # 流式加载按秒数解析，只在这一点上结果不同
+        legacy = comparable(legacy_csv(csv_path, 'synthetic'))
+        streamed = comparable(loader.load(csv_path, 'synthetic'))
+        differing = [i for i, (a, b) in enumerate(zip(legacy, streamed)) if a != b]
+        assert len(legacy) == len(streamed) == args.sections
+        assert all(streamed[i]['check_interval'] == 3600 and legacy[i]['check_interval'] == DEFAULT_CHECK_INTERVAL
+                   for i in differing), '加载结果不一致'
+
+        print(f"合成链接库: {args.sections} 个栏目 (CSV {os.path.getsize(csv_path) / 1024:.0f}KB, "
+              f"JSON {os.path.getsize(json_path) / 1024:.0f}KB)")
+        legacy_ms = measure(lambda: legacy_csv(csv_path, 'synthetic'), args.repeat)
+        csv_ms = measure(lambda: loader.load(csv_path, 'synthetic'), args.repeat)
+        json_ms = measure(lambda: loader.load(json_path, 'synthetic'), args.repeat)
+        print(f"{'加载方式':<24} {'耗时(ms)':>10} {'栏目/秒':>12}")
+        for name, elapsed in (('CSV pandas+iterrows', legacy_ms), ('CSV 流式csv', csv_ms), ('JSON json.load', json_ms)):
+            print(f"{name:<24} {elapsed:>10.1f} {args.sections / elapsed * 1000:>12.0f}")
+        print(f"CSV加速比: {legacy_ms / csv_ms:.1f}x")
+
+    print(f"导入耗时: pandas {import_time('pandas'):.0f}ms, "
+          f"utils.link_pool_loader {import_time('utils.link_pool_loader'):.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
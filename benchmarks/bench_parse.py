@@ -0,0 +1,101 @@
+"""页面解析吞吐量对比：Scrapy HtmlResponse+XPath字符串 与 lxml文档树+预编译规则
+
+用法: python benchmarks/bench_parse.py [--iterations 200] [--items 50]
+"""
+import os
+import sys
+import time
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scrapy.http import HtmlResponse
+from spiders.base_spider import load_spider_config
+from spiders.rules import compile_rules, parse_html
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WANXIN_PAGE = os.path.join(ROOT, 'page_source', 'wanxin20.github.io_ceshi_.html')
+PERSON_FIELDS = ('name', 'age', 'position', 'department')
+
+
+def legacy_persons(body, config):
+    """原WanxinInfoSpider.parse_list：每个人员项重新查找规则并由Selector解析"""
+    response = HtmlResponse(url='https://wanxin20.github.io/ceshi/', body=body, encoding='utf-8')
+    results = []
+    for person in response.xpath(config['list_rules']['person_items']):
+        detail_rules = config['detail_rules']
+        results.append({field: person.xpath(detail_rules[field]).get('').strip() for field in PERSON_FIELDS})
+    return results
+
+
+def compiled_persons(body, rules):
+    """预编译规则直接作用于lxml文档树"""
+    tree = parse_html(body)
+    return [{field: rules.detail.first(field, person) for field in PERSON_FIELDS}
+            for person in rules.list.all('person_items', tree)]
+
+
+def legacy_links(body, config):
+    """原NdrcGovSpider.parse_list的链接提取"""
+    response = HtmlResponse(url='https://www.ndrc.gov.cn/xxgk/zcfb/ghxwj/', body=body, encoding='utf-8')
+    links = response.xpath(config['list_rules']['policy_links']).extract()
+    next_page = response.xpath(config['list_rules']['next_page']).extract_first()
+    return links, next_page
+
+
+def compiled_links(body, rules):
+    tree = parse_html(body)
+    return list(rules.list.all('policy_links', tree)), rules.list.first('next_page', tree, None)
+
+
+def build_list_page(items):
+    """生成发改委政策列表页样例"""
+    rows = ''.join(f'<li><a href="./202401/t2024010{i}_{i}.html">关于政策文件{i}的通知</a><span>2024-01-01</span></li>'
+                   for i in range(items))
+    return (f'<html><head><meta charset="utf-8"><title>规划文本</title></head><body>'
+            f'<div class="nav">首页 &gt; 政策</div><ul class="u-list">{rows}</ul>'
+            f'<a class="next-page" href="index_1.html">下一页</a></body></html>').encode('utf-8')
+
+
+def measure(func, body, rules, iterations):
+    """返回单次调用的平均耗时（毫秒）"""
+    func(body, rules)  # 预热
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(body, rules)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='页面解析吞吐量对比')
+    parser.add_argument('--iterations', type=int, default=200, help='每个页面的重复次数')
+    parser.add_argument('--items', type=int, default=50, help='生成的列表页链接数')
+    args = parser.parse_args()
+
+    _, wanxin_config = load_spider_config(os.path.join(ROOT, 'config', 'spiders', 'wanxin_info.yaml'))
+    _, ndrc_config = load_spider_config(os.path.join(ROOT, 'config', 'spiders', 'ndrc_gov.yaml'))
+    wanxin_rules = compile_rules(wanxin_config)
+    ndrc_rules = compile_rules(ndrc_config)
+
+    with open(WANXIN_PAGE, 'rb') as f:
+        wanxin_body = f.read()
+    list_body = build_list_page(args.items)
+
+    cases = [
+        ('万信人员列表页', wanxin_body, legacy_persons, wanxin_config, compiled_persons, wanxin_rules),
+        (f'发改委列表页({args.items}条)', list_body, legacy_links, ndrc_config, compiled_links, ndrc_rules),
+    ]
+
+    print(f"{'页面':<24} {'原实现(ms)':>11} {'预编译(ms)':>11} {'原实现(页/秒)':>13} {'预编译(页/秒)':>13} {'加速比':>7}")
+    for name, body, legacy, config, compiled, rules in cases:
+        # 两种实现的解析结果必须一致
+        assert legacy(body, config) == compiled(body, rules), f"解析结果不一致: {name}"
+        legacy_ms = measure(legacy, body, config, args.iterations)
+        compiled_ms = measure(compiled, body, rules, args.iterations)
+        print(f"{name:<24} {legacy_ms:>11.3f} {compiled_ms:>11.3f} {1000 / legacy_ms:>13.0f} "
+              f"{1000 / compiled_ms:>13.0f} {legacy_ms / compiled_ms:>6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,27 +10,65 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import argparse
 from core.crawler import CrawlerEngine
-from utils.link_manager import LinkPoolManager
+from utils.link_manager import get_link_manager
+from utils.http_cache import get_http_cache
+from core.db_client import get_db_client
+from core.archiver import PolicyArchiver
+from config.settings import HTTP_CACHE_SETTINGS, STORAGE_SETTINGS
 
 def main():
     parser = argparse.ArgumentParser(description="政策爬虫控制台")
     parser.add_argument('--spider', help='通过注册名称指定爬虫')
     parser.add_argument('--url', help='直接指定目标URL')
     parser.add_argument('--site', help='指定要爬取的网站(使用链接库)')
+    parser.add_argument('--http-cache', action='store_true', help='启用磁盘HTTP缓存，重复运行时不再下载未变化的页面')
+    parser.add_argument('--archive', action='store_true', help='压缩已结束的日期目录为归档并执行保留策略')
+    parser.add_argument('--storage', choices=['file', 'segment', 'sqlite'], help='数据存储类型，默认使用配置中的storage_type')
+    parser.add_argument('--export-links', metavar='OUTPUT', help='将--site指定网站的链接库导出为CSV或Excel(.xlsx)，需要pandas')
     args = parser.parse_args()
+    
+    if args.http_cache:
+        HTTP_CACHE_SETTINGS['enabled'] = True
+    if args.storage:
+        STORAGE_SETTINGS['storage_type'] = args.storage
+
+    if args.export_links:
+        if not args.site:
+            print("错误: 导出链接库需要通过 --site 指定网站")
+        elif get_link_manager().export_links(args.site, args.export_links):
+            print(f"已导出链接库: {args.site} -> {args.export_links}")
+        else:
+            print(f"错误: 导出链接库失败: {args.site}")
+        return
 
     engine = CrawlerEngine()
     
+    if args.archive:
+        # 归档已结束的日期目录
+        report = PolicyArchiver.from_settings().compact()
+        if report['dirs']:
+            print(f"归档 {report['dirs']} 个目录 {report['files']} 个文件: "
+                  f"{report['raw_bytes'] / 1024:.1f}KB -> {report['archive_bytes'] / 1024:.1f}KB, "
+                  f"压缩比 {report['compression_ratio']}x, "
+                  f"扫描速度 {report['docs_per_sec_before']} -> {report['docs_per_sec_after']} 文档/秒")
+        else:
+            print("没有需要归档的日期目录")
+        if report['removed_archives']:
+            print(f"按保留策略删除归档 {report['removed_archives']} 个")
+        return
+    
+    crawled = False
     if args.spider:
         # 使用注册的爬虫
         spider_class, config_path = engine.load_spider(args.spider)
         engine.start_crawling(spider_class, config_path)
+        crawled = True
     elif args.url:
         # 实现URL自动识别逻辑
         pass
     elif args.site:
         # 使用链接库爬取指定网站
-        link_manager = LinkPoolManager()
+        link_manager = get_link_manager()
         links = link_manager.get_site_links(args.site)
         
         if not links:
@@ -62,8 +100,22 @@ def main():
                 link.get('url', ''), 
                 link.get('name', '')
             )
+        crawled = True
     else:
         parser.print_help()
+    
+    if HTTP_CACHE_SETTINGS.get('enabled'):
+        stats = get_http_cache().stats()
+        print(f"HTTP缓存: 命中 {stats['hits']}, 未命中 {stats['misses']}, 重新验证 {stats['revalidated']}, "
+              f"缓存 {stats['entries']} 条 / {stats['size'] / 1024 / 1024:.1f}MB")
+    
+    # 只在实际爬取后统计去重，避免仅显示帮助时也创建存储
+    if not crawled:
+        return
+    dedup = get_db_client().dedup_stats()
+    if dedup['saves']:
+        print(f"存储去重: 保存 {dedup['saves']} 次, 不同内容 {dedup['objects']} 份, 内容更新版本 {dedup['revisions']} 个, "
+              f"去重率 {dedup['dedup_ratio']:.1%}, 节省 {dedup['saved_bytes'] / 1024:.1f}KB")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -15,6 +15,62 @@ DEFAULT_HEADERS = {
     'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
 }
 
+# 连接池配置（按主机共享会话，复用keep-alive连接）
+HTTP_POOL_SETTINGS = {
+    'pool_connections': 4,  # 每个主机缓存的连接池数量
+    'pool_maxsize': 10,     # 每个连接池保持的最大连接数
+    'max_retries': 0,       # 适配器层重试次数（业务层自行重试）
+    'legacy_ssl_hosts': [],  # 需要兼容老旧服务器SSL（旧版重协商、SECLEVEL=1）的域名白名单，支持后缀匹配，如 ['sz.gov.cn']
+    'hosts': {              # 按域名覆盖配置，支持后缀匹配
+        'sz.gov.cn': {'max_retries': 5},
+        'wanxin20.github.io': {'max_retries': 5},
+    },
+}
+
+# 按主机限速配置（令牌桶，监测器与爬虫共享）
+RATE_LIMIT_SETTINGS = {
+    'default': {'rate': 2.0, 'burst': 4},  # 每秒补充的令牌数 / 最大突发请求数
+    'domains': {                            # 按域名覆盖配置，支持后缀匹配
+        # 'ndrc.gov.cn': {'rate': 0.5, 'burst': 2},
+    },
+}
+
+# 按主机熔断配置
+CIRCUIT_BREAKER_SETTINGS = {
+    'failure_threshold': 5,        # 连续失败多少次后熔断
+    'recovery_timeout': 300,       # 首次熔断后多久发送探测请求（秒）
+    'max_recovery_timeout': 3600,  # 连续熔断时恢复时间的上限（秒）
+    'probe_timeout': 120,          # 探测请求的最长等待时间（秒）
+    'window': 50,                  # 统计延迟和错误率的滚动窗口大小
+}
+
+# 下载器磁盘HTTP缓存配置（遵循Cache-Control/Expires，过期后条件请求重新验证）
+HTTP_CACHE_SETTINGS = {
+    'enabled': False,                # 是否启用，也可通过 cli.py --http-cache 临时启用
+    'cache_dir': 'data/http_cache',  # 缓存目录（响应体文件 + SQLite索引）
+    'max_size_mb': 512,              # 缓存总大小上限，超出后按最近最少访问淘汰
+    'heuristic_fraction': 0.1,       # 只有Last-Modified时，按其距今时长的比例估算新鲜期
+    'max_heuristic': 86400,          # 估算新鲜期的上限（秒）
+}
+
+# 页面指纹配置（监测器判断页面内容是否变化）
+FINGERPRINT_SETTINGS = {
+    'digest_size': 16,  # blake2b摘要字节数
+    'ignore_xpaths': [],  # 计算指纹时忽略的元素，栏目可通过ignore_xpaths追加
+    'ignore_patterns': [  # 计算指纹前从文本中去除的动态片段，栏目可通过ignore_patterns追加
+        r'(访问量|浏览量|浏览次数|阅读次数|点击数|点击量)\s*[:：]?\s*\d+\s*次?',
+        r'今天是\s*\d{4}年\d{1,2}月\d{1,2}日\s*(星期[一二三四五六日天])?',
+    ],
+    # SimHash以监测区域（content_xpath）中的条目为特征，与上次触发爬取时的签名相差不超过
+    # 该位数视为细微变化，不触发爬取；-1为关闭。按合成政策列表页（10~100条）和万信人员页
+    # 校准：日期、时间、访问量等数字变化及条目重新排序的距离均为0，新增一条最少相差2位（256位签名，
+    # 通常10位以上），因此默认0。轮播图等非数字的动态文字需通过content_xpath或ignore_xpaths排除
+    'simhash_threshold': 0,
+    'simhash_domains': {        # 按域名覆盖阈值，支持后缀匹配；站点/栏目也可配置simhash_threshold
+        # 'wanxin20.github.io': 0,
+    },
+}
+
 # 代理设置
 PROXY_SETTINGS = {
     'enabled': False,  # 是否启用代理
@@ -26,15 +82,74 @@ DATA_PATHS = {
     'link_pool': 'data/link_pool',
     'policy_data': 'data/policy_data',
     'logs': 'logs',
+    'monitor_state': 'data/monitor_state.db',  # 栏目监测状态库(指纹/校验头/调度)
+    'seen_urls': 'data/seen_urls.db',  # 已入库详情页URL索引
+    'link_pool_journal': 'data/link_pool_journal.log',  # 链接库状态延迟写回日志（不能放在链接库目录中）
+}
+
+# 政策数据存储配置
+STORAGE_SETTINGS = {
+    'storage_type': 'file',  # file(每条数据一个JSON文件) / segment(追加写入分段JSONL) / sqlite(SQLite数据库)
+    'segment': {
+        'max_segment_mb': 64,   # 单个分段文件大小上限，超出后滚动到新分段
+        'flush_every': 100,     # 缓冲多少条记录批量写盘一次
+        'flush_interval': 5,    # 距上次写盘超过该秒数时写盘（秒）
+        'fsync': True,          # 批量写盘后是否fsync
+    },
+    'sqlite': {                 # 数据库文件为 policy_data/policies.db
+        'batch_size': 200,      # 缓冲多少条记录在一个事务中提交
+        'flush_interval': 5,    # 距上次提交超过该秒数时提交（秒）
+    },
+}
+
+# 政策数据归档配置（已结束的日期目录压缩为zip归档）
+ARCHIVE_SETTINGS = {
+    'enabled': False,           # 监测服务运行时是否定时归档，也可通过 cli.py --archive 手动执行
+    'archive_dir': None,        # 归档目录，默认为 policy_data/archive
+    'compression': 'lzma',      # 压缩算法: lzma(压缩率高) / deflate(即gzip算法，更快)
+    'min_age_days': 1,          # 日期目录超过多少天视为已结束
+    'interval': 3600,           # 定时归档间隔（秒）
+    'retention_days': 0,        # 归档保留天数，0为永久保留
+    'max_archive_mb': 0,        # 归档总大小上限，超出后删除最旧的归档，0为不限制
+}
+
+# 详情页栏目解析配置（链接库栏目主机+路径前缀树）
+SECTION_RESOLVER_SETTINGS = {
+    'cache_size': 10000,     # URL解析结果LRU缓存条数
+    'refresh_interval': 5,   # 检查链接库文件是否变化的最小间隔（秒），变化后重建前缀树
+}
+
+# 链接库状态延迟写回配置（爬取时间等状态先追加到日志，合并后定时写回链接库文件）
+LINK_POOL_JOURNAL_SETTINGS = {
+    'flush_interval': 30,  # 写回间隔（秒），期间同一站点的多次更新合并为一次文件写入
+    'fsync': True,         # 追加日志和替换文件前是否fsync
+}
+
+# 已入库URL索引配置（布隆过滤器 + 磁盘精确集合）
+SEEN_INDEX_SETTINGS = {
+    'initial_capacity': 100000,  # 布隆过滤器首层容量，写满后自动扩容一倍
+    'error_rate': 0.001,         # 布隆过滤器目标误判率，误判由磁盘集合兜底
+    'snapshot_every': 1000,      # 每新增多少条URL保存一次布隆过滤器快照
 }
 
 # 监测服务配置
 MONITOR_SETTINGS = {
     'check_interval': 60,  # 检查间隔（秒）
     'high_priority_threshold': 8,  # 高优先级阈值
+    'engine': 'thread',  # 检查引擎: thread(逐个检查) / async(asyncio调度、有界线程池执行同步检查)
+    'async_max_concurrency': 20,  # 异步引擎全局最大并发数
+    'async_per_host_concurrency': 2,  # 异步引擎单主机最大并发数
+    'detection_mode': 'conditional_get',  # 变化检测: conditional_get(单次条件GET) / head(先HEAD后GET)
+    'warm_start_spread': 300,  # 重启后已到期栏目在该时间窗口内(秒)随机分散检查，避免集中请求
+    'watch_debounce': 1.0,  # 链接库文件最后一次变化后静默多久(秒)再重新加载，合并一次保存产生的多个事件
+    'stats_interval': 3600,  # 调度器输出连接、主机健康和变化统计的间隔（秒），0为只在停止时输出
 }
 
 # 爬虫配置
 SPIDER_SETTINGS = {
     'default_config_path': 'config/spiders',
+    'download_workers': 8,        # 详情页下载线程数（所有爬取任务共享）
+    'per_host_concurrency': 2,    # 同一主机同时下载的详情页数
+    'preserve_order': True,       # 按列表顺序解析详情页，爬虫可通过custom_settings['PRESERVE_ORDER']覆盖
+    'spider_pool_size': 4,        # 每种爬虫保留的空闲实例数，供后续触发复用
 }
\ No newline at end of file
@@ -0,0 +1,269 @@
+import os
+import re
+import json
+import time
+import shutil
+import zipfile
+import threading
+from datetime import datetime, timedelta
+
+from config.settings import DATA_PATHS, ARCHIVE_SETTINGS
+from utils.logger import setup_logger
+
+DATE_DIR_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# 压缩算法: lzma压缩率高，deflate(与gzip相同算法)更快
+COMPRESSION = {
+    'lzma': zipfile.ZIP_LZMA,
+    'deflate': zipfile.ZIP_DEFLATED,
+    'gzip': zipfile.ZIP_DEFLATED,
+}
+
+
+class PolicyArchiver:
+    """政策数据归档：将已结束的日期目录压缩为归档文件
+
+    policy_data下按日期划分的目录（如 default/规划/2024-01-02/）在日期过去
+    min_age_days天后打包为 archive/default/规划/2024-01-02.zip，每个文件单独
+    压缩，zip中央目录即成员索引，读取单个文档时只解压该成员。校验归档完整后
+    删除原目录。归档按保留天数和总大小上限清理最旧的归档。
+    """
+
+    def __init__(self, base_path='data/policy_data', archive_dir=None, compression='lzma', min_age_days=1,
+                 retention_days=0, max_archive_bytes=0, interval=3600):
+        self.logger = setup_logger('PolicyArchiver')
+        self.base_path = os.path.abspath(base_path)
+        self.archive_dir = os.path.abspath(archive_dir or os.path.join(base_path, 'archive'))
+        if compression not in COMPRESSION:
+            raise ValueError(f"不支持的压缩算法: {compression}，可选: {', '.join(COMPRESSION)}")
+        self.compression = COMPRESSION[compression]
+        self.min_age_days = min_age_days
+        self.retention_days = retention_days          # 归档保留天数，0为永久保留
+        self.max_archive_bytes = max_archive_bytes    # 归档总大小上限，0为不限制
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.worker = None
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建归档器"""
+        settings = settings or ARCHIVE_SETTINGS
+        return cls(
+            base_path=DATA_PATHS.get('policy_data', 'data/policy_data'),
+            archive_dir=settings.get('archive_dir'),
+            compression=settings.get('compression', 'lzma'),
+            min_age_days=settings.get('min_age_days', 1),
+            retention_days=settings.get('retention_days', 0),
+            max_archive_bytes=int(settings.get('max_archive_mb', 0) * 1024 * 1024),
+            interval=settings.get('interval', 3600)
+        )
+
+    def find_closed_dirs(self, today=None):
+        """查找已结束（日期早于 today - min_age_days）的日期目录"""
+        cutoff = (today or datetime.now().date()) - timedelta(days=self.min_age_days)
+        closed = []
+        for root, dirs, _ in os.walk(self.base_path):
+            if os.path.abspath(root) == self.archive_dir:
+                dirs[:] = []
+                continue
+            for name in list(dirs):
+                if os.path.join(root, name) == self.archive_dir or name == 'segments':
+                    dirs.remove(name)
+                elif DATE_DIR_RE.match(name):
+                    dirs.remove(name)
+                    try:
+                        if datetime.strptime(name, '%Y-%m-%d').date() <= cutoff:
+                            closed.append(os.path.join(root, name))
+                    except ValueError:
+                        continue
+        return sorted(closed)
+
+    def _archive_path(self, date_dir):
+        relative = os.path.relpath(date_dir, self.base_path)
+        return os.path.join(self.archive_dir, relative + '.zip')
+
+    def compact_dir(self, date_dir):
+        """将一个日期目录压缩为归档，校验后删除原目录
+
+        Returns:
+            dict: 文件数、原始/压缩字节数、压缩前后的扫描耗时
+        """
+        archive_path = self._archive_path(date_dir)
+        os.makedirs(os.path.dirname(archive_path), exist_ok=True)
+        tmp_path = archive_path + '.tmp'
+
+        # 读取原文件并解析，记录压缩前的扫描耗时
+        members = []
+        start = time.perf_counter()
+        for root, _, files in os.walk(date_dir):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                with open(path, 'rb') as f:
+                    body = f.read()
+                if filename.endswith('.json'):
+                    json.loads(body)
+                members.append((os.path.relpath(path, date_dir).replace(os.sep, '/'), body))
+        scan_before = time.perf_counter() - start
+
+        with zipfile.ZipFile(tmp_path, 'w', compression=self.compression) as archive:
+            names = set()
+            new_names = {name for name, _ in members}
+            # 日期目录已归档过（归档后又写入了文件）时合并旧归档
+            if os.path.exists(archive_path):
+                with zipfile.ZipFile(archive_path) as existing:
+                    for info in existing.infolist():
+                        if info.filename not in new_names:
+                            archive.writestr(info, existing.read(info.filename), compress_type=self.compression)
+                            names.add(info.filename)
+            for name, body in members:
+                archive.writestr(name, body)
+                names.add(name)
+
+        # 校验归档可完整读取后再替换旧归档并删除原目录
+        start = time.perf_counter()
+        with zipfile.ZipFile(tmp_path) as archive:
+            if set(archive.namelist()) != names:
+                raise IOError(f"归档成员不完整: {tmp_path}")
+            for info in archive.infolist():
+                body = archive.read(info.filename)
+                if info.filename.endswith('.json'):
+                    json.loads(body)
+        scan_after = time.perf_counter() - start
+
+        os.replace(tmp_path, archive_path)
+        shutil.rmtree(date_dir)
+        return {
+            'files': len(members),
+            'raw_bytes': sum(len(body) for _, body in members),
+            'archive_bytes': os.path.getsize(archive_path),
+            'scan_before': scan_before,
+            'scan_after': scan_after,
+            # 目录中的小文件占用的磁盘块（比文件内容更能反映实际磁盘占用）
+            'disk_bytes_before': sum(-(-len(body) // 4096) * 4096 for _, body in members),
+        }
+
+    def compact(self, today=None):
+        """压缩所有已结束的日期目录，然后执行保留策略
+
+        Returns:
+            dict: 本次压缩的汇总报告
+        """
+        with self.lock:
+            report = {'dirs': 0, 'files': 0, 'raw_bytes': 0, 'archive_bytes': 0, 'disk_bytes_before': 0,
+                      'scan_before': 0.0, 'scan_after': 0.0, 'failed': 0}
+            for date_dir in self.find_closed_dirs(today):
+                try:
+                    stats = self.compact_dir(date_dir)
+                except Exception as e:
+                    report['failed'] += 1
+                    self.logger.error(f"归档日期目录失败: {date_dir} - {str(e)}")
+                    continue
+                report['dirs'] += 1
+                for key, value in stats.items():
+                    report[key] += value
+
+            report['removed_archives'] = self.apply_retention(today)
+            if report['dirs']:
+                report['compression_ratio'] = round(report['raw_bytes'] / report['archive_bytes'], 2) \
+                    if report['archive_bytes'] else 0.0
+                report['docs_per_sec_before'] = round(report['files'] / report['scan_before']) if report['scan_before'] else 0
+                report['docs_per_sec_after'] = round(report['files'] / report['scan_after']) if report['scan_after'] else 0
+                self.logger.info(
+                    f"归档完成: {report['dirs']} 个目录 {report['files']} 个文件, "
+                    f"{report['raw_bytes'] / 1024:.1f}KB -> {report['archive_bytes'] / 1024:.1f}KB "
+                    f"(压缩比 {report['compression_ratio']}x, 原目录占用磁盘 {report['disk_bytes_before'] / 1024:.1f}KB), "
+                    f"扫描速度 {report['docs_per_sec_before']} -> {report['docs_per_sec_after']} 文档/秒"
+                )
+            return report
+
+    def list_archives(self):
+        """按日期从旧到新返回所有归档 [(日期, 路径, 大小)]"""
+        archives = []
+        for root, _, files in os.walk(self.archive_dir):
+            for filename in files:
+                name, ext = os.path.splitext(filename)
+                if ext == '.zip' and DATE_DIR_RE.match(name):
+                    path = os.path.join(root, filename)
+                    archives.append((name, path, os.path.getsize(path)))
+        return sorted(archives)
+
+    def apply_retention(self, today=None):
+        """删除超过保留天数的归档，总大小超过上限时从最旧的归档开始删除
+
+        Returns:
+            int: 删除的归档数
+        """
+        archives = self.list_archives()
+        removed = 0
+        if self.retention_days:
+            cutoff = str((today or datetime.now().date()) - timedelta(days=self.retention_days))
+            for _, path, _ in [archive for archive in archives if archive[0] < cutoff]:
+                os.remove(path)
+                removed += 1
+            archives = [archive for archive in archives if archive[0] >= cutoff]
+        if self.max_archive_bytes:
+            total = sum(size for _, _, size in archives)
+            for _, path, size in archives:
+                if total <= self.max_archive_bytes:
+                    break
+                os.remove(path)
+                total -= size
+                removed += 1
+        if removed:
+            self.logger.info(f"按保留策略删除归档 {removed} 个")
+        return removed
+
+    def _locate(self, location):
+        """将原始文件路径映射为 (归档路径, 成员名)"""
+        relative = os.path.relpath(os.path.abspath(location), self.base_path)
+        parts = relative.split(os.sep)
+        for i in range(len(parts) - 2, -1, -1):
+            if DATE_DIR_RE.match(parts[i]):
+                archive_path = os.path.join(self.archive_dir, *parts[:i + 1]) + '.zip'
+                return archive_path, '/'.join(parts[i + 1:])
+        return None, None
+
+    def read_document(self, location):
+        """读取单个文档，原文件已归档时只解压归档中的对应成员
+
+        Args:
+            location: 文档保存时的文件路径（如存储目录中记录的location）
+        """
+        if os.path.exists(location):
+            with open(location, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        archive_path, member = self._locate(location)
+        if archive_path is None or not os.path.exists(archive_path):
+            raise FileNotFoundError(f"文档不存在且未找到归档: {location}")
+        with zipfile.ZipFile(archive_path) as archive:
+            return json.loads(archive.read(member))
+
+    def iter_archive(self, archive_path):
+        """依次读取归档中的全部文档，返回 (成员名, 文档)"""
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.filename.endswith('.json'):
+                    yield info.filename, json.loads(archive.read(info.filename))
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.compact()
+            except Exception as e:
+                self.logger.error(f"定时归档失败: {str(e)}")
+
+    def start(self):
+        """启动后台定时归档线程"""
+        if self.worker and self.worker.is_alive():
+            return
+        self.stop_event.clear()
+        self.worker = threading.Thread(target=self._run, name='PolicyArchiver', daemon=True)
+        self.worker.start()
+        self.logger.info(f"启动定时归档: 每 {self.interval} 秒压缩 {self.min_age_days} 天前的日期目录")
+
+    def stop(self):
+        """停止后台归档线程"""
+        self.stop_event.set()
+        if self.worker:
+            self.worker.join(timeout=5)
@@ -0,0 +1,86 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from utils.logger import setup_logger
+
+
+class AsyncCheckEngine:
+    """异步检查引擎：基于asyncio并发执行栏目更新检查
+
+    单个检查仍复用监测器的检查逻辑（304判断、哈希比较、触发爬虫），
+    asyncio负责扇出调度，并通过全局和单主机两级信号量限制并发。
+
+    注意：请求本身不是异步I/O。检查逻辑基于requests同步实现（共享会话、HEAD策略、
+    限速和熔断都依赖它），每个检查通过run_in_executor交给有界线程池执行，
+    事件循环只负责排队和并发限制；线程池大小即全局并发上限。
+    """
+
+    def __init__(self, monitor, max_concurrency=20, per_host_concurrency=2):
+        self.logger = setup_logger('AsyncCheckEngine')
+        self.monitor = monitor
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.per_host_concurrency = max(1, int(per_host_concurrency))
+        self.executor = None
+
+    def run(self, targets):
+        """并发执行一批检查任务
+
+        Args:
+            targets: 检查目标列表，元素为 (site_name, data, is_direct)
+
+        Returns:
+            int: 发现更新的数量
+        """
+        if not targets:
+            return 0
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix='AsyncCheck'
+            )
+
+        return asyncio.run(self._run_all(targets))
+
+    def close(self):
+        """关闭工作线程池"""
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def _run_all(self, targets):
+        """在事件循环中扇出所有检查任务"""
+        global_semaphore = asyncio.Semaphore(self.max_concurrency)
+        host_semaphores = {}
+
+        tasks = [
+            self._run_one(global_semaphore, host_semaphores, site_name, data, is_direct)
+            for site_name, data, is_direct in targets
+        ]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        updated = 0
+        for (site_name, data, _), result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"异步检查异常: {site_name} - {data.get('url', '')} - {str(result)}")
+            elif result:
+                updated += 1
+        return updated
+
+    async def _run_one(self, global_semaphore, host_semaphores, site_name, data, is_direct):
+        """执行单个检查任务，先获取主机信号量再获取全局信号量"""
+        host = urlparse(data.get('url', '')).netloc
+        if host not in host_semaphores:
+            host_semaphores[host] = asyncio.Semaphore(self.per_host_concurrency)
+
+        loop = asyncio.get_running_loop()
+        async with host_semaphores[host]:
+            async with global_semaphore:
+                return await loop.run_in_executor(
+                    self.executor,
+                    self.monitor._check_target,
+                    site_name,
+                    data,
+                    is_direct
+                )
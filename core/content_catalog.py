@@ -0,0 +1,167 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import threading
+
+from utils.logger import setup_logger
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def content_key(title, content):
+    """规范化标题和正文（合并空白）后计算内容哈希，作为政策内容的地址"""
+    text = f"{WHITESPACE_RE.sub(' ', title or '').strip()}\n{WHITESPACE_RE.sub(' ', content or '').strip()}"
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ContentCatalog:
+    """按内容哈希寻址的政策目录
+
+    objects表每份不同的内容只保存一条（内容哈希 -> 存储位置、大小、引用次数），
+    versions表记录每个来源URL出现过的内容版本。内容已存在时只增加引用次数并
+    更新时间戳，不再重复写入；同一URL内容变化时记为新版本。
+    去重率 = 1 - 不同内容数 / 保存次数。
+    """
+
+    def __init__(self, db_path='data/policy_data/catalog.db'):
+        self.logger = setup_logger('ContentCatalog')
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS objects ('
+                'content_hash TEXT PRIMARY KEY, '
+                'location TEXT, '
+                'size INTEGER, '
+                'refs INTEGER NOT NULL DEFAULT 1, '
+                'first_saved REAL, '
+                'last_saved REAL) WITHOUT ROWID'
+            )
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS versions ('
+                'source_url TEXT NOT NULL, '
+                'content_hash TEXT NOT NULL, '
+                'version INTEGER NOT NULL, '
+                'section_name TEXT, '
+                'save_count INTEGER NOT NULL DEFAULT 1, '
+                'first_saved REAL, '
+                'last_saved REAL, '
+                'PRIMARY KEY (source_url, content_hash)) WITHOUT ROWID'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_versions_hash ON versions (content_hash)')
+            self.conn.commit()
+
+    def lookup(self, content_hash):
+        """查找内容是否已保存，返回 {location, size, refs}，不存在时返回None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT location, size, refs FROM objects WHERE content_hash = ?', (content_hash,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def add_reference(self, source_url, content_hash, section_name=None):
+        """内容已存在时记录一次引用：更新时间戳和引用次数
+
+        Returns:
+            int: 该URL对应的内容版本号，内容未记录时返回None
+        """
+        now = time.time()
+        try:
+            with self.lock:
+                with self.conn:
+                    cursor = self.conn.execute(
+                        'UPDATE objects SET refs = refs + 1, last_saved = ? WHERE content_hash = ?', (now, content_hash)
+                    )
+                    # 目录建立之前保存的内容没有记录，不计引用
+                    if cursor.rowcount == 0:
+                        return None
+                    return self._upsert_version(source_url, content_hash, section_name, now)
+        except sqlite3.Error as e:
+            self.logger.error(f"记录内容引用失败: {source_url} - {str(e)}")
+            return None
+
+    def add_object(self, source_url, content_hash, section_name=None, location=None, size=0):
+        """记录新写入的内容及其存储位置
+
+        Returns:
+            int: 该URL对应的内容版本号，URL已有其他内容时为新版本
+        """
+        now = time.time()
+        try:
+            with self.lock:
+                with self.conn:
+                    self.conn.execute(
+                        'INSERT INTO objects (content_hash, location, size, refs, first_saved, last_saved) '
+                        'VALUES (?, ?, ?, 1, ?, ?) ON CONFLICT(content_hash) DO UPDATE SET '
+                        'refs = refs + 1, last_saved = excluded.last_saved',
+                        (content_hash, location, size, now, now)
+                    )
+                    return self._upsert_version(source_url, content_hash, section_name, now)
+        except sqlite3.Error as e:
+            self.logger.error(f"记录内容失败: {source_url} - {str(e)}")
+            return None
+
+    def _upsert_version(self, source_url, content_hash, section_name, now):
+        source_url = source_url or ''
+        row = self.conn.execute(
+            'SELECT version FROM versions WHERE source_url = ? AND content_hash = ?', (source_url, content_hash)
+        ).fetchone()
+        if row is not None:
+            self.conn.execute(
+                'UPDATE versions SET save_count = save_count + 1, last_saved = ? '
+                'WHERE source_url = ? AND content_hash = ?', (now, source_url, content_hash)
+            )
+            return row['version']
+        (latest,) = self.conn.execute(
+            'SELECT COALESCE(MAX(version), 0) FROM versions WHERE source_url = ?', (source_url,)
+        ).fetchone()
+        self.conn.execute(
+            'INSERT INTO versions (source_url, content_hash, version, section_name, save_count, first_saved, last_saved) '
+            'VALUES (?, ?, ?, ?, 1, ?, ?)', (source_url, content_hash, latest + 1, section_name, now, now)
+        )
+        return latest + 1
+
+    def versions(self, source_url):
+        """按版本顺序返回URL的所有内容版本"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT v.version, v.content_hash, v.section_name, v.save_count, v.first_saved, v.last_saved, o.location '
+                'FROM versions v LEFT JOIN objects o ON o.content_hash = v.content_hash '
+                'WHERE v.source_url = ? ORDER BY v.version', (source_url,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        """获取保存次数、不同内容数、版本数、节省的空间和去重率"""
+        with self.lock:
+            objects, saves, stored_bytes, saved_bytes = self.conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(refs), 0), COALESCE(SUM(size), 0), '
+                'COALESCE(SUM(size * (refs - 1)), 0) FROM objects'
+            ).fetchone()
+            (urls,) = self.conn.execute('SELECT COUNT(DISTINCT source_url) FROM versions').fetchone()
+            (versions,) = self.conn.execute('SELECT COUNT(*) FROM versions').fetchone()
+        return {
+            'saves': saves,
+            'objects': objects,
+            'urls': urls,
+            'revisions': versions - urls,
+            'stored_bytes': stored_bytes,
+            'saved_bytes': saved_bytes,
+            'dedup_ratio': round(1 - objects / saves, 3) if saves else 0.0,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
@@ -1,13 +1,38 @@
 from spiders import SPIDERS
 from utils.logger import setup_logger
+from utils.rate_limiter import rate_limiter
+from utils.seen_index import get_seen_index
+from config.settings import SPIDER_SETTINGS
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from urllib.parse import urlparse
+import threading
 import importlib
 
 class CrawlerEngine:
-    def __init__(self):
+    def __init__(self, download_workers=None, per_host_concurrency=None):
         self.logger = setup_logger('CrawlerEngine')
         self.active_spiders = []
+        
+        # 详情页下载线程池，所有爬取任务共享；解析在调用线程中进行
+        self.download_workers = download_workers or SPIDER_SETTINGS.get('download_workers', 8)
+        self.per_host_concurrency = per_host_concurrency or SPIDER_SETTINGS.get('per_host_concurrency', 2)
+        self.download_pool = ThreadPoolExecutor(max_workers=self.download_workers, thread_name_prefix='detail-download')
+        self.host_slots = {}
+        self.host_slots_lock = threading.Lock()
+        
+        # 已解析的爬虫类，以及按爬虫名称复用的空闲爬虫实例
+        self.spider_classes = {}
+        self.idle_spiders = {}
+        self.spider_pool_size = SPIDER_SETTINGS.get('spider_pool_size', 4)
+        self.spider_pool_lock = threading.Lock()
 
     def load_spider(self, spider_name):
+        # 爬虫类只解析一次
+        cached = self.spider_classes.get(spider_name)
+        if cached is not None:
+            return cached
+        
         if spider_name not in SPIDERS:
             raise ValueError(f"未注册的爬虫: {spider_name}")
         
@@ -18,98 +43,274 @@ class CrawlerEngine:
         # 动态导入并返回配置好的爬虫类
         module = __import__(module_path, fromlist=[class_name])
         spider_class = getattr(module, class_name)
+        self.spider_classes[spider_name] = (spider_class, config_path)
         return spider_class, config_path  # 返回类引用和配置路径
 
+    def _apply_download_delay(self, spider):
+        """将爬虫custom_settings中的DOWNLOAD_DELAY应用到共享限速器"""
+        custom_settings = getattr(spider, 'custom_settings', None) or {}
+        delay = custom_settings.get('DOWNLOAD_DELAY')
+        if not delay:
+            return
+        
+        # 未在RATE_LIMIT_SETTINGS中显式配置的域名才使用爬虫的下载间隔
+        for domain in spider.config.get('allowed_domains', []):
+            rate_limiter.set_domain_limit(domain, rate=1.0 / delay, burst=1, override=False)
+    
     def start_crawling(self, spider_class, config_path):  # 修改方法签名
         spider = spider_class(config_path)  # 传递配置路径
         self.active_spiders.append(spider)
+        self._apply_download_delay(spider)
         
+        # 从爬虫配置获取起始URL
+        start_url = spider.config.get('start_urls', ['https://www.ndrc.gov.cn'])[0]
+        self._crawl_list(spider, start_url)
+    
+    def _crawl_list(self, spider, start_url, prefetched=None):
+        """解析列表页并爬取其中的详情页
+        
+        Args:
+            prefetched: 监测器已下载的列表页(url/body/headers/encoding)，提供时不再重复下载
+        """
         # 添加实际爬取逻辑
         from utils.downloader import PageDownloader
+        from scrapy.http import HtmlResponse
         downloader = PageDownloader()
         
-        # 从爬虫配置获取起始URL
-        start_url = spider.config.get('start_urls', ['https://www.ndrc.gov.cn'])[0]
+        # 处理列表页，优先使用监测器已下载的页面
+        response = spider.prefetched_response(start_url, prefetched) if hasattr(spider, 'prefetched_response') else None
+        if response is None:
+            list_html = downloader.fetch(start_url, headers=spider.headers)
+            if list_html:
+                # 模拟Scrapy的response对象
+                response = HtmlResponse(url=start_url, body=list_html, encoding='utf-8')
         
-        # 处理列表页
-        list_html = downloader.fetch(start_url, headers=spider.headers)
-        if list_html:
+        if response is not None:
             # 调用爬虫的解析方法
             if hasattr(spider, 'parse_list'):
-                # 模拟Scrapy的response对象
-                from scrapy.http import HtmlResponse
-                response = HtmlResponse(url=start_url, body=list_html, encoding='utf-8')
-                
                 # 处理列表页返回的结果
                 parse_results = spider.parse_list(response)
                 
                 # 检查返回类型
                 if hasattr(parse_results, '__iter__') and not isinstance(parse_results, dict):
+                    detail_urls = []
                     for result in parse_results:
                         # 如果是Request对象
                         if hasattr(result, 'url'):
-                            # 处理详情页请求
-                            detail_html = downloader.fetch(result.url, headers=spider.headers)
-                            if detail_html:
-                                detail_response = HtmlResponse(url=result.url, body=detail_html, encoding='utf-8')
-                                spider.parse_detail(detail_response)
+                            # 已入库的详情页不再下载
+                            if result.callback == spider.parse_detail and get_seen_index().contains(result.url):
+                                continue
+                            # 详情页请求交给下载流水线
+                            detail_urls.append(result.url)
                         # 如果是字典类型，说明已经是解析好的数据
                         elif isinstance(result, dict):
                             self.logger.info(f"已获取解析好的数据: {result.get('name', '未知')}")
                         else:
                             self.logger.warning(f"未知的返回类型: {type(result)}")
+                    
+                    # 并发下载详情页并依次解析
+                    self._crawl_details(spider, downloader, detail_urls)
+    
+    def _get_host_slot(self, url):
+        """获取主机的并发信号量，限制同一主机同时进行的下载数"""
+        host = urlparse(url).netloc
+        slot = self.host_slots.get(host)
+        if slot is None:
+            with self.host_slots_lock:
+                slot = self.host_slots.setdefault(host, threading.BoundedSemaphore(self.per_host_concurrency))
+        return slot
+    
+    def _fetch_detail(self, downloader, url, headers):
+        """在下载线程中获取详情页，受主机并发数和共享限速器约束"""
+        with self._get_host_slot(url):
+            return downloader.fetch(url, headers=headers)
+    
+    def _crawl_details(self, spider, downloader, detail_urls):
+        """详情页下载-解析流水线
+        
+        下载线程池并发获取详情页（单个爬虫同时下载的页面数不超过其CONCURRENT_REQUESTS），
+        解析在当前线程中进行，爬虫的解析方法无需线程安全。默认按列表顺序解析，
+        爬虫custom_settings中PRESERVE_ORDER为False时按下载完成顺序解析。
+        
+        Returns:
+            int: 成功下载并解析的详情页数量
+        """
+        from scrapy.http import HtmlResponse
+        
+        if not detail_urls:
+            return 0
+        
+        custom_settings = getattr(spider, 'custom_settings', None) or {}
+        max_in_flight = max(int(custom_settings.get('CONCURRENT_REQUESTS', self.download_workers)), 1)
+        preserve_order = custom_settings.get('PRESERVE_ORDER', SPIDER_SETTINGS.get('preserve_order', True))
+        
+        url_iter = iter(detail_urls)
+        pending = deque()
+        
+        def submit_next():
+            url = next(url_iter, None)
+            if url is None:
+                return False
+            pending.append((url, self.download_pool.submit(self._fetch_detail, downloader, url, spider.headers)))
+            return True
+        
+        for _ in range(max_in_flight):
+            if not submit_next():
+                break
+        
+        crawled = 0
+        while pending:
+            if preserve_order:
+                url, future = pending.popleft()
+            else:
+                done, _ = wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+                url, future = next(item for item in pending if item[1] in done)
+                pending.remove((url, future))
+            
+            # 每完成一个下载就补充一个，保持下载与解析重叠进行
+            submit_next()
+            
+            try:
+                detail_html = future.result()
+                if not detail_html:
+                    continue
+                detail_response = HtmlResponse(url=url, body=detail_html, encoding='utf-8')
+                spider.parse_detail(detail_response)
+                crawled += 1
+            except Exception as e:
+                self.logger.error(f"处理详情页失败: {url} - {str(e)}")
+        return crawled
     # 在CrawlerEngine类中添加新方法
     # 在CrawlerEngine类中修改start_crawling_with_url方法
     
-    def start_crawling_with_url(self, spider_name, url, section_name=None):
-        """使用指定URL启动爬虫"""
+    def _create_spider(self, spider_name):
+        """按名称创建爬虫实例，失败时返回None"""
+        # 动态导入爬虫类
+        try:
+            # 先尝试从SPIDERS字典中加载
+            spider_class, config_path = self.load_spider(spider_name)
+        except (ValueError, KeyError) as e:
+            self.logger.warning(f"从SPIDERS字典加载爬虫失败: {str(e)}，尝试直接导入")
+            # 如果在SPIDERS中找不到，尝试直接导入
+            module_name = f"spiders.{spider_name}"
+            if spider_name.endswith('_spider'):
+                module_name = f"spiders.{spider_name}"
+            else:
+                module_name = f"spiders.{spider_name}_spider"
+                
+            try:
+                module = importlib.import_module(module_name)
+                # 获取爬虫类名（通常是蛇形命名转驼峰命名）
+                class_name = ''.join(word.capitalize() for word in spider_name.split('_'))
+                if not class_name.endswith('Spider'):
+                    class_name += 'Spider'
+                spider_class = getattr(module, class_name)
+                config_path = f"config/spiders/{spider_name.replace('_spider', '')}.yaml"
+                self.spider_classes[spider_name] = (spider_class, config_path)
+            except (ImportError, AttributeError) as e:
+                self.logger.error(f"无法导入爬虫: {spider_name} - {str(e)}")
+                return None
+        
+        # 创建爬虫实例
+        spider = spider_class(config_path)
+        self._apply_download_delay(spider)
+        return spider
+    
+    def _acquire_spider(self, spider_name):
+        """从实例池取出可用的爬虫，配置文件已修改的实例会被丢弃"""
+        with self.spider_pool_lock:
+            idle = self.idle_spiders.get(spider_name, [])
+            while idle:
+                spider = idle.pop()
+                if not hasattr(spider, 'is_config_current') or spider.is_config_current():
+                    return spider
+                self.logger.info(f"爬虫配置已修改，重新创建实例: {spider_name}")
+        return self._create_spider(spider_name)
+    
+    def _release_spider(self, spider_name, spider):
+        """爬取结束后将爬虫放回实例池"""
+        if spider is None:
+            return
+        # 清理单次爬取的状态
+        spider.current_section = None
+        with self.spider_pool_lock:
+            idle = self.idle_spiders.setdefault(spider_name, [])
+            if len(idle) < self.spider_pool_size:
+                idle.append(spider)
+    
+    def start_crawling_with_url(self, spider_name, url, section_name=None, prefetched=None):
+        """使用指定URL启动爬虫
+        
+        Args:
+            prefetched: 监测器已下载的列表页(url/body/headers/encoding)，提供时不再重复下载
+        """
         self.logger.info(f"启动爬虫: {spider_name} - {url}")
         
+        spider = None
         try:
-            # 动态导入爬虫类
-            try:
-                # 先尝试从SPIDERS字典中加载
-                spider_class, config_path = self.load_spider(spider_name)
-            except (ValueError, KeyError) as e:
-                self.logger.warning(f"从SPIDERS字典加载爬虫失败: {str(e)}，尝试直接导入")
-                # 如果在SPIDERS中找不到，尝试直接导入
-                module_name = f"spiders.{spider_name}"
-                if spider_name.endswith('_spider'):
-                    module_name = f"spiders.{spider_name}"
-                else:
-                    module_name = f"spiders.{spider_name}_spider"
-                    
-                try:
-                    module = importlib.import_module(module_name)
-                    # 获取爬虫类名（通常是蛇形命名转驼峰命名）
-                    class_name = ''.join(word.capitalize() for word in spider_name.split('_'))
-                    if not class_name.endswith('Spider'):
-                        class_name += 'Spider'
-                    spider_class = getattr(module, class_name)
-                    config_path = f"config/spiders/{spider_name.replace('_spider', '')}.yaml"
-                except (ImportError, AttributeError) as e:
-                    self.logger.error(f"无法导入爬虫: {spider_name} - {str(e)}")
-                    return False
-            
-            # 创建爬虫实例
-            spider = spider_class(config_path)
+            spider = self._acquire_spider(spider_name)
+            if spider is None:
+                return False
             
             # 执行爬取
-            return self._execute_crawl(spider, url, section_name)
+            return self._execute_crawl(spider, url, section_name, prefetched)
             
         except Exception as e:
             self.logger.error(f"启动爬虫失败: {spider_name} - {url} - {str(e)}")
             return False
+        finally:
+            self._release_spider(spider_name, spider)
+    
+    def start_crawling_details(self, spider_name, detail_urls, section_name=None):
+        """只爬取给定的详情页，用于列表页增量更新"""
+        self.logger.info(f"启动增量爬取: {spider_name} - {len(detail_urls)} 个详情页")
+        
+        spider = None
+        try:
+            spider = self._acquire_spider(spider_name)
+            if spider is None:
+                return False
+            
+            # 设置当前栏目
+            if section_name:
+                spider.current_section = section_name
+            
+            from utils.downloader import PageDownloader
+            downloader = PageDownloader()
+            
+            # 已入库的详情页不再下载
+            new_urls = get_seen_index().filter_new(detail_urls)
+            if len(new_urls) < len(detail_urls):
+                self.logger.info(f"跳过已入库的详情页 {len(detail_urls) - len(new_urls)} 个: {spider_name}")
+            detail_urls = new_urls
+            
+            crawled = self._crawl_details(spider, downloader, detail_urls)
+            
+            self.logger.info(f"增量爬取完成: {spider_name} - 成功 {crawled}/{len(detail_urls)} 个详情页")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"增量爬取失败: {spider_name} - {str(e)}")
+            return False
+        finally:
+            self._release_spider(spider_name, spider)
+    
+    def close(self):
+        """关闭详情页下载线程池"""
+        self.download_pool.shutdown(wait=False)
     
-    def _execute_crawl(self, spider, url, section_name=None):
+    def _execute_crawl(self, spider, url, section_name=None, prefetched=None):
         """执行爬虫爬取任务"""
         try:
             # 设置当前栏目
-            if hasattr(spider, 'current_section') and section_name:
+            if section_name:
                 spider.current_section = section_name
             
-            # 启动爬虫
-            result = spider.start_requests(start_urls=[url])
+            # 启动爬虫：自定义入口的爬虫自行处理，否则由引擎解析列表页
+            if hasattr(spider, 'start_requests'):
+                spider.start_requests(start_urls=[url], prefetched=prefetched)
+            else:
+                self._crawl_list(spider, url, prefetched)
             return True
         except Exception as e:
             self.logger.error(f"执行爬虫任务失败: {str(e)}")
\ No newline at end of file
@@ -1,29 +1,196 @@
 import re
 import json
 import os
+import atexit
+import threading
 from datetime import datetime
-import urllib.parse
-from utils.link_manager import LinkPoolManager
+from functools import partial
+from utils.logger import setup_logger
+from utils.section_resolver import get_section_resolver
+from utils.seen_index import get_seen_index
+from core.segment_store import SegmentStore
+from core.sqlite_store import SqlitePolicyStore, POLICY_COLLECTION
+from core.content_catalog import ContentCatalog, content_key
+from config.settings import DATA_PATHS, STORAGE_SETTINGS
 
 class DBClient:
     def __init__(self, storage_type='file', base_path='data/policy_data'):
         self.storage_type = storage_type
         self.base_path = base_path
         self.db_type = 'default'
+        self.logger = setup_logger('DBClient')
         os.makedirs(base_path, exist_ok=True)
-        # 初始化链接管理器
-        self.link_manager = LinkPoolManager()
-        # 缓存URL与栏目名称的映射
-        self.url_section_cache = {}
+        # 根据链接库栏目确定详情页所属栏目
+        self.section_resolver = get_section_resolver()
+        # 已入库详情页URL索引，避免重复保存同一政策
+        self.seen_index = get_seen_index()
+        # 按内容哈希寻址的政策目录，相同内容只保存一份
+        self.catalog = ContentCatalog(os.path.join(base_path, 'catalog.db'))
+        # 已写入缓冲、尚未写盘的内容哈希；写盘后才记录到目录和已入库索引
+        self.uncommitted = set()
+        self.uncommitted_lock = threading.Lock()
+        # 分段存储：所有记录追加写入 base_path/segments 下的JSONL分段
+        self.segment_store = None
+        if storage_type == 'segment':
+            self.segment_store = SegmentStore.from_settings(os.path.join(base_path, 'segments'),
+                                                            STORAGE_SETTINGS.get('segment'))
+        # SQLite存储：政策及其他数据保存到 base_path/policies.db，支持索引查询和全文检索
+        self.sqlite_store = None
+        if storage_type == 'sqlite':
+            self.sqlite_store = SqlitePolicyStore.from_settings(os.path.join(base_path, 'policies.db'),
+                                                                STORAGE_SETTINGS.get('sqlite'))
 
     def save_policy(self, data):
+        """保存政策，内容已保存过时只记录引用
+        
+        Returns:
+            bool: 是否写入了新内容
+        """
+        source_url = data.get('source_url')
+        content_hash = self._content_hash(data)
+        if not self._is_new_content(data, content_hash):
+            return False
+        
+        section_name = self._resolve_section(data)
+        on_commit = partial(self._on_committed, source_url, content_hash, section_name, self._content_size(data))
         if self.storage_type == 'file':
-            self._save_to_file(data)
+            on_commit(self._save_to_file(data, content_hash))
+            return True
+        
+        # 缓冲写入的存储在写盘后才记录目录和已入库索引，写盘前崩溃时下次仍会重新保存
+        with self.uncommitted_lock:
+            self.uncommitted.add(content_hash)
+        if self.storage_type == 'segment':
+            self.segment_store.append(self.db_type, section_name, str(datetime.today().date()), data,
+                                      on_commit=on_commit)
+        elif self.storage_type == 'sqlite':
+            self.sqlite_store.save_policy(self.db_type, section_name, data, content_hash, on_commit=on_commit)
+        return True
+    
+    def _on_committed(self, source_url, content_hash, section_name, size, location=None):
+        """内容写盘后记录到目录和已入库索引"""
+        self.catalog.add_object(source_url, content_hash, section_name, location, size)
+        if source_url:
+            self.seen_index.add(source_url, content_hash)
+        with self.uncommitted_lock:
+            self.uncommitted.discard(content_hash)
+    
+    def _is_new_content(self, data, content_hash):
+        """判断政策内容是否需要写入
+        
+        同一URL内容未变化，或相同内容已经保存过（如其他栏目转载）时，
+        只在目录中更新时间戳和引用次数；URL内容变化时作为新版本写入。
+        """
+        source_url = data.get('source_url')
+        with self.uncommitted_lock:
+            # 相同内容已在缓冲中等待写盘
+            if content_hash in self.uncommitted:
+                return False
+        if source_url and self.seen_index.contains(source_url, content_hash):
+            self.catalog.add_reference(source_url, content_hash)
+            return False
+        if self.catalog.lookup(content_hash) is not None:
+            self.catalog.add_reference(source_url, content_hash, self._resolve_section(data))
+            if source_url:
+                self.seen_index.add(source_url, content_hash)
+            return False
+        return True
+    
+    def _content_size(self, data):
+        return len(json.dumps(data, ensure_ascii=False).encode('utf-8'))
+    
+    def dedup_stats(self):
+        """获取政策内容去重统计（保存次数、不同内容数、版本数、去重率）"""
+        return self.catalog.stats()
+    
+    def save_document(self, collection, data):
+        """保存非政策类数据（如人员信息）到指定集合"""
+        if self.storage_type == 'segment':
+            self.segment_store.append(collection, collection, str(datetime.today().date()), data)
+            return True
+        if self.storage_type == 'sqlite':
+            return self.sqlite_store.save_document(collection, data)
         
-    def _save_to_file(self, data):
-        # 修复文件名生成逻辑
+        save_path = os.path.join(self.base_path, collection, str(datetime.today().date()))
+        os.makedirs(save_path, exist_ok=True)
+        filename = f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.json"
+        with open(os.path.join(save_path, filename), 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        return True
+    
+    def insert_many(self, collection, records):
+        """批量保存数据，collection为POLICY_COLLECTION时按政策保存（跳过已入库的政策）
+        
+        Returns:
+            int: 实际保存的条数
+        """
+        if collection != POLICY_COLLECTION:
+            if self.storage_type == 'sqlite':
+                return self.sqlite_store.insert_many(collection, records)
+            for record in records:
+                self.save_document(collection, record)
+            return len(records)
+        
+        if self.storage_type != 'sqlite':
+            return sum(1 for record in records if self.save_policy(record))
+        
+        new_records, content_hashes, batch_hashes = [], [], set()
+        for record in records:
+            content_hash = self._content_hash(record)
+            # 同一批次中重复的内容只写入一次
+            if content_hash in batch_hashes or not self._is_new_content(record, content_hash):
+                continue
+            batch_hashes.add(content_hash)
+            new_records.append(record)
+            content_hashes.append(content_hash)
+        section_names = [self._resolve_section(record) for record in new_records]
+        callbacks = [partial(self._on_committed, record.get('source_url'), content_hash, section_name,
+                             self._content_size(record))
+                     for record, content_hash, section_name in zip(new_records, content_hashes, section_names)]
+        with self.uncommitted_lock:
+            self.uncommitted.update(content_hashes)
+        self.sqlite_store.insert_many(POLICY_COLLECTION, new_records, self.db_type, section_names, content_hashes,
+                                      callbacks)
+        return len(new_records)
+    
+    def iter_policies(self, section_name=None, date=None):
+        """按栏目和保存日期读取已保存的政策（分段存储/SQLite存储），其他存储类型不返回记录"""
+        if self.segment_store is not None:
+            for record in self.segment_store.iter_records(self.db_type, section_name, date):
+                yield record['data']
+        elif self.sqlite_store is not None:
+            yield from self.sqlite_store.query_policies(section_name=section_name, saved_date=date,
+                                                        db_type=self.db_type)
+        else:
+            self.logger.warning(f"存储类型 {self.storage_type} 不支持按栏目读取，返回空结果")
+    
+    def search_policies(self, query, limit=20):
+        """全文检索政策标题和正文（仅SQLite存储），其他存储类型返回空列表"""
+        if self.sqlite_store is None:
+            self.logger.warning(f"存储类型 {self.storage_type} 不支持全文检索，返回空结果")
+            return []
+        return self.sqlite_store.search(query, limit)
+    
+    def close(self):
+        """写入缓冲中的数据并关闭存储"""
+        if self.segment_store is not None:
+            self.segment_store.close()
+        if self.sqlite_store is not None:
+            self.sqlite_store.close()
+        self.catalog.close()
+    
+    def _resolve_section(self, data):
+        """优先使用传入的栏目名称，否则根据URL确定"""
+        return data.get('section_name') or self._get_section_name(data.get('source_url', ''))
+    
+    def _content_hash(self, data):
+        """计算规范化后标题和正文的内容哈希，用于去重和判断已入库页面内容是否变化"""
+        return content_key(data.get('title'), data.get('content'))
+        
+    def _save_to_file(self, data, content_hash):
+        # 修复文件名生成逻辑，附带内容哈希前缀，同一秒保存的不同内容不会互相覆盖
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{data.get('publish_date', 'nodate')}_{timestamp}.json"
+        filename = f"{data.get('publish_date', 'nodate')}_{timestamp}_{content_hash[:8]}.json"
         
         # 清理文件名中的非法字符
         filename = re.sub(r'[\\/:*?"<>|]', '_', filename)
@@ -40,52 +207,28 @@ class DBClient:
         save_path = os.path.join(self.base_path, self.db_type, section_name, str(datetime.today().date()))
         os.makedirs(save_path, exist_ok=True)
         
-        with open(os.path.join(save_path, filename), 'w', encoding='utf-8') as f:
+        file_path = os.path.join(save_path, filename)
+        with open(file_path, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
+        return file_path
     
     def _get_section_name(self, url):
-        """根据URL动态确定政策栏目名称"""
-        # 先检查缓存
-        if url in self.url_section_cache:
-            return self.url_section_cache[url]
-        
-        # 解析URL路径
-        path = urllib.parse.urlparse(url).path
-        
-        # 从所有已知的链接库中查找匹配
-        for site_name in self._get_all_site_names():
-            links = self.link_manager.get_site_links(site_name)
-            for link in links:
-                link_url = link.get('url', '')
-                link_path = urllib.parse.urlparse(link_url).path
-                
-                # 如果URL路径包含链接路径，则认为属于该栏目
-                if link_path and link_path in path:
-                    section_name = link.get('name', '未知栏目')
-                    # 缓存结果
-                    self.url_section_cache[url] = section_name
-                    return section_name
-        
-        # 如果没有匹配的栏目，使用URL的最后一级目录名
-        parts = [p for p in path.split('/') if p]
-        if parts:
-            section_name = parts[-1]
-            self.url_section_cache[url] = section_name
-            return section_name
-        
-        # 默认返回"其他"
-        return "其他"
-    
-    def _get_all_site_names(self):
-        """获取所有已知的网站名称"""
-        # 获取链接库目录下的所有文件
-        link_pool_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'link_pool')
-        if not os.path.exists(link_pool_dir):
-            return []
-            
-        site_names = []
-        for filename in os.listdir(link_pool_dir):
-            if filename.endswith('.json') or filename.endswith('.csv'):
-                site_names.append(os.path.splitext(filename)[0])
-        
-        return site_names
\ No newline at end of file
+        """根据URL动态确定政策栏目名称（链接库栏目前缀树最长前缀匹配）"""
+        return self.section_resolver.resolve(url)
+
+
+_db_client = None
+_db_client_lock = threading.Lock()
+
+
+def get_db_client():
+    """获取进程内共享的存储客户端（按STORAGE_SETTINGS选择存储类型），首次使用时创建"""
+    global _db_client
+    if _db_client is None:
+        with _db_client_lock:
+            if _db_client is None:
+                _db_client = DBClient(storage_type=STORAGE_SETTINGS.get('storage_type', 'file'),
+                                      base_path=DATA_PATHS.get('policy_data', 'data/policy_data'))
+                # 进程退出时写入缓冲中的数据
+                atexit.register(_db_client.close)
+    return _db_client
\ No newline at end of file
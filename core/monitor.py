@@ -1,92 +1,177 @@
 import os
+import re
 import time
+import random
 import hashlib
 import threading
 import requests
 import logging
 import json
-import csv
-import pandas as pd
-import functools  # 添加这一行
 from datetime import datetime, timedelta
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urljoin
+from lxml import etree, html as lxml_html
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 from utils.validator import WebPageValidator
-from utils.anti_spider import get_random_ua, get_proxy, random_delay
+from utils.anti_spider import get_random_ua, get_proxy
+from utils.http_pool import session_registry
+from utils.head_policy import HeadPolicy
+from utils.rate_limiter import rate_limiter
+from utils.circuit_breaker import circuit_breaker
+from utils.fingerprint import FingerprintEngine, hamming_distance
+from utils.status_journal import get_link_pool_journal
+from utils.link_pool_loader import LinkPoolLoader
 from core.crawler import CrawlerEngine
 from core.scheduler import TaskScheduler
+from core.async_engine import AsyncCheckEngine
+from core.state_store import SectionStateStore
+from core.archiver import PolicyArchiver
+from spiders import SPIDERS
+from spiders.base_spider import config_version, load_spider_config
+from spiders.rules import compile_rules
+from config.settings import MONITOR_SETTINGS, DATA_PATHS, FINGERPRINT_SETTINGS, ARCHIVE_SETTINGS
 from utils.logger import setup_logger
 
+# 匹配页面meta标签中声明的字符集
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+# 不属于栏目配置的字段：监测状态、运行期字段和爬取时间，对比链接库变化时忽略
+RUNTIME_FIELDS = frozenset(SectionStateStore.STATE_FIELDS) | {'retry_count', 'last_crawled'}
+
 class LinkPoolHandler(FileSystemEventHandler):
-    """监听链接库文件变化的处理器"""
+    """监听链接库文件变化的处理器
     
-    def __init__(self, monitor):
+    编辑器保存或json.dump写入时同一文件会产生多个事件，事件按文件去抖，
+    最后一个事件后静默debounce秒才处理一次；监测器自身写回的文件不触发重新加载。
+    """
+    
+    def __init__(self, monitor, debounce=1.0):
         self.monitor = monitor
+        self.debounce = debounce
         self.logger = setup_logger('LinkPoolHandler')
+        self.lock = threading.Lock()
+        self.timers = {}  # 文件路径 -> 等待处理的定时器
     
     def on_modified(self, event):
         """当链接库文件被修改时触发"""
-        if event.is_directory:
+        if not event.is_directory:
+            self._schedule(event.src_path)
+    
+    def on_created(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+    
+    def on_moved(self, event):
+        """临时文件替换为链接库文件（原子写入）时触发"""
+        if not event.is_directory:
+            self._schedule(event.dest_path)
+    
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self._schedule(event.src_path)
+    
+    def _schedule(self, file_path):
+        """重置该文件的去抖定时器"""
+        filename = os.path.basename(file_path)
+        # 忽略隐藏文件（原子写入的临时文件）和非链接库文件
+        if filename.startswith('.') or os.path.splitext(filename)[1] not in ('.json', '.csv'):
             return
-            
-        file_path = event.src_path
-        self.logger.info(f"检测到链接库文件变化: {file_path}")
+        with self.lock:
+            timer = self.timers.get(file_path)
+            if timer:
+                timer.cancel()
+            timer = threading.Timer(self.debounce, self._process, args=(file_path,))
+            timer.daemon = True
+            self.timers[file_path] = timer
+            timer.start()
+    
+    def _process(self, file_path):
+        with self.lock:
+            self.timers.pop(file_path, None)
         
-        # 从文件名提取网站名称
-        filename = os.path.basename(file_path)
-        site_name = os.path.splitext(filename)[0]
+        if self.monitor.status_journal.is_own_write(file_path):
+            self.logger.debug(f"忽略监测器自身写回的链接库文件: {file_path}")
+            return
         
-        # 通知监测器重新加载并检查该网站
-        self.monitor.reload_site(site_name)
-        self.monitor.check_site_update(site_name)
+        self.logger.info(f"检测到链接库文件变化: {file_path}")
+        # 从文件名提取网站名称，通知监测器重新加载并只调度变化的栏目
+        site_name = os.path.splitext(os.path.basename(file_path))[0]
+        try:
+            self.monitor.apply_site_change(site_name)
+        except Exception as e:
+            self.logger.error(f"处理链接库文件变化失败: {file_path} - {str(e)}")
+    
+    def cancel(self):
+        """取消所有等待处理的事件"""
+        with self.lock:
+            for timer in self.timers.values():
+                timer.cancel()
+            self.timers.clear()
 
 class PolicyMonitor:
     """政策网站监测器"""
     
-    def __init__(self, link_pool_dir='data/link_pool', check_interval=300, verify_ssl=True):
+    def __init__(self, link_pool_dir='data/link_pool', check_interval=300, verify_ssl=True,
+                 engine=None, max_concurrency=None, per_host_concurrency=None, detection_mode=None,
+                 state_db=None):
         self.logger = setup_logger('PolicyMonitor')
         self.link_pool_dir = link_pool_dir
         self.default_check_interval = check_interval
+        self.pool_loader = LinkPoolLoader(check_interval)
         self.sites = {}
         self.validator = WebPageValidator()
         self.crawler_engine = CrawlerEngine()
-        self.scheduler = TaskScheduler(self)
+        self.scheduler = TaskScheduler(self, MONITOR_SETTINGS.get('stats_interval', 3600))
         self.running = False
         self.observer = None
+        self.pool_handler = None
         self.verify_ssl = verify_ssl  # 添加SSL验证控制
+        self.status_journal = get_link_pool_journal()  # 链接库状态延迟写回
+
+        # 检查引擎: thread为逐个检查, async为asyncio并发检查
+        self.engine = engine or MONITOR_SETTINGS.get('engine', 'thread')
+        self.async_engine = None
+        if self.engine == 'async':
+            self.async_engine = AsyncCheckEngine(
+                self,
+                max_concurrency=max_concurrency or MONITOR_SETTINGS.get('async_max_concurrency', 20),
+                per_host_concurrency=per_host_concurrency or MONITOR_SETTINGS.get('async_per_host_concurrency', 2)
+            )
+            self.logger.info(f"使用异步检查引擎: 全局并发 {self.async_engine.max_concurrency}, "
+                             f"单主机并发 {self.async_engine.per_host_concurrency}")
+
+        # 按主机共享的会话注册表，复用连接
+        self.http_pool = session_registry
+        
+        # 变化检测模式: conditional_get为单次条件GET, head为先HEAD后GET
+        self.detection_mode = detection_mode or MONITOR_SETTINGS.get('detection_mode', 'conditional_get')
+        self.head_policy = HeadPolicy()
         
-        # 创建一个自定义会话对象，用于处理特殊网站
-        self.custom_session = self._create_custom_session()
+        # 按主机限速，与爬虫共享；配额不足时推迟检查而不是阻塞等待
+        self.rate_limiter = rate_limiter
+        
+        # 按主机熔断，主机不可用时该主机所有栏目直接跳过
+        self.circuit_breaker = circuit_breaker
         
         # 确保链接库目录存在
         os.makedirs(link_pool_dir, exist_ok=True)
         
-        # 加载所有站点配置
-        self.load_all_sites()
-    
-    def _create_custom_session(self):
-        """创建一个自定义的requests会话对象，用于处理特殊网站"""
-        session = requests.Session()
+        # 栏目状态持久化存储，加载站点时恢复指纹、校验头和调度时间
+        self.state_store = SectionStateStore(state_db or DATA_PATHS.get('monitor_state', 'data/monitor_state.db'))
         
-        # 配置更宽松的SSL设置
-        from requests.packages.urllib3.util.ssl_ import create_urllib3_context
-        context = create_urllib3_context()
-        context.options |= 0x4  # OP_LEGACY_SERVER_CONNECT
-        session.mount('https://', requests.adapters.HTTPAdapter(max_retries=5, pool_connections=10, pool_maxsize=10))
+        # 各爬虫列表页预编译的详情链接XPath {爬虫: (配置版本, XPath)}，用于增量对比列表页链接
+        self.link_rules = {}
         
-        # 设置默认超时时间
-        session.request = functools.partial(session.request, timeout=30)
+        # 政策数据定时归档（ARCHIVE_SETTINGS['enabled']时在启动服务时创建）
+        self.archiver = None
         
-        # 设置默认请求头
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-        })
+        # 变化分类统计：细微变化跳过的爬取及节省的下载次数
+        self.change_stats = {'changes': 0, 'suppressed_crawls': 0, 'saved_downloads': 0}
+        self.stats_lock = threading.Lock()
         
-        return session
+        # 加载所有站点配置
+        self.load_all_sites()
     
     def _check_section_update(self, site_name, section):
         """检查站点特定栏目的更新"""
@@ -95,102 +180,29 @@ class PolicyMonitor:
         if not url:
             return False
         
-        try:
-            # 准备请求头
-            headers = {
-                'User-Agent': get_random_ua(),
-                'Accept': 'text/html,application/xhtml+xml',
-                'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8',
-            }
-            
-            # 添加条件请求头
-            if section.get('last_modified'):
-                headers['If-Modified-Since'] = section['last_modified']
-            if section.get('etag'):
-                headers['If-None-Match'] = section['etag']
-            
-            # 获取代理
-            proxies = get_proxy() if self.validator.should_use_proxy(url) else None
-            
-            # 特殊网站处理
-            use_custom_session = False
-            if 'sz.gov.cn' in url or 'wanxin20.github.io' in url:
-                use_custom_session = True
-                self.logger.info(f"使用自定义会话处理特殊网站: {url}")
-            
-            # 发送HEAD请求检查更新，使用verify_ssl参数
-            # 添加重试机制
-            max_retries = 5  # 增加重试次数
-            retry_count = 0
-            while retry_count < max_retries:
-                try:
-                    if use_custom_session:
-                        # 使用自定义会话
-                        response = self.custom_session.head(
-                            url, 
-                            headers=headers, 
-                            proxies=proxies, 
-                            allow_redirects=True, 
-                            verify=False  # 禁用SSL验证
-                        )
-                    else:
-                        # 使用标准请求
-                        response = requests.head(
-                            url, 
-                            headers=headers, 
-                            proxies=proxies, 
-                            timeout=15, 
-                            allow_redirects=True, 
-                            verify=False  # 禁用SSL验证
-                        )
-                    break  # 请求成功，跳出循环
-                except (requests.exceptions.ConnectionError, requests.exceptions.SSLError) as e:
-                    retry_count += 1
-                    if retry_count >= max_retries:
-                        raise  # 重试次数用完，抛出异常
-                    self.logger.warning(f"请求失败，正在重试({retry_count}/{max_retries}): {site_name} - {section_name} ({url}) - {str(e)}")
-                    time.sleep(2 * retry_count)  # 指数退避，等待时间随重试次数增加
-            
-            # 更新下次检查时间
-            section['next_check'] = datetime.now().timestamp() + section.get('check_interval', self.default_check_interval)
-            
-            # 处理响应
-            if response.status_code == 304:
-                self.logger.info(f"[未更新] {site_name} - {section_name} ({url})")
-                return False
-            
-            # 如果服务器返回200，需要进一步验证内容是否变化
-            if response.status_code == 200:
-                # 保存响应头信息
-                if 'Last-Modified' in response.headers:
-                    section['last_modified'] = response.headers['Last-Modified']
-                if 'ETag' in response.headers:
-                    section['etag'] = response.headers['ETag']
-                
-                # 获取完整内容并验证哈希
-                content_changed = self._verify_content_change(url, section)
-                
-                if content_changed:
-                    self.logger.info(f"[内容更新] {site_name} - {section_name} ({url})")
-                    self._trigger_crawler(site_name, url, section_name)
-                    self._update_site_status(site_name)
-                    return True
-                else:
-                    self.logger.info(f"[内容未变] {site_name} - {section_name} ({url})")
-                    return False
-            
-            self.logger.warning(f"[检查异常] {site_name} - {section_name} ({url}) - HTTP状态码: {response.status_code}")
-            return False
-            
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"请求异常: {site_name} - {section_name} ({url}) - {str(e)}")
-            # 请求失败时使用指数退避策略
-            backoff = min(section.get('check_interval', self.default_check_interval) * 2, 86400)  # 最长一天
-            section['next_check'] = datetime.now().timestamp() + backoff
-            return False
-        except Exception as e:
-            self.logger.error(f"检查更新异常: {site_name} - {section_name} ({url}) - {str(e)}")
-            return False
+        # 特殊网站使用更长的超时时间
+        timeout = 15
+        if 'sz.gov.cn' in url or 'wanxin20.github.io' in url:
+            timeout = 30
+        
+        # 检测内容是否更新，禁用SSL验证，失败时重试
+        label = f"{site_name} - {section_name}"
+        content_changed, page = self._detect_update(
+            label, url, section,
+            verify=False, timeout=timeout, max_retries=5
+        )
+        new_links = self._diff_section_links(site_name, url, page, section_name)
+        if content_changed:
+            content_changed = self._classify_change(label, site_name, url, section, page, new_links)
+        self.state_store.save(site_name, section)
+        
+        if content_changed:
+            self.logger.info(f"[内容更新] {site_name} - {section_name} ({url})")
+            self._trigger_crawler(site_name, url, section_name, detail_urls=new_links, page=page)
+            self._update_site_status(site_name, url)
+            return True
+        return False
+    
     def _check_site_update_direct(self, site_name, site_data):
         """检查单链接站点的更新"""
         url = site_data.get('url')
@@ -199,6 +211,58 @@ class PolicyMonitor:
         
         self.logger.info(f"检查更新: {site_name} ({url})")
         
+        # 检测内容是否更新，使用verify_ssl参数
+        content_changed, page = self._detect_update(
+            site_name, url, site_data,
+            verify=self.verify_ssl, timeout=15, max_retries=1
+        )
+        new_links = self._diff_section_links(site_name, url, page)
+        if content_changed:
+            content_changed = self._classify_change(site_name, site_name, url, site_data, page, new_links)
+        self.state_store.save(site_name, site_data)
+        
+        if content_changed:
+            self.logger.info(f"[内容更新] {site_name} ({url})")
+            self._trigger_crawler(site_name, url, detail_urls=new_links, page=page)
+            self._update_site_status(site_name)
+            return True
+        return False
+    
+    def _detect_update(self, label, url, data, verify=False, timeout=15, max_retries=1):
+        """检测页面内容是否更新
+        
+        conditional_get模式下只发送一次携带ETag/Last-Modified的条件GET，
+        响应体边下载边解析并计算指纹；仅对学习到"HEAD有用"的主机先发HEAD。
+        head模式保持先HEAD后GET的旧流程。
+        
+        Args:
+            label: 日志中显示的站点/栏目名称
+            url: 目标URL
+            data: 栏目或站点配置，保存校验头、哈希和下次检查时间
+            verify: 是否验证SSL证书
+            timeout: 请求超时时间（秒）
+            max_retries: 连接失败时的最大尝试次数
+            
+        Returns:
+            tuple: (内容是否发生变化, 已下载的页面)，未获取到页面时为None
+        """
+        # 主机已熔断时推迟到探测时间，不再占用检查线程；先于限速检查，熔断跳过时不消耗配额
+        wait = self.circuit_breaker.before_request(url)
+        if wait > 0:
+            data['next_check'] = datetime.now().timestamp() + wait
+            self.logger.info(f"[熔断跳过] {label} ({url}) - {wait:.0f}秒后重试")
+            return False, None
+        
+        # 主机配额不足时推迟到可请求的时间，由调度器重新派发
+        wait = self.rate_limiter.reserve(url)
+        if wait > 0:
+            # 请求没有发出，归还半开状态下放行的探测机会
+            self.circuit_breaker.release_probe(url)
+            data['next_check'] = datetime.now().timestamp() + wait
+            self.logger.debug(f"[限速推迟] {label} ({url}) - {wait:.1f}秒后检查")
+            return False, None
+        
+        data['last_checked'] = datetime.now().timestamp()
         try:
             # 准备请求头
             headers = {
@@ -208,58 +272,232 @@ class PolicyMonitor:
             }
             
             # 添加条件请求头
-            if site_data.get('last_modified'):
-                headers['If-Modified-Since'] = site_data['last_modified']
-            if site_data.get('etag'):
-                headers['If-None-Match'] = site_data['etag']
+            if data.get('last_modified'):
+                headers['If-Modified-Since'] = data['last_modified']
+            if data.get('etag'):
+                headers['If-None-Match'] = data['etag']
             
-            # 获取代理(如果启用)
+            # 获取代理
             proxies = get_proxy() if self.validator.should_use_proxy(url) else None
             
-            # 发送HEAD请求检查更新
-            response = requests.head(url, headers=headers, proxies=proxies, 
-                                    timeout=15, allow_redirects=True, verify=self.verify_ssl)
+            # 使用按主机共享的会话，复用已建立的连接
+            session = self.http_pool.get_session(url)
+            host = urlparse(url).netloc
             
-            # 更新下次检查时间
-            site_data['next_check'] = datetime.now().timestamp() + site_data.get('check_interval', self.default_check_interval)
+            if self.detection_mode == 'head' or self.head_policy.should_head(host):
+                return self._detect_update_with_head(
+                    label, url, data, session, host, headers, proxies, verify, timeout, max_retries
+                )
             
-            # 处理响应
-            if response.status_code == 304:
-                self.logger.info(f"[未更新] {site_name} ({url})")
-                return False
+            # 发送单次条件GET，流式读取响应体
+            response = session.get(
+                url, headers=headers, proxies=proxies, timeout=timeout,
+                allow_redirects=True, verify=verify, stream=True
+            )
             
-            # 如果服务器返回200，需要进一步验证内容是否变化
-            if response.status_code == 200:
-                # 保存响应头信息
-                if 'Last-Modified' in response.headers:
-                    site_data['last_modified'] = response.headers['Last-Modified']
-                if 'ETag' in response.headers:
-                    site_data['etag'] = response.headers['ETag']
+            try:
+                self._record_health(url, response)
                 
-                # 获取完整内容并验证哈希
-                content_changed = self._verify_content_change(url, site_data)
+                # 更新下次检查时间
+                data['next_check'] = datetime.now().timestamp() + data.get('check_interval', self.default_check_interval)
+                data['failure_count'] = 0
+                data.pop('retry_count', None)
                 
-                if content_changed:
-                    self.logger.info(f"[内容更新] {site_name} ({url})")
-                    self._trigger_crawler(site_name, url)
-                    self._update_site_status(site_name)
-                    return True
-                else:
-                    self.logger.info(f"[内容未变] {site_name} ({url})")
-                    return False
-            
-            self.logger.warning(f"[检查异常] {site_name} ({url}) - HTTP状态码: {response.status_code}")
-            return False
+                # 处理响应
+                if response.status_code == 304:
+                    self.head_policy.record_get(host, headers, response)
+                    self.logger.info(f"[未更新] {label} ({url})")
+                    return False, None
+                
+                if response.status_code == 200:
+                    self._save_validators(data, response.headers)
+                    page = self._read_page(response)
+                    content_changed = self._compare_fingerprint(url, data, page)
+                    # 校验头未变时按内容指纹判断主机是否真的忽略了条件GET
+                    self.head_policy.record_get(host, headers, response, content_changed)
+                    if not content_changed:
+                        self.logger.info(f"[内容未变] {label} ({url})")
+                    return content_changed, page
+                
+                self.head_policy.record_get(host, headers, response)
+                self.logger.warning(f"[检查异常] {label} ({url}) - HTTP状态码: {response.status_code}")
+                return False, None
+            finally:
+                response.close()
             
         except requests.exceptions.RequestException as e:
-            self.logger.error(f"请求异常: {site_name} ({url}) - {str(e)}")
+            data['failure_count'] = data.get('failure_count', 0) + 1
+            self.circuit_breaker.record_failure(url)
+            
+            # 主机已熔断，推迟到探测时间
+            wait = self.circuit_breaker.retry_after(url)
+            if wait > 0:
+                data.pop('retry_count', None)
+                data['next_check'] = datetime.now().timestamp() + wait
+                self.logger.error(f"请求异常，主机已熔断: {label} ({url}) - {str(e)}")
+                return False, None
+            
+            # 连接失败时推迟重试，不阻塞调度线程
+            if isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.SSLError)):
+                retry_count = data.get('retry_count', 0) + 1
+                if retry_count < max_retries:
+                    data['retry_count'] = retry_count
+                    data['next_check'] = datetime.now().timestamp() + 2 * retry_count  # 等待时间随重试次数增加
+                    self.logger.warning(f"请求失败，{2 * retry_count}秒后重试({retry_count}/{max_retries}): {label} ({url}) - {str(e)}")
+                    return False, None
+            data.pop('retry_count', None)
+            
+            self.logger.error(f"请求异常: {label} ({url}) - {str(e)}")
             # 请求失败时使用指数退避策略
-            backoff = min(site_data.get('check_interval', self.default_check_interval) * 2, 86400)  # 最长一天
-            site_data['next_check'] = datetime.now().timestamp() + backoff
-            return False
+            backoff = min(data.get('check_interval', self.default_check_interval) * 2, 86400)  # 最长一天
+            data['next_check'] = datetime.now().timestamp() + backoff
+            return False, None
         except Exception as e:
-            self.logger.error(f"检查更新异常: {site_name} ({url}) - {str(e)}")
+            self.logger.error(f"检查更新异常: {label} ({url}) - {str(e)}")
+            return False, None
+    
+    def _detect_update_with_head(self, label, url, data, session, host, headers, proxies, verify, timeout, max_retries):
+        """先发送HEAD请求，再按需获取完整内容"""
+        response = session.head(
+            url, headers=headers, proxies=proxies, timeout=timeout,
+            allow_redirects=True, verify=verify
+        )
+        self.head_policy.record_head(host, response)
+        self._record_health(url, response)
+        
+        # 更新下次检查时间
+        data['next_check'] = datetime.now().timestamp() + data.get('check_interval', self.default_check_interval)
+        data['failure_count'] = 0
+        data.pop('retry_count', None)
+        
+        # 处理响应
+        if response.status_code == 304:
+            self.logger.info(f"[未更新] {label} ({url})")
+            return False, None
+        
+        # 如果服务器返回200，需要进一步验证内容是否变化
+        if response.status_code == 200:
+            # 主机忽略条件请求时，在本地比较校验头，未变化则省去GET
+            if self.detection_mode != 'head' and self._validators_unchanged(data, response.headers):
+                self.head_policy.record_head_only(host)
+                self.logger.info(f"[未更新] {label} ({url})")
+                return False, None
+            
+            # 保存响应头信息
+            self._save_validators(data, response.headers)
+            
+            # 获取完整内容并验证哈希
+            content_changed, page = self._verify_content_change(url, data, session)
+            if not content_changed:
+                self.logger.info(f"[内容未变] {label} ({url})")
+            return content_changed, page
+        
+        self.logger.warning(f"[检查异常] {label} ({url}) - HTTP状态码: {response.status_code}")
+        return False, None
+    
+    def _record_health(self, url, response):
+        """将响应结果记录到熔断器，5xx视为主机故障"""
+        latency = response.elapsed.total_seconds()
+        if response.status_code >= 500:
+            self.circuit_breaker.record_failure(url, latency)
+        else:
+            self.circuit_breaker.record_success(url, latency)
+    
+    def get_health_stats(self):
+        """获取各主机的熔断状态、错误率、延迟及连接复用统计"""
+        return {
+            'hosts': self.circuit_breaker.stats(),
+            'connections': self.http_pool.stats(),
+        }
+    
+    def report_stats(self):
+        """输出连接复用、主机健康和变化分类统计（调度器定期调用，停止服务时再输出一次）"""
+        health = self.get_health_stats()
+        pool_stats = health['connections']['total']
+        self.logger.info(f"连接统计: 请求 {pool_stats['requests']} 次, 新建连接 {pool_stats['opened']} 个, "
+                         f"复用 {pool_stats['reused']} 次")
+        for host, host_stats in sorted(health['hosts'].items()):
+            message = (f"主机健康: {host} - 状态: {host_stats['state']}, 最近请求 {host_stats['requests']} 次, "
+                       f"错误率: {host_stats['error_rate']}, 平均延迟: {host_stats['avg_latency']}s, "
+                       f"P95延迟: {host_stats['p95_latency']}s")
+            if host_stats['state'] != 'closed':
+                self.logger.warning(message)
+            else:
+                self.logger.info(message)
+        
+        change_stats = self.get_change_stats()
+        self.logger.info(f"变化统计: 触发更新 {change_stats['changes']} 次, 跳过细微变化 {change_stats['suppressed_crawls']} 次, "
+                         f"节省下载 {change_stats['saved_downloads']} 次")
+    
+    def _save_validators(self, data, response_headers):
+        """保存响应中的校验头"""
+        if 'Last-Modified' in response_headers:
+            data['last_modified'] = response_headers['Last-Modified']
+        if 'ETag' in response_headers:
+            data['etag'] = response_headers['ETag']
+    
+    def _validators_unchanged(self, data, response_headers):
+        """判断响应校验头与已保存的校验头是否一致"""
+        if not data.get('content_hash'):
             return False
+        etag = response_headers.get('ETag')
+        last_modified = response_headers.get('Last-Modified')
+        if etag and data.get('etag'):
+            return etag == data['etag']
+        if last_modified and data.get('last_modified'):
+            return last_modified == data['last_modified']
+        return False
+    
+    def _read_page(self, response):
+        """流式读取响应体，边下载边增量解析为lxml文档树
+        
+        Returns:
+            dict: 包含url、状态码、响应头、原始字节、编码和文档树的页面信息
+        """
+        # 优先使用响应头声明的字符集
+        content_type = response.headers.get('Content-Type', '')
+        encoding = response.encoding if 'charset=' in content_type.lower() else None
+        
+        parser = None
+        chunks = []
+        for chunk in response.iter_content(chunk_size=65536):
+            if not chunk:
+                continue
+            if parser is None:
+                # 响应头未声明时，根据首个数据块中的meta标签确定编码
+                encoding = self._normalize_encoding(encoding or self._sniff_encoding(chunk))
+                parser = lxml_html.HTMLParser(encoding=encoding)
+            chunks.append(chunk)
+            parser.feed(chunk)
+        
+        tree = None
+        if parser is not None:
+            try:
+                tree = parser.close()
+            except etree.LxmlError as e:
+                self.logger.warning(f"解析页面失败: {response.url} - {str(e)}")
+        
+        return {
+            'url': response.url,
+            'status': response.status_code,
+            'headers': dict(response.headers),
+            'body': b''.join(chunks),
+            'encoding': encoding or 'utf-8',
+            'tree': tree,
+        }
+    
+    def _sniff_encoding(self, chunk):
+        """从页面开头的meta标签中识别编码，未声明时默认为utf-8"""
+        match = META_CHARSET_RE.search(chunk[:4096])
+        if match:
+            return match.group(1).decode('ascii', 'ignore')
+        return 'utf-8'
+    
+    def _normalize_encoding(self, encoding):
+        """将GB2312/GBK统一为兼容的GB18030，避免生僻字解码失败"""
+        if encoding and encoding.lower() in ('gb2312', 'gbk', 'x-gbk'):
+            return 'gb18030'
+        return encoding
     
     def _verify_content_change(self, url, data, session=None):
         """验证内容是否发生变化"""
@@ -274,83 +512,247 @@ class PolicyMonitor:
             # 获取代理(如果启用)
             proxies = get_proxy() if self.validator.should_use_proxy(url) else None
             
-            # 获取完整内容
-            if session:
-                # 使用提供的会话对象
-                response = session.get(url, headers=headers, proxies=proxies, timeout=30)
-            else:
-                # 使用默认请求
-                response = requests.get(url, headers=headers, proxies=proxies, 
-                                       timeout=30, verify=False)
-            
-            if response.status_code != 200:
-                self.logger.warning(f"获取内容失败: {url} - HTTP状态码: {response.status_code}")
-                return False
-            
-            # 尝试检测编码
-            response.encoding = response.apparent_encoding
-            content = response.text
-            
-            # 计算内容哈希
-            xpath = data.get('content_xpath', None)  # 可以在配置中指定要监测的内容区域
-            new_hash = self.validator.calculate_content_hash(content, xpath)
+            # 获取完整内容，默认使用按主机共享的会话
+            if not session:
+                session = self.http_pool.get_session(url)
+            response = session.get(url, headers=headers, proxies=proxies, 
+                                   timeout=30, verify=False, stream=True)
             
-            if not new_hash:
-                self.logger.warning(f"计算内容哈希失败: {url}")
-                return False
-            
-            # 比较哈希值
-            old_hash = data.get('content_hash')
-            if not old_hash:
-                # 首次检查，保存哈希值
-                data['content_hash'] = new_hash
-                return False
-            
-            # 更新哈希值
-            data['content_hash'] = new_hash
+            try:
+                self.head_policy.record_get(urlparse(url).netloc, headers, response)
+                if response.status_code != 200:
+                    self.logger.warning(f"获取内容失败: {url} - HTTP状态码: {response.status_code}")
+                    return False, None
+                
+                page = self._read_page(response)
+            finally:
+                response.close()
             
-            # 如果哈希值不同，说明内容已更新
-            return old_hash != new_hash
+            return self._compare_fingerprint(url, data, page), page
             
         except Exception as e:
             self.logger.error(f"验证内容变化失败: {url} - {str(e)}")
+            return False, None
+    
+    def _compare_fingerprint(self, url, data, page):
+        """计算页面指纹并与已保存的哈希比较"""
+        if page['tree'] is None:
+            self.logger.warning(f"计算内容哈希失败: {url}")
+            return False
+        
+        # 计算内容哈希
+        xpath = data.get('content_xpath', None)  # 可以在配置中指定要监测的内容区域
+        new_hash, signature = self.validator.calculate_tree_signatures(
+            page['tree'], xpath,
+            ignore_xpaths=data.get('ignore_xpaths'),  # 栏目自定义的动态元素（如访问量）
+            ignore_patterns=data.get('ignore_patterns')
+        )
+        
+        if not new_hash:
+            self.logger.warning(f"计算内容哈希失败: {url}")
+            return False
+        page['simhash'] = signature
+        
+        # 比较哈希值
+        old_hash = data.get('content_hash')
+        if not self.validator.fingerprint.is_comparable(old_hash, new_hash):
+            # 首次检查，或指纹算法/忽略规则已变化，重新建立基线
+            data['content_hash'] = new_hash
+            data['simhash'] = signature
             return False
+        
+        # 更新哈希值
+        data['content_hash'] = new_hash
+        
+        # 如果哈希值不同，说明内容已更新
+        return old_hash != new_hash
+    
+    def _classify_change(self, label, site_name, url, data, page, new_links):
+        """区分实质更新与细微变化（轮播图、访问量、页脚日期等）
+        
+        能对比列表页链接时以链接差异为准；否则比较监测区域的条目级SimHash签名与上次
+        触发爬取时的签名，汉明距离不超过阈值视为细微变化。签名只在触发爬取时更新，
+        多次细微变化会累积。默认阈值0：只有条目中的日期、时间、访问量等数字变化或条目
+        重新排序时跳过爬取，新增、删除或修改任一条目都会触发爬取。
+        
+        Returns:
+            bool: 是否需要触发爬取
+        """
+        signature = page.get('simhash') if page else None
+        threshold = self._get_simhash_threshold(site_name, url, data)
+        old_signature = data.get('simhash')
+        
+        comparable = FingerprintEngine.is_comparable(old_signature, signature)
+        if new_links is None and comparable and threshold >= 0:
+            distance = hamming_distance(old_signature, signature)
+            if distance <= threshold:
+                saved = 1 + len(self.state_store.load_links(site_name, url) or [])
+                with self.stats_lock:
+                    self.change_stats['suppressed_crawls'] += 1
+                    self.change_stats['saved_downloads'] += saved
+                self.logger.info(f"[细微变化] {label} ({url}) - SimHash距离 {distance} <= {threshold}，跳过爬取")
+                return False
+        
+        if signature:
+            data['simhash'] = signature
+        with self.stats_lock:
+            self.change_stats['changes'] += 1
+        return True
+    
+    def _get_simhash_threshold(self, site_name, url, data):
+        """获取细微变化阈值：栏目配置 > 站点配置 > 域名配置 > 默认值"""
+        threshold = data.get('simhash_threshold')
+        if threshold is None:
+            threshold = self.sites.get(site_name, {}).get('simhash_threshold')
+        if threshold is None:
+            host = urlparse(url).hostname or ''
+            for domain, value in FINGERPRINT_SETTINGS.get('simhash_domains', {}).items():
+                if host == domain or host.endswith('.' + domain):
+                    threshold = value
+                    break
+        if threshold is None:
+            threshold = FINGERPRINT_SETTINGS.get('simhash_threshold', 0)
+        return int(threshold)
+    
+    def get_change_stats(self):
+        """获取变化分类统计：触发的更新、跳过的细微变化及节省的下载次数"""
+        with self.stats_lock:
+            return dict(self.change_stats)
+    
+    def _get_spider_name(self, site_name, section_name=None):
+        """确定站点或栏目对应的爬虫名称"""
+        site_data = self.sites.get(site_name)
+        if site_data is None:
+            return None
+        
+        if 'sections' in site_data and section_name:
+            # 多栏目格式，查找对应栏目的爬虫
+            for section in site_data['sections']:
+                if section.get('name') == section_name:
+                    return section.get('spider', f"{site_name}_spider")
+            return None
+        
+        # 单链接格式
+        return site_data.get('spider', f"{site_name}_spider")
     
-    def _trigger_crawler(self, site_name, url, section_name=None):
-        """触发爬虫执行"""
+    def _get_link_rule(self, spider_name):
+        """获取爬虫列表页详情链接的预编译XPath(list_rules.policy_links)，没有时返回None
+        
+        按配置文件版本缓存，配置修改后重新编译。
+        """
+        if spider_name not in SPIDERS:
+            return None
+        config_path = SPIDERS[spider_name][1]
+        version = config_version(config_path)
+        cached = self.link_rules.get(spider_name)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        rule = None
+        try:
+            _, config = load_spider_config(config_path)
+            rule = compile_rules(config or {}, source=config_path).list.get('policy_links')
+        except Exception as e:
+            self.logger.error(f"读取爬虫配置失败: {config_path} - {str(e)}")
+        self.link_rules[spider_name] = (version, rule)
+        return rule
+    
+    def _extract_detail_links(self, page, rule):
+        """按页面顺序提取列表页上的详情链接，转换为绝对URL并去重"""
+        links = []
+        seen = set()
+        for href in rule(page['tree']):
+            if not isinstance(href, str):
+                href = href.get('href') if hasattr(href, 'get') else None
+            if not href or not href.strip():
+                continue
+            link = urljoin(page['url'], href.strip())
+            if urlparse(link).scheme not in ('http', 'https') or link in seen:
+                continue
+            seen.add(link)
+            links.append(link)
+        return links
+    
+    def _diff_section_links(self, site_name, url, page, section_name=None):
+        """对比列表页上的详情链接与上次记录的链接
+        
+        每次获取到列表页时都会更新记录的链接，这样首次检查就能建立基线。
+        
+        Returns:
+            list: 新出现的详情链接；无法对比（没有页面、爬虫没有链接规则或尚无基线）时返回None
+        """
+        if not page or page.get('tree') is None:
+            return None
+        
+        rule = self._get_link_rule(self._get_spider_name(site_name, section_name))
+        if not rule:
+            return None
+        
+        try:
+            links = self._extract_detail_links(page, rule)
+        except Exception as e:
+            self.logger.error(f"提取列表页链接失败: {url} - {str(e)}")
+            return None
+        
+        previous = self.state_store.load_links(site_name, url)
+        if links != previous:
+            self.state_store.save_links(site_name, url, links)
+        if previous is None:
+            return None
+        
+        previous = set(previous)
+        return [link for link in links if link not in previous]
+    
+    def _trigger_crawler(self, site_name, url, section_name=None, detail_urls=None, page=None):
+        """触发爬虫执行
+        
+        Args:
+            detail_urls: 列表页上新出现的详情链接，提供时只爬取这些详情页；
+                为None时重新爬取整个列表页
+            page: 检测时已下载的列表页，交给爬虫直接解析，不再重复下载
+        """
         try:
             # 获取爬虫配置
             if site_name not in self.sites:
                 self.logger.warning(f"未找到站点配置: {site_name}")
                 return False
             
-            site_data = self.sites[site_name]
-            
             # 确定爬虫名称
-            spider_name = None
-            if 'sections' in site_data and section_name:
-                # 多栏目格式，查找对应栏目的爬虫
-                for section in site_data['sections']:
-                    if section.get('name') == section_name:
-                        spider_name = section.get('spider', f"{site_name}_spider")
-                        break
-            else:
-                # 单链接格式
-                spider_name = site_data.get('spider', f"{site_name}_spider")
-            
+            spider_name = self._get_spider_name(site_name, section_name)
             if not spider_name:
                 self.logger.warning(f"未找到爬虫名称: {site_name} - {section_name}")
                 return False
             
+            if detail_urls is not None:
+                if not detail_urls:
+                    self.logger.info(f"[无新增链接] 列表页内容变化但没有新的详情链接，跳过爬取: {spider_name} - {url}")
+                    return True
+                
+                # 只爬取新出现的详情页
+                self.logger.info(f"触发增量爬取: {spider_name} - {url} - 新增 {len(detail_urls)} 个详情链接")
+                self.scheduler.execute_task(
+                    self.crawler_engine.start_crawling_details,
+                    spider_name,
+                    detail_urls,
+                    section_name
+                )
+                return True
+            
             # 使用调度器执行爬虫任务
             self.logger.info(f"触发爬虫: {spider_name} - {url}")
             
+            # 只传递原始内容，文档树留在检测线程内
+            prefetched = None
+            if page and page.get('body'):
+                prefetched = {key: page[key] for key in ('url', 'headers', 'body', 'encoding')}
+            
             # 异步执行爬虫
             self.scheduler.execute_task(
                 self.crawler_engine.start_crawling_with_url,
                 spider_name,
                 url,
-                section_name
+                section_name,
+                prefetched
             )
             
             return True
@@ -359,39 +761,16 @@ class PolicyMonitor:
             self.logger.error(f"触发爬虫失败: {site_name} - {url} - {str(e)}")
             return False
     
-    def _update_site_status(self, site_name):
-        """更新站点状态到链接库文件"""
+    def _update_site_status(self, site_name, url=None):
+        """记录站点（或栏目）的爬取时间，由链接库状态日志合并后定时写回链接库文件"""
         try:
             file_path = self._get_site_file_path(site_name)
             if not file_path:
                 self.logger.warning(f"未找到站点链接库文件: {site_name}")
                 return False
             
-            site_data = self.sites.get(site_name)
-            if not site_data:
-                return False
-            
-            # 根据文件类型保存
-            if file_path.endswith('.json'):
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    # 转换时间戳为ISO格式
-                    data_to_save = self._prepare_site_data_for_save(site_data)
-                    json.dump(data_to_save, f, ensure_ascii=False, indent=2)
-            
-            elif file_path.endswith('.csv'):
-                # CSV格式保存
-                if 'sections' in site_data:
-                    sections = site_data['sections']
-                    df = pd.DataFrame([{
-                        '名称': section.get('name', ''),
-                        '链接': section.get('url', ''),
-                        '优先级': section.get('priority', 5),
-                        '上次爬取时间': datetime.fromtimestamp(section.get('last_crawled', 0)).strftime('%Y-%m-%d %H:%M:%S') if section.get('last_crawled') else None,
-                        '爬取频率': self._seconds_to_frequency(section.get('check_interval', self.default_check_interval))
-                    } for section in sections])
-                    
-                    df.to_csv(file_path, index=False, encoding='utf-8')
-            
+            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.status_journal.record(file_path, url, {'last_crawled': current_time})
             self.logger.info(f"更新站点状态成功: {site_name}")
             return True
             
@@ -399,37 +778,6 @@ class PolicyMonitor:
             self.logger.error(f"更新站点状态失败: {site_name} - {str(e)}")
             return False
     
-    def _prepare_site_data_for_save(self, site_data):
-        """准备站点数据用于保存"""
-        # 深拷贝避免修改原始数据
-        import copy
-        data = copy.deepcopy(site_data)
-        
-        # 转换时间戳
-        if 'next_check' in data:
-            del data['next_check']  # 不需要保存下次检查时间
-        
-        # 处理多栏目格式
-        if 'sections' in data:
-            for section in data['sections']:
-                if 'next_check' in section:
-                    del section['next_check']
-                if section.get('last_crawled'):
-                    section['last_crawled'] = datetime.fromtimestamp(section['last_crawled']).isoformat()
-        
-        return data
-    
-    def _seconds_to_frequency(self, seconds):
-        """将秒数转换为频率字符串"""
-        if seconds <= 3600:
-            return 'hourly'
-        elif seconds <= 86400:
-            return 'daily'
-        elif seconds <= 604800:
-            return 'weekly'
-        else:
-            return 'monthly'
-    
     def _get_site_file_path(self, site_name):
         """获取站点配置文件路径"""
         # 尝试JSON格式
@@ -459,9 +807,15 @@ class PolicyMonitor:
         
         # 启动文件监听
         self.observer = Observer()
-        self.observer.schedule(LinkPoolHandler(self), self.link_pool_dir, recursive=False)
+        self.pool_handler = LinkPoolHandler(self, MONITOR_SETTINGS.get('watch_debounce', 1.0))
+        self.observer.schedule(self.pool_handler, self.link_pool_dir, recursive=False)
         self.observer.start()
         
+        # 启动定时归档
+        if ARCHIVE_SETTINGS.get('enabled'):
+            self.archiver = PolicyArchiver.from_settings()
+            self.archiver.start()
+        
         self.logger.info("监测服务已启动")
     
     def stop(self):
@@ -475,11 +829,32 @@ class PolicyMonitor:
         # 停止调度器
         if hasattr(self.scheduler, 'stop'):
             self.scheduler.stop()
+
+        # 关闭异步检查引擎
+        if self.async_engine:
+            self.async_engine.close()
+        
+        # 关闭详情页下载线程池
+        self.crawler_engine.close()
+        
+        # 关闭状态存储
+        self.state_store.close()
         
+        # 输出本次运行的统计
+        self.report_stats()
+        
+        # 写回链接库状态日志中的变更
+        self.status_journal.flush()
+        
+        # 停止定时归档
+        if self.archiver:
+            self.archiver.stop()
+
         # 停止文件监听
         if self.observer:
             self.observer.stop()
             self.observer.join(timeout=5)
+            self.pool_handler.cancel()
         
         self.logger.info("监测服务已停止")
 
@@ -506,211 +881,126 @@ class PolicyMonitor:
             
         except Exception as e:
             self.logger.error(f"加载站点配置失败: {str(e)}")
-    def reload_site(self, site_name):
-        """重新加载指定站点配置"""
+    def reload_site(self, site_name, schedule=True):
+        """重新加载指定站点配置，schedule为False时只加载不调度"""
         try:
-            # 尝试加载JSON文件
-            file_path = os.path.join(self.link_pool_dir, f"{site_name}.json")
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    site_data = json.load(f)
-                    
-                    # 初始化下次检查时间
-                    if 'sections' in site_data:
-                        for section in site_data['sections']:
-                            if 'next_check' not in section:
-                                section['next_check'] = datetime.now().timestamp()
-                    elif 'policy_sections' in site_data:
-                        # 兼容旧格式
-                        for section in site_data['policy_sections']:
-                            if 'next_check' not in section:
-                                section['next_check'] = datetime.now().timestamp()
-                    else:
-                        if 'next_check' not in site_data:
-                            site_data['next_check'] = datetime.now().timestamp()
-                    
-                    # 保存站点配置
-                    self.sites[site_name] = site_data
-                    self.logger.info(f"已加载站点配置: {site_name}")
-                    return True
+            # 优先加载JSON文件，其次CSV文件
+            file_path = self._get_site_file_path(site_name)
+            if not file_path:
+                self.logger.warning(f"未找到站点配置文件: {site_name}")
+                return False
             
-            # 尝试加载CSV文件
-            file_path = os.path.join(self.link_pool_dir, f"{site_name}.csv")
-            if os.path.exists(file_path):
-                # 读取CSV文件
-                df = pd.read_csv(file_path)
-                
-                # 输出CSV文件内容，用于调试
-                self.logger.info(f"读取到的CSV文件内容: {df.to_dict('records')}")
-                
-                # 转换为字典格式
-                site_data = {
-                    'name': site_name,
-                    'sections': []
-                }
-                
-                # 处理CSV中的每一行
-                for _, row in df.iterrows():
-                    # 检查列名并适配
-                    if 'section_name' in df.columns:
-                        name_col = 'section_name'
-                    elif '名称' in df.columns:
-                        name_col = '名称'
-                    else:
-                        name_col = df.columns[0]  # 使用第一列作为名称列
-                    
-                    if 'url' in df.columns:
-                        url_col = 'url'
-                    elif '链接' in df.columns:
-                        url_col = '链接'
-                    else:
-                        url_col = df.columns[1]  # 使用第二列作为URL列
-                    
-                    if 'priority' in df.columns:
-                        priority_col = 'priority'
-                    elif '优先级' in df.columns:
-                        priority_col = '优先级'
-                    else:
-                        priority_col = None
-                    
-                    if 'last_crawled' in df.columns:
-                        last_crawled_col = 'last_crawled'
-                    elif '上次爬取时间' in df.columns:
-                        last_crawled_col = '上次爬取时间'
-                    else:
-                        last_crawled_col = None
-                    
-                    if 'check_interval' in df.columns:
-                        check_interval_col = 'check_interval'
-                    elif '爬取频率' in df.columns:
-                        check_interval_col = '爬取频率'
-                    else:
-                        check_interval_col = None
-                    
-                    # 确保优先级被正确读取
-                    priority = 5  # 默认中等优先级
-                    if priority_col and priority_col in df.columns:
-                        try:
-                            priority_value = row[priority_col]
-                            if not pd.isna(priority_value):
-                                priority = int(float(priority_value))
-                                self.logger.info(f"读取到栏目优先级: {site_name} - {row.get(name_col, '')} - 优先级: {priority}")
-                        except (ValueError, TypeError) as e:
-                            self.logger.warning(f"优先级格式错误: {site_name} - {row.get(name_col, '')} - 值: {row[priority_col]} - 错误: {str(e)}")
-                    
-                    # 处理检查间隔
-                    check_interval = self.default_check_interval
-                    if check_interval_col and check_interval_col in df.columns:
-                        try:
-                            interval_value = row[check_interval_col]
-                            if not pd.isna(interval_value):
-                                if isinstance(interval_value, (int, float)):
-                                    check_interval = int(interval_value)
-                                elif interval_value.lower() == 'daily':
-                                    check_interval = 86400  # 一天的秒数
-                                elif interval_value.lower() == 'weekly':
-                                    check_interval = 604800  # 一周的秒数
-                                elif interval_value.lower() == 'monthly':
-                                    check_interval = 2592000  # 30天的秒数
-                        except (ValueError, TypeError, AttributeError) as e:
-                            self.logger.warning(f"检查间隔格式错误: {site_name} - {row.get(name_col, '')} - 值: {row[check_interval_col]} - 错误: {str(e)}")
-                    
-                    # 创建栏目配置
-                    section = {
-                        'name': row.get(name_col, ''),
-                        'url': row.get(url_col, ''),
-                        'priority': priority,
-                        'next_check': datetime.now().timestamp(),
-                        'check_interval': check_interval
-                    }
-                    
-                    site_data['sections'].append(section)
-                
-                # 保存站点配置
-                self.sites[site_name] = site_data
-                
-                # 添加调试日志，输出所有栏目的优先级
-                for section in site_data['sections']:
-                    self.logger.info(f"已加载栏目配置: {site_name} - {section['name']} - 优先级: {section['priority']}")
-                
-                self.logger.info(f"已加载站点配置: {site_name}")
-                return True
+            site_data = self.pool_loader.load(file_path, site_name)
+            if site_data is None:
+                return False
             
-            self.logger.warning(f"未找到站点配置文件: {site_name}")
-            return False
+            # 恢复持久化的监测状态
+            self._restore_state(site_name, site_data)
+            
+            # 保存站点配置并按到期时间调度
+            self.sites[site_name] = site_data
+            if schedule:
+                self.scheduler.schedule_site(site_name)
+            
+            self.logger.info(f"已加载站点配置: {site_name} - {len(self.get_site_targets(site_name))} 个栏目")
+            return True
             
         except Exception as e:
             self.logger.error(f"加载站点配置失败: {site_name} - {str(e)}")
             return False
 
-    def check_high_priority_sites(self):
-        """检查高优先级站点更新"""
-        self.logger.info("开始检查高优先级站点更新...")
+    def apply_site_change(self, site_name):
+        """链接库文件变化后重新加载站点，只调度新增或配置变化的栏目
+        
+        配置未变化的栏目沿用原有的栏目数据（监测状态和调度时间不变），
+        新增或变化的栏目立即检查，已删除的栏目不再调度。
+        
+        Returns:
+            tuple: (新增, 变化, 删除) 的栏目数
+        """
+        old_data = self.sites.get(site_name)
+        if not self._get_site_file_path(site_name):
+            if old_data is not None:
+                self.sites.pop(site_name, None)
+                self.scheduler.remove_site(site_name)
+                self.logger.info(f"链接库文件已删除，停止监测站点: {site_name}")
+            return 0, 0, 0
+        
+        if not self.reload_site(site_name, schedule=False):
+            return 0, 0, 0
+        new_data = self.sites[site_name]
+        old_sections = {}
+        if old_data is not None:
+            old_sections = {section.get('url'): section for section in self._site_sections(old_data)}
+        
+        added = changed = 0
+        now = datetime.now().timestamp()
+        sections = self._site_sections(new_data)
+        for index, section in enumerate(sections):
+            old = old_sections.pop(section.get('url'), None)
+            if old is not None and self._section_config(old) == self._section_config(section):
+                # 配置未变化：沿用原栏目数据
+                sections[index] = old
+                continue
+            if old is None:
+                added += 1
+            else:
+                changed += 1
+            section['next_check'] = now
+        removed = len(old_sections)
+        
+        if added or changed or removed:
+            self.scheduler.schedule_site(site_name)
+            self.logger.info(f"链接库变化: {site_name} - 新增 {added} 个, 变化 {changed} 个, 删除 {removed} 个栏目")
+        else:
+            # 栏目配置均未变化（如只更新了爬取时间），原有调度条目仍指向沿用的栏目数据
+            if sections and sections[0] is old_data:
+                self.sites[site_name] = old_data
+            self.logger.info(f"链接库栏目配置未变化: {site_name}")
+        return added, changed, removed
+    
+    def _site_sections(self, site_data):
+        """返回站点的栏目列表，单链接站点返回只含站点数据的新列表"""
+        for key in ('sections', 'policy_sections'):
+            if key in site_data:
+                return site_data[key]
+        return [site_data]
+    
+    def _section_config(self, data):
+        """栏目的配置字段（去掉监测状态和运行期字段）"""
+        return {key: value for key, value in data.items()
+                if key not in RUNTIME_FIELDS and key not in ('sections', 'policy_sections')}
+    
+    def _restore_state(self, site_name, site_data):
+        """从状态库恢复站点各栏目的指纹、校验头、失败计数和调度时间
+        
+        已过期的栏目在warm_start_spread窗口内随机分散，避免重启后集中请求。
+        """
+        states = self.state_store.load_site(site_name)
+        if not states:
+            return
         
         now = datetime.now().timestamp()
-        checked_sites = 0
-        updated_sites = 0
-        
-        # 添加调试日志，输出所有站点的优先级
-        for site_name, site_data in self.sites.items():
-            if 'sections' in site_data:
-                for section in site_data['sections']:
-                    section_priority = section.get('priority', 5)
-                    self.logger.debug(f"站点栏目优先级: {site_name} - {section.get('name', '')} - 优先级: {section_priority}")
-        
-        for site_name, site_data in self.sites.items():
-            # 检查站点优先级
-            priority = site_data.get('priority', 5)  # 默认中等优先级
-            if priority >= 8:  # 高优先级
-                self.logger.info(f"检查高优先级站点: {site_name}")
-                checked_sites += 1
-                if self.check_site_update(site_name):
-                    updated_sites += 1
-            
-            # 检查是否有到期需要检查的栏目
-            if 'sections' in site_data:
-                for section in site_data['sections']:
-                    if section.get('next_check', 0) <= now:
-                        section_priority = section.get('priority', priority)
-                        # 添加更详细的日志
-                        self.logger.debug(f"检查栏目优先级: {site_name} - {section.get('name', '')} - 优先级: {section_priority}")
-                        if section_priority >= 8:
-                            section_name = section.get('name', '')
-                            self.logger.info(f"检查高优先级栏目: {site_name} - {section_name}")
-                            checked_sites += 1
-                            if self._check_section_update(site_name, section):
-                                updated_sites += 1
-                        else:
-                            self.logger.debug(f"跳过低优先级栏目: {site_name} - {section.get('name', '')} - 优先级: {section_priority}")
-            
-            # 检查policy_sections字段（兼容旧格式）
-            if 'policy_sections' in site_data:
-                for section in site_data['policy_sections']:
-                    if section.get('next_check', 0) <= now:
-                        section_priority = section.get('priority', priority)
-                        if section_priority >= 8:
-                            section_name = section.get('name', '')
-                            self.logger.info(f"检查高优先级栏目(旧格式): {site_name} - {section_name}")
-                            checked_sites += 1
-                            if self._check_section_update(site_name, section):
-                                updated_sites += 1
-        
-        self.logger.info(f"完成高优先级站点检查: 共检查 {checked_sites} 个站点/栏目, 发现 {updated_sites} 个更新")
-    
-    def check_all_sites(self):
-        """检查所有站点更新"""
-        self.logger.info("开始检查所有站点更新...")
-        
-        checked_sites = 0
-        updated_sites = 0
-        
-        for site_name, site_data in self.sites.items():
-            self.logger.info(f"检查站点: {site_name}")
-            checked_sites += 1
-            if self.check_site_update(site_name):
-                updated_sites += 1
-            
-        self.logger.info(f"完成所有站点检查: 共检查 {checked_sites} 个站点, 发现 {updated_sites} 个更新")
+        spread = MONITOR_SETTINGS.get('warm_start_spread', 300)
+        if 'sections' in site_data:
+            entries = site_data['sections']
+        elif 'policy_sections' in site_data:
+            entries = site_data['policy_sections']
+        else:
+            entries = [site_data]
+        
+        restored = 0
+        for data in entries:
+            state = states.get(data.get('url'))
+            if not state:
+                continue
+            data.update(state)
+            if data.get('next_check', 0) <= now:
+                interval = data.get('check_interval', self.default_check_interval)
+                data['next_check'] = now + random.uniform(0, min(interval, spread))
+            restored += 1
+        
+        self.logger.info(f"已恢复监测状态: {site_name} - {restored} 个栏目")
     
     def check_site_update(self, site_name):
         """检查指定站点更新"""
@@ -722,29 +1012,52 @@ class PolicyMonitor:
         self.logger.info(f"检查站点更新: {site_name}")
         
         try:
-            # 检查是否为多栏目格式
-            if 'sections' in site_data:
-                # 多栏目格式
-                sections = site_data['sections']
-                for section in sections:
-                    section_name = section.get('name', '')
-                    self.logger.info(f"检查更新: {site_name} - {section_name} ({section.get('url', '')})")
-                    self._check_section_update(site_name, section)
-            # 检查旧格式的policy_sections
-            elif 'policy_sections' in site_data:
-                # 旧格式多栏目
-                sections = site_data['policy_sections']
-                for section in sections:
-                    section_name = section.get('name', '')
-                    self.logger.info(f"检查更新(旧格式): {site_name} - {section_name} ({section.get('url', '')})")
-                    self._check_section_update(site_name, section)
-            else:
-                # 单链接格式
-                self._check_site_update_direct(site_name, site_data)
-                
+            self._run_checks(self._collect_site_targets(site_name, site_data))
             return True
             
         except Exception as e:
             self.logger.error(f"检查站点更新异常: {site_name} - {str(e)}")
-            
-            
\ No newline at end of file
+            return False
+    
+    def get_site_targets(self, site_name):
+        """获取站点下所有检查目标
+        
+        Returns:
+            list: 检查目标列表，元素为 (site_name, data, is_direct)
+        """
+        site_data = self.sites.get(site_name)
+        if not site_data:
+            return []
+        # 检查是否为多栏目格式
+        if 'sections' in site_data:
+            return [(site_name, section, False) for section in site_data['sections']]
+        # 检查旧格式的policy_sections
+        if 'policy_sections' in site_data:
+            return [(site_name, section, False) for section in site_data['policy_sections']]
+        # 单链接格式
+        return [(site_name, site_data, True)]
+    
+    def _collect_site_targets(self, site_name, site_data):
+        """收集站点下所有待检查的目标，并输出检查日志"""
+        targets = self.get_site_targets(site_name)
+        for _, data, is_direct in targets:
+            if not is_direct:
+                self.logger.info(f"检查更新: {site_name} - {data.get('name', '')} ({data.get('url', '')})")
+        return targets
+    
+    def _check_target(self, site_name, data, is_direct):
+        """执行单个检查目标"""
+        if is_direct:
+            return self._check_site_update_direct(site_name, data)
+        return self._check_section_update(site_name, data)
+    
+    def _run_checks(self, targets):
+        """按配置的检查引擎执行一批检查，返回发现更新的数量"""
+        if self.async_engine:
+            return self.async_engine.run(targets)
+        
+        updated = 0
+        for site_name, data, is_direct in targets:
+            if self._check_target(site_name, data, is_direct):
+                updated += 1
+        return updated
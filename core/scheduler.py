@@ -1,13 +1,19 @@
 import time
+import heapq
 import logging
 import threading
-import schedule
+import itertools
 from datetime import datetime, timedelta
 
 class TaskScheduler:
-    """任务调度器：管理监测任务的执行频率和优先级"""
+    """任务调度器：管理监测任务的执行频率和优先级
     
-    def __init__(self, monitor=None):
+    以小顶堆按栏目的next_check排序，调度线程精确休眠到最早到期的栏目，
+    每次出堆/入堆为O(log n)。站点重新加载时通过代数(generation)让旧条目失效。
+    每批检查完成后，距上次输出超过stats_interval秒时调用监测器的report_stats输出统计。
+    """
+    
+    def __init__(self, monitor=None, stats_interval=3600):
         self.logger = logging.getLogger('TaskScheduler')
         self.monitor = monitor
         self.running = False
@@ -15,6 +21,16 @@ class TaskScheduler:
         self.max_concurrent_tasks = 3  # 最大并发任务数
         self.active_tasks = 0  # 当前活动任务数
         self.task_lock = threading.Lock()  # 用于同步任务计数
+        
+        # 到期时间堆: (next_check, -priority, seq, site_name, generation, data, is_direct)
+        self.heap = []
+        self.live = {}  # (site_name, id(data)) -> 有效条目的seq
+        self.site_generations = {}  # site_name -> 当前代数
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        
+        self.stats_interval = stats_interval
+        self.last_report = time.monotonic()
     
     def set_monitor(self, monitor):
         """设置监测器实例"""
@@ -45,7 +61,9 @@ class TaskScheduler:
         if not self.running:
             return
             
-        self.running = False
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
         
         # 等待调度线程结束
         if self.scheduler_thread:
@@ -53,35 +71,117 @@ class TaskScheduler:
         
         self.logger.info("任务调度器已停止")
     
-    def _scheduler_loop(self):
-        """调度循环，定期检查所有站点更新"""
-        self.logger.info("启动调度循环...")
+    def schedule_site(self, site_name):
+        """将站点所有栏目按next_check加入调度堆，旧条目自动失效"""
+        if not self.monitor:
+            return
         
-        # 每小时执行一次全量检查
-        schedule.every().hour.do(self._check_all_sites)
+        targets = self.monitor.get_site_targets(site_name)
+        with self.condition:
+            generation = self.site_generations.get(site_name, 0) + 1
+            self.site_generations[site_name] = generation
+            self.live = {key: seq for key, seq in self.live.items() if key[0] != site_name}
+            for _, data, is_direct in targets:
+                self._push(site_name, generation, data, is_direct)
+            self.condition.notify()
         
-        # 每分钟检查一次高优先级站点
-        schedule.every().minute.do(self._check_high_priority_sites)
+        self.logger.debug(f"已调度站点: {site_name} - {len(targets)} 个栏目")
+    
+    def remove_site(self, site_name):
+        """移除站点的所有调度条目"""
+        with self.condition:
+            self.site_generations[site_name] = self.site_generations.get(site_name, 0) + 1
+            self.live = {key: seq for key, seq in self.live.items() if key[0] != site_name}
+            self.condition.notify()
+    
+    def _push(self, site_name, generation, data, is_direct):
+        """将单个栏目加入调度堆（调用方需持有condition锁）"""
+        seq = next(self.counter)
+        due = data.get('next_check') or 0
+        heapq.heappush(self.heap, (due, -data.get('priority', 5), seq, site_name, generation, data, is_direct))
+        self.live[(site_name, id(data))] = seq
+    
+    def _is_live(self, entry):
+        """判断堆条目是否仍然有效"""
+        _, _, seq, site_name, _, data, _ = entry
+        return self.live.get((site_name, id(data))) == seq
+    
+    def _pop_due(self):
+        """等待并取出所有已到期的栏目，调度器停止时返回空列表"""
+        with self.condition:
+            while self.running:
+                # 丢弃已失效的条目
+                while self.heap and not self._is_live(self.heap[0]):
+                    heapq.heappop(self.heap)
+                
+                if not self.heap:
+                    self.condition.wait()
+                    continue
+                
+                delay = self.heap[0][0] - datetime.now().timestamp()
+                if delay > 0:
+                    # 精确休眠到最早到期的栏目，新条目入堆时会被唤醒
+                    self.condition.wait(delay)
+                    continue
+                
+                now = datetime.now().timestamp()
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    entry = heapq.heappop(self.heap)
+                    if self._is_live(entry):
+                        _, _, _, site_name, _, data, _ = entry
+                        del self.live[(site_name, id(data))]
+                        due.append(entry)
+                return due
+            return []
+    
+    def _scheduler_loop(self):
+        """调度循环，按到期时间依次检查栏目"""
+        self.logger.info("启动调度循环...")
         
         while self.running:
             try:
-                schedule.run_pending()
-                time.sleep(1)
+                due = self._pop_due()
+                if not due:
+                    continue
+                
+                self.logger.info(f"执行到期栏目检查: {len(due)} 个")
+                targets = [(site_name, data, is_direct) for _, _, _, site_name, _, data, is_direct in due]
+                # 记录派发前的下次检查时间，用于判断检查是否设置了新的时间
+                dispatched = [data.get('next_check') for _, data, _ in targets]
+                self.monitor._run_checks(targets)
+                self._requeue(due, dispatched)
+                self._maybe_report()
             except Exception as e:
                 self.logger.error(f"调度循环异常: {str(e)}")
                 time.sleep(30)  # 出错后等待较长时间
     
-    def _check_all_sites(self):
-        """检查所有站点"""
-        self.logger.info("执行全量站点检查...")
-        if self.monitor:
-            self.monitor.check_all_sites()
+    def _requeue(self, due, dispatched):
+        """按检查后更新的next_check重新入堆，期间站点被重新加载则跳过
+        
+        检查设置的下次检查时间（包括限速、重试等短暂推迟）即使在整批检查结束时
+        已经到期也保持不变；只有检查没有更新下次检查时间时才按检查间隔顺延。
+        """
+        now = datetime.now().timestamp()
+        with self.condition:
+            for entry, before in zip(due, dispatched):
+                _, _, _, site_name, generation, data, is_direct = entry
+                if data.get('next_check') == before:
+                    # 检查未更新下次检查时间(如缺少URL)，按检查间隔顺延
+                    data['next_check'] = now + data.get('check_interval', self.monitor.default_check_interval)
+                if self.site_generations.get(site_name) == generation:
+                    self._push(site_name, generation, data, is_direct)
+            self.condition.notify()
     
-    def _check_high_priority_sites(self):
-        """检查高优先级站点"""
-        self.logger.info("执行高优先级站点检查...")
-        if self.monitor:
-            self.monitor.check_high_priority_sites()
+    def _maybe_report(self):
+        """距上次输出超过统计间隔时输出监测统计"""
+        if not self.stats_interval or time.monotonic() - self.last_report < self.stats_interval:
+            return
+        self.last_report = time.monotonic()
+        try:
+            self.monitor.report_stats()
+        except Exception as e:
+            self.logger.error(f"输出监测统计失败: {str(e)}")
     
     def execute_task(self, task_func, *args, **kwargs):
         """执行任务，控制并发数"""
@@ -0,0 +1,291 @@
+import os
+import re
+import json
+import time
+import threading
+
+from utils.logger import setup_logger
+
+SEGMENT_RE = re.compile(r'^seg-(\d{6})\.jsonl$')
+
+
+class SegmentStore:
+    """追加写入的分段JSONL存储
+
+    每条记录压缩为一行JSON追加到当前分段文件，分段超过大小上限后滚动到新文件，
+    避免每条数据创建一个文件和目录。写入先进入内存缓冲，累计到一定条数或超过
+    时间间隔后批量写盘并fsync。每个分段配有偏移索引(.idx)，每行记录
+    [集合, 栏目, 日期, 偏移, 长度]，按栏目和日期读取时只扫描索引再定位记录。
+    索引总是在数据写盘之后追加，启动时按索引截断未完整写入的分段尾部。
+    记录可附带写盘后的回调，数据和索引都写盘后才调用；写盘失败时截断本批写入的部分，
+    记录保留在缓冲中下次重试。
+    """
+
+    def __init__(self, base_path='data/policy_data/segments', max_segment_bytes=64 * 1024 * 1024,
+                 flush_every=100, flush_interval=5, fsync=True):
+        self.logger = setup_logger('SegmentStore')
+        self.base_path = base_path
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self.pending = []  # 待写盘的 (索引项, 记录行, 写盘后回调)
+        self.last_flush = time.monotonic()
+        self.closed = False
+
+        os.makedirs(base_path, exist_ok=True)
+        segments = self.list_segments()
+        self.segment_id = segments[-1] if segments else 1
+        self.segment_size = self._recover(self.segment_id)
+        self.data_file = open(self._data_path(self.segment_id), 'ab')
+        self.index_file = open(self._index_path(self.segment_id), 'ab')
+
+        # 后台定时写盘，空闲时缓冲中的记录也不会长时间滞留
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, name='SegmentStoreFlusher', daemon=True)
+        self.flusher.start()
+
+    @classmethod
+    def from_settings(cls, base_path, settings=None):
+        """根据配置创建分段存储"""
+        settings = settings or {}
+        return cls(
+            base_path=base_path,
+            max_segment_bytes=int(settings.get('max_segment_mb', 64) * 1024 * 1024),
+            flush_every=settings.get('flush_every', 100),
+            flush_interval=settings.get('flush_interval', 5),
+            fsync=settings.get('fsync', True)
+        )
+
+    def _data_path(self, segment_id):
+        return os.path.join(self.base_path, f"seg-{segment_id:06d}.jsonl")
+
+    def _index_path(self, segment_id):
+        return os.path.join(self.base_path, f"seg-{segment_id:06d}.idx")
+
+    def list_segments(self):
+        """按顺序返回所有分段编号"""
+        segments = []
+        for filename in os.listdir(self.base_path):
+            match = SEGMENT_RE.match(filename)
+            if match:
+                segments.append(int(match.group(1)))
+        return sorted(segments)
+
+    def _read_index(self, segment_id):
+        """读取分段索引，忽略未完整写入的行"""
+        entries = []
+        try:
+            with open(self._index_path(segment_id), 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _recover(self, segment_id):
+        """按索引校验最后一个分段，截断崩溃时未完整写入的数据和索引，返回分段大小"""
+        data_path = self._data_path(segment_id)
+        data_size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        entries = self._read_index(segment_id)
+        valid = [entry for entry in entries if entry[3] + entry[4] <= data_size]
+        end = max((entry[3] + entry[4] for entry in valid), default=0)
+
+        index_size = os.path.getsize(self._index_path(segment_id)) if os.path.exists(self._index_path(segment_id)) else 0
+        index_bytes = b''.join(self._index_line(entry) for entry in valid)
+        if data_size != end or index_size != len(index_bytes):
+            self.logger.warning(f"分段未完整写入，截断到最后一条完整记录: {data_path} "
+                                f"({data_size} -> {end} 字节, 索引 {len(entries)} -> {len(valid)} 条)")
+            with open(data_path, 'ab') as f:
+                f.truncate(end)
+            with open(self._index_path(segment_id), 'wb') as f:
+                f.write(index_bytes)
+        return end
+
+    @staticmethod
+    def _index_line(entry):
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+
+    def append(self, collection, section, date, data, on_commit=None):
+        """追加一条记录，达到批量条数或时间间隔时写盘
+
+        Args:
+            on_commit: 记录及其索引写盘后调用的无参回调
+        """
+        record = {'collection': collection, 'section': section, 'date': date, 'data': data}
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('分段存储已关闭')
+            self.pending.append(([collection, section, date], line, on_commit))
+            if len(self.pending) >= self.flush_every or time.monotonic() - self.last_flush >= self.flush_interval:
+                self.flush()
+
+    def flush(self):
+        """将缓冲中的记录写入分段文件，再写入对应的索引"""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.pending or self.closed:
+                return
+            pending, self.pending = self.pending, []
+            start, size = 0, self.segment_size
+            for position, (_, line, _) in enumerate(pending):
+                if size and size + len(line) > self.max_segment_bytes:
+                    if not self._write_batch(pending[start:position]):
+                        self.pending = pending[start:] + self.pending
+                        return
+                    self._roll()
+                    start, size = position, 0
+                size += len(line)
+            if not self._write_batch(pending[start:]):
+                self.pending = pending[start:] + self.pending
+
+    def _write_batch(self, batch):
+        """将同一分段中的一批记录写盘后调用各自的回调，写盘失败时回滚并返回False"""
+        if not batch:
+            return True
+        data_parts, index_parts = [], []
+        offset = self.segment_size
+        for key, line, _ in batch:
+            index_parts.append(self._index_line(key + [offset, len(line)]))
+            data_parts.append(line)
+            offset += len(line)
+        index_size = os.fstat(self.index_file.fileno()).st_size
+        try:
+            self._write(data_parts, index_parts)
+        except OSError as e:
+            self.logger.error(f"分段写盘失败，{len(batch)} 条记录保留在缓冲中稍后重试: {str(e)}")
+            self._rollback(index_size)
+            return False
+        self.segment_size = offset
+        for _, _, on_commit in batch:
+            if on_commit is None:
+                continue
+            try:
+                on_commit()
+            except Exception as e:
+                self.logger.error(f"分段写盘后回调失败: {str(e)}")
+        return True
+
+    def _rollback(self, index_size):
+        """截断写盘失败时已写入的部分数据和索引，并重新打开当前分段"""
+        for f in (self.data_file, self.index_file):
+            try:
+                f.close()
+            except OSError:
+                pass
+        data_path, index_path = self._data_path(self.segment_id), self._index_path(self.segment_id)
+        try:
+            os.truncate(data_path, self.segment_size)
+            os.truncate(index_path, index_size)
+        except OSError as e:
+            self.logger.error(f"截断分段失败: {data_path} - {str(e)}")
+        self.data_file = open(data_path, 'ab')
+        self.index_file = open(index_path, 'ab')
+        # 截断失败时残留的数据没有索引，读取时不会用到，后续记录从文件末尾继续写入
+        self.segment_size = os.path.getsize(data_path)
+
+    def _write(self, data_parts, index_parts):
+        if not data_parts:
+            return
+        self.data_file.write(b''.join(data_parts))
+        self.data_file.flush()
+        if self.fsync:
+            os.fsync(self.data_file.fileno())
+        self.index_file.write(b''.join(index_parts))
+        self.index_file.flush()
+        if self.fsync:
+            os.fsync(self.index_file.fileno())
+
+    def _roll(self):
+        """当前分段写满，切换到下一个分段"""
+        self.data_file.close()
+        self.index_file.close()
+        self.segment_id += 1
+        self.segment_size = 0
+        self.data_file = open(self._data_path(self.segment_id), 'ab')
+        self.index_file = open(self._index_path(self.segment_id), 'ab')
+        self.logger.info(f"切换到新分段: {self._data_path(self.segment_id)}")
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"分段定时写盘失败: {str(e)}")
+
+    def iter_entries(self, collection=None, section=None, date=None):
+        """按集合、栏目和日期筛选索引项，返回 (分段编号, 偏移, 长度) 迭代器"""
+        self.flush()
+        for segment_id in self.list_segments():
+            for entry_collection, entry_section, entry_date, offset, length in self._read_index(segment_id):
+                if collection is not None and entry_collection != collection:
+                    continue
+                if section is not None and entry_section != section:
+                    continue
+                if date is not None and entry_date != date:
+                    continue
+                yield segment_id, offset, length
+
+    def iter_records(self, collection=None, section=None, date=None):
+        """按集合、栏目和日期读取记录，每条返回 {collection, section, date, data}"""
+        handles = {}
+        try:
+            for segment_id, offset, length in self.iter_entries(collection, section, date):
+                f = handles.get(segment_id)
+                if f is None:
+                    f = handles[segment_id] = open(self._data_path(segment_id), 'rb')
+                f.seek(offset)
+                yield json.loads(f.read(length))
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def read(self, segment_id, offset, length):
+        """按索引位置读取单条记录"""
+        self.flush()
+        with open(self._data_path(segment_id), 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+    def sections(self, collection=None):
+        """统计各栏目各日期的记录数 {栏目: {日期: 条数}}"""
+        self.flush()
+        result = {}
+        for segment_id in self.list_segments():
+            for entry_collection, entry_section, entry_date, _, _ in self._read_index(segment_id):
+                if collection is not None and entry_collection != collection:
+                    continue
+                dates = result.setdefault(entry_section, {})
+                dates[entry_date] = dates.get(entry_date, 0) + 1
+        return result
+
+    def stats(self):
+        """获取分段数量、记录数和占用空间"""
+        self.flush()
+        segments = self.list_segments()
+        return {
+            'segments': len(segments),
+            'records': sum(len(self._read_index(segment_id)) for segment_id in segments),
+            'size': sum(os.path.getsize(self._data_path(segment_id)) for segment_id in segments
+                        if os.path.exists(self._data_path(segment_id))),
+        }
+
+    def close(self):
+        """写入缓冲中的记录并关闭文件"""
+        self.stop_event.set()
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            if self.pending:
+                self.logger.error(f"关闭分段存储时仍有 {len(self.pending)} 条记录未能写盘")
+            self.closed = True
+            self.data_file.close()
+            self.index_file.close()
@@ -0,0 +1,302 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+from utils.logger import setup_logger
+
+# insert_many中表示政策数据的集合名
+POLICY_COLLECTION = 'policies'
+
+
+class SqlitePolicyStore:
+    """嵌入式SQLite政策存储
+
+    政策保存到policies表，source_url、section_name、publish_date建有索引；
+    标题和正文另建FTS5全文索引（trigram分词，支持中文子串检索），由触发器与
+    policies表保持同步。人员信息等其他数据按集合保存到documents表。
+    写入先进入内存缓冲，累计到一定条数或超过时间间隔后在一个事务中批量提交，
+    查询前先提交缓冲中的数据。政策可附带提交后的回调，事务提交成功后才调用；
+    提交失败的数据保留在缓冲中下次重试。
+    """
+
+    POLICY_COLUMNS = ('db_type', 'section_name', 'source_url', 'title', 'content',
+                      'publish_date', 'content_hash', 'saved_date', 'saved_at', 'data')
+
+    def __init__(self, db_path='data/policy_data/policies.db', batch_size=200, flush_interval=5):
+        self.logger = setup_logger('SqlitePolicyStore')
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.pending_policies = []  # 待提交的 (政策行, 提交后回调)
+        self.pending_documents = []
+        self.last_flush = time.monotonic()
+        self.closed = False
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.fts_enabled = self._init_db()
+
+        # 后台定时提交，空闲时缓冲中的数据也不会长时间滞留
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, name='SqliteStoreFlusher', daemon=True)
+        self.flusher.start()
+
+    @classmethod
+    def from_settings(cls, db_path, settings=None):
+        """根据配置创建存储"""
+        settings = settings or {}
+        return cls(
+            db_path=db_path,
+            batch_size=settings.get('batch_size', 200),
+            flush_interval=settings.get('flush_interval', 5)
+        )
+
+    def _init_db(self):
+        """建表和索引，返回是否启用了全文索引"""
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS policies ('
+                'id INTEGER PRIMARY KEY, '
+                'db_type TEXT, '
+                'section_name TEXT, '
+                'source_url TEXT, '
+                'title TEXT, '
+                'content TEXT, '
+                'publish_date TEXT, '
+                'content_hash TEXT, '
+                'saved_date TEXT, '
+                'saved_at REAL, '
+                'data TEXT)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_policies_source_url ON policies (source_url)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_policies_section ON policies (section_name, saved_date)')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_policies_publish_date ON policies (publish_date)')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS documents ('
+                'id INTEGER PRIMARY KEY, '
+                'collection TEXT NOT NULL, '
+                'saved_date TEXT, '
+                'saved_at REAL, '
+                'data TEXT)'
+            )
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_documents_collection ON documents (collection, saved_date)')
+            self.conn.commit()
+
+            try:
+                self.conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS policies_fts USING fts5("
+                    "title, content, content='policies', content_rowid='id', tokenize='trigram')"
+                )
+            except sqlite3.OperationalError as e:
+                self.logger.warning(f"SQLite不支持FTS5 trigram分词，全文检索不可用: {str(e)}")
+                return False
+            self.conn.executescript(
+                'CREATE TRIGGER IF NOT EXISTS policies_ai AFTER INSERT ON policies BEGIN '
+                'INSERT INTO policies_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END;'
+                'CREATE TRIGGER IF NOT EXISTS policies_ad AFTER DELETE ON policies BEGIN '
+                "INSERT INTO policies_fts (policies_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); END;"
+                'CREATE TRIGGER IF NOT EXISTS policies_au AFTER UPDATE OF title, content ON policies BEGIN '
+                "INSERT INTO policies_fts (policies_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content); "
+                'INSERT INTO policies_fts (rowid, title, content) VALUES (new.id, new.title, new.content); END;'
+            )
+            self.conn.commit()
+            return True
+
+    def _policy_row(self, db_type, section_name, data, content_hash=None):
+        now = datetime.now()
+        return (db_type, section_name, data.get('source_url'), data.get('title'), data.get('content'),
+                data.get('publish_date'), content_hash, str(now.date()), now.timestamp(),
+                json.dumps(data, ensure_ascii=False))
+
+    def _document_row(self, collection, data):
+        now = datetime.now()
+        return (collection, str(now.date()), now.timestamp(), json.dumps(data, ensure_ascii=False))
+
+    def save_policy(self, db_type, section_name, data, content_hash=None, on_commit=None):
+        """缓冲一条政策，达到批量条数或时间间隔时提交
+
+        Args:
+            on_commit: 政策所在事务提交后调用的无参回调
+        """
+        with self.lock:
+            self._check_open()
+            self.pending_policies.append((self._policy_row(db_type, section_name, data, content_hash), on_commit))
+            self._maybe_flush()
+        return True
+
+    def save_document(self, collection, data):
+        """缓冲一条其他集合的数据"""
+        with self.lock:
+            self._check_open()
+            self.pending_documents.append(self._document_row(collection, data))
+            self._maybe_flush()
+        return True
+
+    def insert_many(self, collection, records, db_type='default', section_names=None, content_hashes=None,
+                    callbacks=None):
+        """在一个事务中批量写入多条数据
+
+        Args:
+            collection: 集合名，POLICY_COLLECTION表示写入政策表
+            records: 数据字典列表
+            section_names: 与records对应的栏目名称（仅政策）
+            content_hashes: 与records对应的内容哈希（仅政策）
+            callbacks: 与records对应的提交后回调（仅政策）
+        """
+        with self.lock:
+            self._check_open()
+            if collection == POLICY_COLLECTION:
+                section_names = section_names or [record.get('section_name') for record in records]
+                content_hashes = content_hashes or [None] * len(records)
+                callbacks = callbacks or [None] * len(records)
+                self.pending_policies.extend(
+                    (self._policy_row(db_type, section_name, record, content_hash), on_commit)
+                    for record, section_name, content_hash, on_commit
+                    in zip(records, section_names, content_hashes, callbacks)
+                )
+            else:
+                self.pending_documents.extend(self._document_row(collection, record) for record in records)
+            self.flush()
+        return len(records)
+
+    def _check_open(self):
+        if self.closed:
+            raise RuntimeError('SQLite存储已关闭')
+
+    def _maybe_flush(self):
+        pending = len(self.pending_policies) + len(self.pending_documents)
+        if pending >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """在一个事务中提交缓冲中的全部数据"""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if self.closed or not (self.pending_policies or self.pending_documents):
+                return
+            policies, self.pending_policies = self.pending_policies, []
+            documents, self.pending_documents = self.pending_documents, []
+            columns = ', '.join(self.POLICY_COLUMNS)
+            placeholders = ', '.join(['?'] * len(self.POLICY_COLUMNS))
+            try:
+                with self.conn:
+                    self.conn.executemany(f'INSERT INTO policies ({columns}) VALUES ({placeholders})',
+                                          [row for row, _ in policies])
+                    self.conn.executemany(
+                        'INSERT INTO documents (collection, saved_date, saved_at, data) VALUES (?, ?, ?, ?)', documents
+                    )
+            except sqlite3.Error as e:
+                # 事务已回滚，整批放回缓冲下次重试
+                self.pending_policies = policies + self.pending_policies
+                self.pending_documents = documents + self.pending_documents
+                self.logger.error(f"批量写入失败，{len(policies)} 条政策、{len(documents)} 条数据保留在缓冲中稍后重试: "
+                                  f"{str(e)}")
+                return
+            for _, on_commit in policies:
+                if on_commit is None:
+                    continue
+                try:
+                    on_commit()
+                except Exception as e:
+                    self.logger.error(f"提交后回调失败: {str(e)}")
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"定时提交失败: {str(e)}")
+
+    def _rows_to_policies(self, rows):
+        return [json.loads(row['data']) for row in rows]
+
+    def query_policies(self, section_name=None, saved_date=None, publish_date=None, source_url=None,
+                       db_type=None, limit=None):
+        """按栏目、保存日期、发布日期或来源URL查询政策，按保存顺序返回"""
+        conditions, params = [], []
+        for column, value in (('section_name', section_name), ('saved_date', saved_date),
+                              ('publish_date', publish_date), ('source_url', source_url), ('db_type', db_type)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                params.append(value)
+        sql = 'SELECT data FROM policies'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY id'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.lock:
+            self.flush()
+            rows = self.conn.execute(sql, params).fetchall()
+        return self._rows_to_policies(rows)
+
+    def search(self, query, limit=20):
+        """全文检索标题和正文，按相关度返回政策
+
+        trigram分词要求检索词至少3个字符，更短的检索词退化为LIKE子串匹配。
+        """
+        with self.lock:
+            self.flush()
+            if self.fts_enabled and len(query) >= 3:
+                rows = self.conn.execute(
+                    'SELECT p.data FROM policies_fts f JOIN policies p ON p.id = f.rowid '
+                    'WHERE policies_fts MATCH ? ORDER BY f.rank LIMIT ?',
+                    ('"' + query.replace('"', '""') + '"', limit)
+                ).fetchall()
+            else:
+                pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+                rows = self.conn.execute(
+                    "SELECT data FROM policies WHERE title LIKE ? ESCAPE '\\' OR content LIKE ? ESCAPE '\\' "
+                    'ORDER BY id DESC LIMIT ?', (pattern, pattern, limit)
+                ).fetchall()
+        return self._rows_to_policies(rows)
+
+    def query_documents(self, collection, saved_date=None, limit=None):
+        """读取指定集合的数据"""
+        sql = 'SELECT data FROM documents WHERE collection = ?'
+        params = [collection]
+        if saved_date is not None:
+            sql += ' AND saved_date = ?'
+            params.append(saved_date)
+        sql += ' ORDER BY id'
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.lock:
+            self.flush()
+            rows = self.conn.execute(sql, params).fetchall()
+        return [json.loads(row['data']) for row in rows]
+
+    def stats(self):
+        """获取政策和其他数据的条数"""
+        with self.lock:
+            self.flush()
+            return {
+                'policies': self.conn.execute('SELECT COUNT(*) FROM policies').fetchone()[0],
+                'documents': self.conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0],
+                'fts_enabled': self.fts_enabled,
+            }
+
+    def close(self):
+        """提交缓冲中的数据并关闭数据库连接"""
+        self.stop_event.set()
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            if self.pending_policies or self.pending_documents:
+                self.logger.error(f"关闭SQLite存储时仍有 {len(self.pending_policies)} 条政策、"
+                                  f"{len(self.pending_documents)} 条数据未能提交")
+            self.closed = True
+            self.conn.close()
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+from utils.logger import setup_logger
+
+
+class SectionStateStore:
+    """栏目监测状态持久化存储
+
+    使用SQLite(WAL模式)保存每个栏目的内容指纹、HTTP校验头、失败计数和调度时间，
+    每次检查后增量写入，监测服务重启时加载，避免重启后重新做"首次检查"。
+    同时保存列表页上的详情链接，用于对比出新增链接，只爬取新出现的详情页。
+    """
+
+    # 需要持久化的栏目字段及其列类型
+    STATE_FIELDS = {
+        'content_hash': 'TEXT',
+        'simhash': 'TEXT',
+        'etag': 'TEXT',
+        'last_modified': 'TEXT',
+        'next_check': 'REAL',
+        'last_checked': 'REAL',
+        'failure_count': 'INTEGER',
+    }
+
+    def __init__(self, db_path='data/monitor_state.db'):
+        self.logger = setup_logger('SectionStateStore')
+        self.db_path = db_path
+        self.lock = threading.Lock()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._init_db()
+
+    def _init_db(self):
+        """初始化数据库，并为新增字段补充列"""
+        with self.lock:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('PRAGMA synchronous=NORMAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS section_state ('
+                'site_name TEXT NOT NULL, '
+                'url TEXT NOT NULL, '
+                'updated_at REAL, '
+                'PRIMARY KEY (site_name, url))'
+            )
+            existing = {row['name'] for row in self.conn.execute('PRAGMA table_info(section_state)')}
+            for field, column_type in self.STATE_FIELDS.items():
+                if field not in existing:
+                    self.conn.execute(f'ALTER TABLE section_state ADD COLUMN {field} {column_type}')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS section_links ('
+                'site_name TEXT NOT NULL, '
+                'url TEXT NOT NULL, '
+                'links TEXT NOT NULL, '
+                'updated_at REAL, '
+                'PRIMARY KEY (site_name, url))'
+            )
+            self.conn.commit()
+
+    def load_site(self, site_name):
+        """加载站点下所有栏目的状态
+
+        Returns:
+            dict: {url: {字段: 值}}，只包含非空字段
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT * FROM section_state WHERE site_name = ?', (site_name,)
+            ).fetchall()
+
+        states = {}
+        for row in rows:
+            states[row['url']] = {
+                field: row[field] for field in self.STATE_FIELDS if row[field] is not None
+            }
+        return states
+
+    def save(self, site_name, data):
+        """增量保存单个栏目（或单链接站点）的状态"""
+        url = data.get('url')
+        if not url:
+            return False
+
+        fields = list(self.STATE_FIELDS)
+        values = [data.get(field) for field in fields]
+        columns = ', '.join(['site_name', 'url', 'updated_at'] + fields)
+        placeholders = ', '.join(['?'] * (len(fields) + 3))
+        updates = ', '.join(f'{field} = excluded.{field}' for field in ['updated_at'] + fields)
+
+        try:
+            with self.lock:
+                self.conn.execute(
+                    f'INSERT INTO section_state ({columns}) VALUES ({placeholders}) '
+                    f'ON CONFLICT(site_name, url) DO UPDATE SET {updates}',
+                    [site_name, url, time.time()] + values
+                )
+                self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"保存栏目状态失败: {site_name} - {url} - {str(e)}")
+            return False
+
+    def load_links(self, site_name, url):
+        """加载栏目列表页上次提取的详情链接
+
+        Returns:
+            list: 按页面顺序排列的链接，没有记录时返回None
+        """
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT links FROM section_links WHERE site_name = ? AND url = ?', (site_name, url)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row['links'])
+        except ValueError:
+            return None
+
+    def save_links(self, site_name, url, links):
+        """保存栏目列表页当前的详情链接"""
+        try:
+            with self.lock:
+                self.conn.execute(
+                    'INSERT INTO section_links (site_name, url, links, updated_at) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(site_name, url) DO UPDATE SET links = excluded.links, updated_at = excluded.updated_at',
+                    (site_name, url, json.dumps(links, ensure_ascii=False), time.time())
+                )
+                self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"保存栏目链接失败: {site_name} - {url} - {str(e)}")
+            return False
+
+    def close(self):
+        """关闭数据库连接"""
+        with self.lock:
+            self.conn.close()
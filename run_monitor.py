@@ -20,6 +20,13 @@ def main():
     parser.add_argument('--disable-proxy', action='store_true', help='禁用代理服务器')
     parser.add_argument('--disable-ssl-verify', action='store_true', help='禁用SSL证书验证')
     parser.add_argument('--disable-ssl-warnings', action='store_true', help='禁用SSL警告信息')
+    # 检查引擎相关参数
+    parser.add_argument('--engine', choices=['thread', 'async'], default=None,
+                        help='检查引擎: thread为逐个检查, async为asyncio调度并在线程池中并发检查(默认读取配置)')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='异步引擎全局最大并发数')
+    parser.add_argument('--per-host-concurrency', type=int, default=None, help='异步引擎单主机最大并发数')
+    parser.add_argument('--detection-mode', choices=['conditional_get', 'head'], default=None,
+                        help='变化检测模式: conditional_get为单次条件GET, head为先HEAD后GET(默认读取配置)')
     args = parser.parse_args()
     
     # 设置日志
@@ -43,7 +50,11 @@ def main():
         monitor = PolicyMonitor(
             link_pool_dir=args.link_pool,
             check_interval=args.interval,
-            verify_ssl=not args.disable_ssl_verify
+            verify_ssl=not args.disable_ssl_verify,
+            engine=args.engine,
+            max_concurrency=args.max_concurrency,
+            per_host_concurrency=args.per_host_concurrency,
+            detection_mode=args.detection_mode
         )
         
         # 添加以下代码，强制重新加载sz_gov配置
@@ -1,19 +1,66 @@
 # 在文件顶部添加导入
+import os
+import copy
 import yaml
 import json
+import threading
 from abc import ABC, abstractmethod
 from urllib.parse import urljoin
-from core.db_client import DBClient
+from core.db_client import get_db_client
 from utils.logger import setup_logger
 from utils.anti_spider import get_random_ua
+from utils.seen_index import get_seen_index
+from spiders.rules import compile_rules, parse_html
 from scrapy.http import HtmlResponse
 
+# 已解析的爬虫配置缓存: {路径: (文件版本, 配置)}
+_config_cache = {}
+_config_lock = threading.Lock()
+
+
+def config_version(config_path):
+    """配置文件的版本（修改时间和大小），文件不存在时返回None"""
+    try:
+        stat = os.stat(config_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_spider_config(config_path):
+    """加载爬虫规则配置，同一文件只解析一次，文件修改后重新解析
+    
+    Returns:
+        tuple: (文件版本, 配置副本)
+    """
+    version = config_version(config_path)
+    cached = _config_cache.get(config_path)
+    if cached is None or cached[0] != version:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            # 这里需要根据实际配置文件格式解析
+            config = yaml.safe_load(f) if config_path.endswith('.yaml') else json.load(f)
+        cached = (version, config)
+        with _config_lock:
+            _config_cache[config_path] = cached
+    # 返回副本，避免爬虫修改配置影响其他实例
+    return cached[0], copy.deepcopy(cached[1])
+
+
 class BaseSpider(ABC):
+    # 爬虫必需的XPath规则 {配置段: [规则名]}，加载配置时校验
+    REQUIRED_RULES = {}
+
     def __init__(self, config_path):
         self.logger = setup_logger(self.__class__.__name__)
-        self.db = DBClient()
+        # 共享的存储客户端，避免每个爬虫实例重复初始化
+        self.db = get_db_client()
+        self.config_path = config_path
         self.config = self._load_config(config_path)
+        # 预编译XPath规则并校验必需规则，实例在爬虫池中复用，只编译一次；
+        # XPath对象求值时持有自身的锁，各实例分别编译避免并发解析时互相等待
+        self.rules = compile_rules(self.config, self.REQUIRED_RULES, config_path)
         self.headers = {'User-Agent': get_random_ua()}
+        self.seen_index = get_seen_index()
 
     @abstractmethod
     def parse_list(self, response):
@@ -32,10 +79,32 @@ class BaseSpider(ABC):
         return self.parse_list(response)
 
     def _load_config(self, config_path):
-        # 加载爬虫规则配置
-        with open(config_path, 'r', encoding='utf-8') as f:
-            # 这里需要根据实际配置文件格式解析
-            return yaml.safe_load(f) if config_path.endswith('.yaml') else json.load(f)
+        # 加载爬虫规则配置，并记录文件版本用于判断实例是否过期
+        self.config_version, config = load_spider_config(config_path)
+        return config
+
+    def is_config_current(self):
+        """配置文件自实例创建后是否未被修改"""
+        return config_version(self.config_path) == self.config_version
+
+    def page_tree(self, response):
+        """将响应体直接解析为lxml文档树，配合预编译规则使用"""
+        return parse_html(response.body, response.encoding or 'utf-8')
+
+    def prefetched_response(self, url, prefetched=None):
+        """将监测器已下载的列表页转换为HtmlResponse，避免重复下载
+        
+        Args:
+            prefetched: 包含url、body、headers、encoding的页面信息，为空时返回None
+        """
+        if not prefetched or not prefetched.get('body'):
+            return None
+        return HtmlResponse(
+            url=prefetched.get('url') or url,
+            body=prefetched['body'],
+            headers=prefetched.get('headers'),
+            encoding=prefetched.get('encoding') or 'utf-8'
+        )
 
     def _absolute_url(self, base_url, relative_path):
         return urljoin(base_url, relative_path)
\ No newline at end of file
@@ -3,23 +3,42 @@ import sys
 # 添加项目根目录到Python路径（需要覆盖三级目录）
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
+import re
 import scrapy
+from lxml import etree
 from spiders.base_spider import BaseSpider
 
+# 配置中没有的兜底规则
+TITLE_FALLBACK = etree.XPath('normalize-space(//h1)')
+PUBLISH_DATE_META = etree.XPath('//meta[@name="PubDate"]/@content')
+PUBLISH_DATE_TEXT = etree.XPath('//div[contains(text(), "发布日期")]/following-sibling::div/text()')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
 class NdrcGovSpider(BaseSpider):
     name = "ndrc_gov_spider"
     custom_settings = {
         'DOWNLOAD_DELAY': 3,
         'CONCURRENT_REQUESTS': 1
     }
+    REQUIRED_RULES = {
+        'list_rules': ['policy_links', 'next_page'],
+        'detail_rules': ['title', 'content']
+    }
 
     def parse_list(self, response):
-        links = response.xpath(self.config['list_rules']['policy_links']).extract()
-        next_page = response.xpath(self.config['list_rules']['next_page']).extract_first()
+        tree = self.page_tree(response)
+        links = self.rules.list.all('policy_links', tree)
+        next_page = self.rules.list.first('next_page', tree)
         
-        for link in links:
+        # 跳过已入库的详情页
+        urls = [self._absolute_url(response.url, link.strip()) for link in links]
+        new_urls = self.seen_index.filter_new(urls)
+        if len(new_urls) < len(urls):
+            self.logger.info(f"跳过已入库的详情页 {len(urls) - len(new_urls)} 个: {response.url}")
+        
+        for url in new_urls:
             yield scrapy.Request(
-                url=self._absolute_url(response.url, link),
+                url=url,
                 callback=self.parse_detail
             )
         
@@ -39,15 +58,27 @@ class NdrcGovSpider(BaseSpider):
         if not section_name and hasattr(self, 'current_section'):
             section_name = self.current_section
         
+        tree = self.page_tree(response)
         item = {
-            'title': response.xpath('normalize-space(//meta[@name="ArticleTitle"]/@content)').get() or response.xpath('normalize-space(//h1)').get(),
-            'content': '\n'.join([p.strip() for p in response.xpath('//div[@class="TRS_Editor"]//text()').getall() if p.strip()]),
+            'title': ' '.join(self.rules.detail.first('title', tree).split()) or TITLE_FALLBACK(tree),
+            'content': '\n'.join(self.rules.detail.texts('content', tree)),
             'source_url': response.url,
-            'publish_date': response.xpath('//meta[@name="PubDate"]/@content').get() or response.xpath('//div[contains(text(), "发布日期")]/following-sibling::div/text()').re_first(r'\d{4}-\d{2}-\d{2}'),
+            'publish_date': self._publish_date(tree),
             'section_name': section_name  # 添加栏目信息
         }
         
         if item['title'] and item['content']:
             self.db.save_policy(item)
         else:
-            self.logger.warning(f"无效内容页面: {response.url}")
\ No newline at end of file
+            self.logger.warning(f"无效内容页面: {response.url}")
+
+    def _publish_date(self, tree):
+        """优先使用PubDate元数据，否则从"发布日期"字段中提取"""
+        meta = PUBLISH_DATE_META(tree)
+        if meta:
+            return meta[0]
+        for text in PUBLISH_DATE_TEXT(tree):
+            match = DATE_RE.search(text)
+            if match:
+                return match.group()
+        return None
\ No newline at end of file
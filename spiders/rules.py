@@ -0,0 +1,110 @@
+import threading
+from lxml import etree, html
+
+# detail_rules中不是XPath的配置项
+NON_XPATH_RULES = {'save_path'}
+
+# 规则所在的配置段
+RULE_SECTIONS = ('list_rules', 'detail_rules')
+
+
+class RuleSet:
+    """一个配置段（list_rules/detail_rules）预编译后的XPath规则"""
+
+    def __init__(self, section, rules):
+        self.section = section
+        self.rules = rules
+
+    def __contains__(self, name):
+        return name in self.rules
+
+    def __getitem__(self, name):
+        return self.rules[name]
+
+    def get(self, name):
+        return self.rules.get(name)
+
+    def all(self, name, node):
+        """返回规则在节点上的全部结果"""
+        return self.rules[name](node)
+
+    def first(self, name, node, default=''):
+        """返回规则的第一个结果，字符串结果去掉首尾空白"""
+        result = self.rules[name](node)
+        if isinstance(result, list):
+            result = result[0] if result else None
+        if result is None:
+            return default
+        return result.strip() if isinstance(result, str) else result
+
+    def texts(self, name, node):
+        """返回规则匹配到的非空文本，已去掉首尾空白"""
+        return [text.strip() for text in self.rules[name](node) if isinstance(text, str) and text.strip()]
+
+
+class SpiderRules:
+    """爬虫配置中全部XPath规则，加载配置时编译一次"""
+
+    def __init__(self, sections):
+        self.sections = sections
+
+    @property
+    def list(self):
+        return self.sections['list_rules']
+
+    @property
+    def detail(self):
+        return self.sections['detail_rules']
+
+
+def compile_rules(config, required=None, source=''):
+    """将配置中的list_rules/detail_rules编译为lxml.etree.XPath
+
+    Args:
+        config: 爬虫配置
+        required: 爬虫必需的规则 {配置段: [规则名]}
+        source: 配置来源，用于错误信息
+
+    Raises:
+        ValueError: 缺少必需规则，或规则不是合法的XPath
+    """
+    sections = {}
+    for section in RULE_SECTIONS:
+        rules = config.get(section) or {}
+        if not isinstance(rules, dict):
+            raise ValueError(f"爬虫配置 {source} 的 {section} 必须是映射")
+
+        compiled = {}
+        for name, expression in rules.items():
+            if name in NON_XPATH_RULES:
+                continue
+            if not isinstance(expression, str) or not expression.strip():
+                raise ValueError(f"爬虫配置 {source} 的规则 {section}.{name} 不是有效的XPath字符串")
+            try:
+                compiled[name] = etree.XPath(expression)
+            except etree.XPathSyntaxError as e:
+                raise ValueError(f"爬虫配置 {source} 的规则 {section}.{name} 语法错误: {expression} - {str(e)}")
+        sections[section] = RuleSet(section, compiled)
+
+    missing = [f"{section}.{name}" for section, names in (required or {}).items()
+               for name in names if name not in sections.get(section, {})]
+    if missing:
+        raise ValueError(f"爬虫配置 {source} 缺少必需规则: {', '.join(missing)}")
+    return SpiderRules(sections)
+
+
+_parsers = threading.local()
+
+
+def parse_html(body, encoding='utf-8'):
+    """将响应体解析为lxml.html文档树，每个线程按编码复用解析器"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+        encoding = 'utf-8'
+    cache = getattr(_parsers, 'cache', None)
+    if cache is None:
+        cache = _parsers.cache = {}
+    parser = cache.get(encoding)
+    if parser is None:
+        parser = cache[encoding] = html.HTMLParser(encoding=encoding)
+    return html.fromstring(body, parser=parser)
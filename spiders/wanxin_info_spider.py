@@ -5,10 +5,16 @@ from lxml import html
 from spiders.base_spider import BaseSpider
 from scrapy.http import Request, HtmlResponse
 from datetime import datetime
-import requests
+from utils.http_pool import get_session
+from utils.rate_limiter import rate_limiter
 
 class WanxinInfoSpider(BaseSpider):
     """万信人员信息网站爬虫"""
+    REQUIRED_RULES = {
+        'list_rules': ['person_items'],
+        'detail_rules': ['name', 'age', 'position', 'department']
+    }
+
     def __init__(self, config_path):
         super().__init__(config_path)
         self.name = "wanxin_info_spider"
@@ -22,8 +28,12 @@ class WanxinInfoSpider(BaseSpider):
         self.start_urls = ["https://wanxin20.github.io/ceshi/"]
     
     # 添加start_requests方法
-    def start_requests(self, start_urls=None):
-        """爬虫入口方法，处理请求"""
+    def start_requests(self, start_urls=None, prefetched=None):
+        """爬虫入口方法，处理请求
+        
+        Args:
+            prefetched: 监测器已下载的列表页(url/body/headers/encoding)，提供时不再重复下载
+        """
         self.logger.info(f"开始爬取万信人员信息")
         
         if not start_urls:
@@ -32,12 +42,21 @@ class WanxinInfoSpider(BaseSpider):
         results = []
         for url in start_urls:
             try:
+                # 使用监测器已下载的页面
+                html_response = self.prefetched_response(url, prefetched)
+                if html_response is not None:
+                    self.logger.info(f"使用已下载的页面: {url}")
+                    results.extend(self.parse_list(html_response))
+                    continue
+                
                 self.logger.info(f"爬取URL: {url}")
-                # 创建自定义会话
-                session = requests.Session()
+                # 等待主机请求配额，使用按主机共享的会话复用连接
+                rate_limiter.acquire(url)
+                session = get_session(url)
                 # 设置代理（如果需要）
+                proxies = None
                 if hasattr(self.config, 'get') and self.config.get('proxy'):
-                    session.proxies = {
+                    proxies = {
                         'http': self.config['proxy'],
                         'https': self.config['proxy']
                     }
@@ -46,6 +65,7 @@ class WanxinInfoSpider(BaseSpider):
                 response = session.get(
                     url, 
                     headers=self.headers,
+                    proxies=proxies,
                     verify=False,
                     timeout=30
                 )
@@ -74,30 +94,13 @@ class WanxinInfoSpider(BaseSpider):
         
         try:
             # 获取所有人员信息项
-            person_items = response.xpath(self.config['list_rules']['person_items'])
+            tree = self.page_tree(response)
+            person_items = self.rules.list.all('person_items', tree)
             self.logger.info(f"找到 {len(person_items)} 条人员信息")
             
             # 由于这是单页面网站，我们直接在这里解析详情
-            results = []
-            for person in person_items:
-                # 直接解析每个人员信息
-                detail_rules = self.config['detail_rules']
-                
-                name = person.xpath(detail_rules['name']).get('').strip()
-                age = person.xpath(detail_rules['age']).get('').strip()
-                position = person.xpath(detail_rules['position']).get('').strip()
-                department = person.xpath(detail_rules['department']).get('').strip()
-                
-                person_info = {
-                    'name': name,
-                    'age': age,
-                    'position': position,
-                    'department': department,
-                    'source_url': response.url,
-                    'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                results.append(person_info)
+            crawl_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            results = [self._parse_person(person, response.url, crawl_time) for person in person_items]
             
             # 保存结果
             for person_data in results:
@@ -116,31 +119,18 @@ class WanxinInfoSpider(BaseSpider):
         except AttributeError:
             # 如果response没有meta属性，则尝试直接从response中提取人员信息
             self.logger.warning("Response没有meta属性，尝试直接从页面提取人员信息")
-            person_items = response.xpath(self.config['list_rules']['person_items'])
+            person_items = self.rules.list.all('person_items', self.page_tree(response))
             if not person_items:
                 self.logger.error("未找到人员信息项")
                 return
             
             # 处理每个人员信息项
             results = []
+            crawl_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             for person in person_items:
                 # 直接使用当前person元素进行解析
-                detail_rules = self.config['detail_rules']
-                
-                name = person.xpath(detail_rules['name']).get('').strip()
-                age = person.xpath(detail_rules['age']).get('').strip()
-                position = person.xpath(detail_rules['position']).get('').strip()
-                department = person.xpath(detail_rules['department']).get('').strip()
-                
-                # 构建结构化数据
-                person_data = {
-                    'name': name,
-                    'age': age,
-                    'position': position,
-                    'department': department,
-                    'source_url': response.url,
-                    'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
+                person_data = self._parse_person(person, response.url, crawl_time)
+                name, position, department = person_data['name'], person_data['position'], person_data['department']
                 
                 self.logger.info(f"成功解析人员信息: {name} - {position} - {department}")
                 
@@ -158,52 +148,49 @@ class WanxinInfoSpider(BaseSpider):
         # 将HTML字符串解析为lxml元素
         person_element = html.fromstring(person_html)
         
-        # 使用XPath提取信息
-        detail_rules = self.config['detail_rules']
-        
-        name = self._extract_text(person_element, detail_rules['name'])
-        age = self._extract_text(person_element, detail_rules['age'])
-        position = self._extract_text(person_element, detail_rules['position'])
-        department = self._extract_text(person_element, detail_rules['department'])
+        # 使用预编译的XPath提取信息
+        person_data = self._parse_person(person_element, response.url,
+                                         datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
-        # 构建结构化数据
-        person_data = {
-            'name': name,
-            'age': age,
-            'position': position,
-            'department': department,
-            'source_url': response.url,
-            'crawl_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        
-        self.logger.info(f"成功解析人员信息: {name} - {position} - {department}")
+        self.logger.info(f"成功解析人员信息: {person_data['name']} - {person_data['position']} - {person_data['department']}")
         
         # 保存数据
         self._save_person_data(person_data)
         
         return person_data
 
-    def _extract_text(self, element, xpath):
-        """从元素中提取文本"""
-        result = element.xpath(xpath)
-        return result[0].strip() if result else ""
+    def _parse_person(self, person, source_url, crawl_time):
+        """用预编译的详情规则从单个人员元素中提取信息"""
+        detail = self.rules.detail
+        return {
+            'name': detail.first('name', person),
+            'age': detail.first('age', person),
+            'position': detail.first('position', person),
+            'department': detail.first('department', person),
+            'source_url': source_url,
+            'crawl_time': crawl_time
+        }
 
     def _save_person_data(self, data):
         """保存人员数据"""
-        try:
-            # 使用数据库客户端保存
-            collection = "wanxin_personnel"
-            # 检查db对象是否有save_document方法，如果没有则尝试使用其他方法
-            if hasattr(self.db, 'save_document'):
-                self.db.save_document(collection, data)
-            elif hasattr(self.db, 'insert_one'):
-                self.db.insert_one(collection, data)
-            else:
-                self.logger.warning("数据库客户端没有合适的保存方法，仅保存到文件")
-        except Exception as e:
-            self.logger.error(f"保存到数据库失败: {str(e)}")
+        # 非文件存储时由存储客户端统一保存，不再每个人员单独写一个JSON文件
+        if getattr(self.db, 'storage_type', 'file') != 'file':
+            try:
+                # 使用数据库客户端保存
+                collection = "wanxin_personnel"
+                # 检查db对象是否有save_document方法，如果没有则尝试使用其他方法
+                if hasattr(self.db, 'save_document'):
+                    self.db.save_document(collection, data)
+                    return
+                elif hasattr(self.db, 'insert_one'):
+                    self.db.insert_one(collection, data)
+                    return
+                else:
+                    self.logger.warning("数据库客户端没有合适的保存方法，仅保存到文件")
+            except Exception as e:
+                self.logger.error(f"保存到数据库失败，改为保存到文件: {str(e)}")
         
-        # 同时保存到JSON文件
+        # 保存到JSON文件
         import os
         
         # 确保目录存在
@@ -0,0 +1,104 @@
+import os
+import logging
+import threading
+from types import SimpleNamespace
+
+from core.monitor import PolicyMonitor
+from utils.fingerprint import FingerprintEngine, hamming_distance
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WANXIN_PAGE = os.path.join(ROOT, 'page_source', 'wanxin20.github.io_ceshi_.html')
+URL = 'https://wanxin20.github.io/ceshi/'
+NEW_PERSON = '''
+    <div class="info-container">
+        <div class="person-info">
+            <div class="info-item"><span class="info-label">姓名：</span><span class="info-value">王-9</span></div>
+            <div class="info-item"><span class="info-label">年龄：</span><span class="info-value">31岁</span></div>
+            <div class="info-item"><span class="info-label">职位：</span><span class="info-value">部长</span></div>
+            <div class="info-item"><span class="info-label">部门：</span><span class="info-value">市场部</span></div>
+        </div>
+    </div>
+'''
+
+
+class FakeStateStore:
+    def load_links(self, site_name, url):
+        return []
+
+
+def _monitor(sites=None):
+    monitor = SimpleNamespace(
+        sites=sites or {},
+        state_store=FakeStateStore(),
+        stats_lock=threading.Lock(),
+        change_stats={'changes': 0, 'suppressed_crawls': 0, 'saved_downloads': 0},
+        logger=logging.getLogger('test'),
+    )
+    monitor._get_simhash_threshold = lambda *args: PolicyMonitor._get_simhash_threshold(monitor, *args)
+    return monitor
+
+
+def _page():
+    with open(WANXIN_PAGE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _signature(body):
+    engine = FingerprintEngine.from_settings()
+    return engine.signatures_tree(engine.parse(body.encode('utf-8')))[1]
+
+
+def _with_footer(body, updated, visits):
+    footer = f'<div class="footer"><p>更新时间：{updated}</p><p>访问人数 {visits}</p></div></body>'
+    return body.replace('</body>', footer)
+
+
+def _classify(monitor, old, new):
+    data = {'simhash': old}
+    changed = PolicyMonitor._classify_change(monitor, 'wanxin', 'wanxin_info', URL, data, {'simhash': new}, None)
+    return changed, data
+
+
+def test_one_item_addition_is_reported_by_default():
+    body = _page()
+    old = _signature(body)
+    new = _signature(body.replace('<div class="info-container">', NEW_PERSON + '    <div class="info-container">', 1))
+    assert hamming_distance(old, new) >= 2
+
+    monitor = _monitor()
+    changed, data = _classify(monitor, old, new)
+    assert changed
+    assert monitor.change_stats == {'changes': 1, 'suppressed_crawls': 0, 'saved_downloads': 0}
+    assert data['simhash'] == new
+
+
+def test_counter_date_and_order_changes_are_suppressed_by_default():
+    body = _page()
+    old = _signature(_with_footer(body, '2025-03-08 21:01', 12345))
+    # 页脚日期、访问人数变化，前两个人员的顺序调整
+    head, first, second, *rest = body.split('<div class="person-info">')
+    reordered = '<div class="person-info">'.join([head, second, first] + rest)
+    new = _signature(_with_footer(reordered, '2025-03-09 08:15', 12399))
+    assert hamming_distance(old, new) == 0
+
+    monitor = _monitor()
+    changed, data = _classify(monitor, old, new)
+    assert not changed
+    assert monitor.change_stats == {'changes': 0, 'suppressed_crawls': 1, 'saved_downloads': 1}
+    assert data['simhash'] == old
+
+
+def test_old_signature_format_is_not_compared():
+    body = _page()
+    monitor = _monitor()
+    changed, data = _classify(monitor, '0123456789abcdef', _signature(body))
+    assert changed
+    assert data['simhash'].startswith('i256:')
+
+
+def test_suppression_can_be_disabled_per_site():
+    body = _page()
+    old = _signature(_with_footer(body, '2025-03-08 21:01', 12345))
+    new = _signature(_with_footer(body, '2025-03-09 08:15', 12399))
+    monitor = _monitor({'wanxin_info': {'simhash_threshold': -1}})
+    assert _classify(monitor, old, new)[0]
@@ -0,0 +1,58 @@
+from utils.head_policy import HeadPolicy
+
+HOST = 'www.example.gov.cn'
+CONDITIONAL = {'If-None-Match': '"v1"'}
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _ignored_get(policy, content_changed):
+    """带校验头的GET返回200且校验头未变"""
+    policy.record_get(HOST, CONDITIONAL, FakeResponse(200, {'ETag': '"v1"'}), content_changed)
+
+
+def test_learns_head_when_conditional_get_ignored_and_content_unchanged():
+    policy = HeadPolicy(min_samples=2)
+    _ignored_get(policy, False)
+    assert not policy.should_head(HOST)
+    _ignored_get(policy, False)
+    assert policy.should_head(HOST)
+
+
+def test_unchanged_validators_with_changed_content_are_not_trusted():
+    policy = HeadPolicy(min_samples=2)
+    _ignored_get(policy, True)
+    _ignored_get(policy, True)
+    assert policy.stats()[HOST]['ignored_conditional'] == 0
+    assert not policy.should_head(HOST)
+
+
+def test_stale_validators_disable_head_after_learning():
+    policy = HeadPolicy(min_samples=2)
+    _ignored_get(policy, False)
+    _ignored_get(policy, False)
+    assert policy.should_head(HOST)
+    _ignored_get(policy, True)
+    assert not policy.should_head(HOST)
+
+
+def test_unknown_content_does_not_count_as_ignored():
+    policy = HeadPolicy(min_samples=1)
+    _ignored_get(policy, None)
+    assert not policy.should_head(HOST)
+
+
+def test_forces_full_get_after_max_head_only_checks():
+    policy = HeadPolicy(min_samples=1, max_head_only=3)
+    _ignored_get(policy, False)
+    for _ in range(3):
+        assert policy.should_head(HOST)
+        policy.record_head_only(HOST)
+    # 连续3次只靠HEAD判定后强制发送完整GET
+    assert not policy.should_head(HOST)
+    _ignored_get(policy, False)
+    assert policy.should_head(HOST)
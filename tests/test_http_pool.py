@@ -0,0 +1,26 @@
+import requests
+
+from utils.http_pool import SessionRegistry
+
+
+def _adapter(registry, url):
+    return registry.get_session(url).get_adapter(url)
+
+
+def test_legacy_ssl_only_for_allowlisted_hosts():
+    registry = SessionRegistry(legacy_ssl_hosts=['sz.gov.cn'])
+    assert _adapter(registry, 'https://www.sz.gov.cn/a').ssl_context_factory is not None
+    assert _adapter(registry, 'https://sz.gov.cn/a').ssl_context_factory is not None
+    assert _adapter(registry, 'https://www.ndrc.gov.cn/a').ssl_context_factory is None
+    # 后缀匹配按域名边界，不匹配相似的域名
+    assert _adapter(registry, 'https://notsz.gov.cn/a').ssl_context_factory is None
+
+
+def test_default_registry_keeps_default_ssl_context():
+    registry = SessionRegistry()
+    adapter = _adapter(registry, 'https://www.ndrc.gov.cn/')
+    assert adapter.ssl_context_factory is None
+    # 未指定ssl_context时由urllib3使用默认上下文
+    request = requests.Request('GET', 'https://www.ndrc.gov.cn/').prepare()
+    _, pool_kwargs = adapter.build_connection_pool_key_attributes(request, True)
+    assert 'ssl_context' not in pool_kwargs
@@ -0,0 +1,36 @@
+import time
+import types
+
+from watchdog.events import FileModifiedEvent, FileMovedEvent
+
+from core.monitor import LinkPoolHandler
+
+
+def _monitor(own_writes=()):
+    changes = []
+    return types.SimpleNamespace(
+        changes=changes,
+        apply_site_change=changes.append,
+        status_journal=types.SimpleNamespace(is_own_write=lambda file_path: file_path in own_writes),
+    )
+
+
+def test_burst_of_events_is_processed_once():
+    monitor = _monitor()
+    handler = LinkPoolHandler(monitor, debounce=0.05)
+    for _ in range(5):
+        handler.on_modified(FileModifiedEvent('/pool/ndrc_gov.json'))
+    handler.on_moved(FileMovedEvent('/pool/.ndrc_gov.json.tmp', '/pool/ndrc_gov.json'))
+    # 临时文件和非链接库文件不触发
+    handler.on_modified(FileModifiedEvent('/pool/.ndrc_gov.json.tmp'))
+    handler.on_modified(FileModifiedEvent('/pool/notes.txt'))
+    time.sleep(0.2)
+    assert monitor.changes == ['ndrc_gov']
+
+
+def test_own_write_back_does_not_reload():
+    monitor = _monitor(own_writes={'/pool/wanxin_info.csv'})
+    handler = LinkPoolHandler(monitor, debounce=0.01)
+    handler.on_modified(FileModifiedEvent('/pool/wanxin_info.csv'))
+    time.sleep(0.1)
+    assert monitor.changes == []
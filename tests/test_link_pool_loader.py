@@ -0,0 +1,61 @@
+import os
+import json
+
+import pytest
+
+from benchmarks.bench_link_pool import DEFAULT_CHECK_INTERVAL, build_pool, comparable, legacy_csv
+from utils.link_pool_loader import LinkPoolLoader, detect_csv_schema
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def loader():
+    return LinkPoolLoader(DEFAULT_CHECK_INTERVAL)
+
+
+def test_csv_matches_legacy_pandas_loader_on_wanxin_pool(loader):
+    pytest.importorskip('pandas')
+    file_path = os.path.join(ROOT, 'data', 'link_pool', 'wanxin_info.csv')
+    assert comparable(loader.load(file_path, 'wanxin_info')) == comparable(legacy_csv(file_path, 'wanxin_info'))
+
+
+def test_csv_matches_legacy_pandas_loader_on_synthetic_pool(loader, tmp_path):
+    pytest.importorskip('pandas')
+    csv_path, _ = build_pool(str(tmp_path), 500)
+    legacy = comparable(legacy_csv(csv_path, 'synthetic'))
+    streamed = comparable(loader.load(csv_path, 'synthetic'))
+    assert len(streamed) == len(legacy) == 500
+    for old, new in zip(legacy, streamed):
+        # pandas把混合类型的频率列读成字符串，秒数退回默认间隔；流式加载按秒数解析
+        if new != old:
+            assert new['check_interval'] == 3600 and old['check_interval'] == DEFAULT_CHECK_INTERVAL
+            assert dict(new, check_interval=DEFAULT_CHECK_INTERVAL) == old
+
+
+def test_csv_schema_falls_back_to_column_positions():
+    schema = detect_csv_schema(['标题', '地址', 'priority'])
+    assert schema == {'name': 0, 'url': 1, 'priority': 2, 'last_crawled': None, 'check_interval': None}
+
+
+def test_csv_with_bom_and_short_rows(loader, tmp_path):
+    file_path = tmp_path / 'pool.csv'
+    file_path.write_bytes('\ufeff名称,链接,优先级,爬取频率\n栏目一,https://a.gov.cn/,abc\n栏目二,https://b.gov.cn/,3,weekly\n'
+                          .encode('utf-8'))
+    sections = loader.load(str(file_path), 'pool')['sections']
+    assert [(s['name'], s['url'], s['priority'], s['check_interval']) for s in sections] == [
+        ('栏目一', 'https://a.gov.cn/', 5, DEFAULT_CHECK_INTERVAL),
+        ('栏目二', 'https://b.gov.cn/', 3, 604800),
+    ]
+
+
+def test_json_keeps_existing_next_check(loader, tmp_path):
+    file_path = tmp_path / 'pool.json'
+    file_path.write_text(json.dumps({'name': '站点', 'sections': [
+        {'name': '已排期', 'url': 'https://a.gov.cn/', 'next_check': 123.0},
+        {'name': '未排期', 'url': 'https://b.gov.cn/'},
+    ]}, ensure_ascii=False), encoding='utf-8')
+    sections = loader.load(str(file_path), 'pool')['sections']
+    assert sections[0]['next_check'] == 123.0
+    assert sections[1]['next_check'] > 123.0
+    assert loader.load(str(tmp_path / 'pool.txt'), 'pool') is None
@@ -0,0 +1,54 @@
+import logging
+from types import SimpleNamespace
+
+from core.monitor import PolicyMonitor
+from utils.circuit_breaker import HostCircuitBreaker
+from utils.rate_limiter import HostRateLimiter
+
+URL = 'https://www.example.gov.cn/xxgk/'
+
+
+def _monitor(breaker, limiter):
+    return SimpleNamespace(circuit_breaker=breaker, rate_limiter=limiter, logger=logging.getLogger('test'))
+
+
+def test_open_breaker_does_not_spend_rate_limit_tokens():
+    breaker = HostCircuitBreaker(failure_threshold=1, recovery_timeout=300)
+    breaker.record_failure(URL)
+    limiter = HostRateLimiter(default_rate=0.001, default_burst=1)
+    data = {}
+
+    for _ in range(3):
+        assert PolicyMonitor._detect_update(_monitor(breaker, limiter), 'label', URL, data) == (False, None)
+    assert data['next_check'] > 0
+    # 熔断期间没有消耗配额，恢复后第一次请求可以立即发送
+    assert limiter.reserve(URL) == 0
+
+
+def test_rate_limited_probe_is_released():
+    breaker = HostCircuitBreaker(failure_threshold=1, recovery_timeout=0, probe_timeout=120)
+    breaker.record_failure(URL)
+    limiter = HostRateLimiter(default_rate=0.001, default_burst=1)
+    assert limiter.reserve(URL) == 0  # 用完配额
+
+    data = {}
+    PolicyMonitor._detect_update(_monitor(breaker, limiter), 'label', URL, data)
+    # 被限速推迟的检查没有发出探测请求，其他检查仍可发送探测
+    assert breaker.before_request(URL) == 0
+
+
+def test_report_includes_host_health(caplog):
+    breaker = HostCircuitBreaker(failure_threshold=2, recovery_timeout=300)
+    breaker.record_success(URL, 0.2)
+    breaker.record_failure(URL, 1.0)
+    breaker.record_failure(URL, 1.0)
+    http_pool = SimpleNamespace(stats=lambda: {'hosts': {}, 'total': {'opened': 1, 'reused': 2, 'requests': 3}})
+    monitor = SimpleNamespace(circuit_breaker=breaker, http_pool=http_pool, logger=logging.getLogger('test'),
+                              get_change_stats=lambda: {'changes': 1, 'suppressed_crawls': 0, 'saved_downloads': 0})
+    monitor.get_health_stats = lambda: PolicyMonitor.get_health_stats(monitor)
+
+    with caplog.at_level(logging.INFO, logger='test'):
+        PolicyMonitor.report_stats(monitor)
+    health = [record for record in caplog.records if '主机健康' in record.getMessage()]
+    assert len(health) == 1 and health[0].levelno == logging.WARNING
+    assert '错误率: 0.667' in health[0].getMessage() and '平均延迟: 0.733s' in health[0].getMessage()
@@ -0,0 +1,95 @@
+import time
+from datetime import datetime
+
+from core.scheduler import TaskScheduler
+
+
+class FakeMonitor:
+    """按栏目名执行预设动作的监测器"""
+
+    default_check_interval = 3600
+
+    def __init__(self, sections, actions):
+        self.sections = sections
+        self.actions = actions
+        self.calls = []
+        self.reports = 0
+
+    def report_stats(self):
+        self.reports += 1
+
+    def get_site_targets(self, site_name):
+        return [(site_name, section, False) for section in self.sections]
+
+    def _run_checks(self, targets):
+        for _, data, _ in targets:
+            self.calls.append((data['name'], time.monotonic()))
+            self.actions[data['name']](data)
+        return 0
+
+
+def test_requeue_keeps_short_deferral_that_is_already_due():
+    now = datetime.now().timestamp()
+    deferred = {'name': 'a', 'next_check': now - 5, 'check_interval': 3600}
+    untouched = {'name': 'b', 'next_check': now - 5, 'check_interval': 3600}
+    monitor = FakeMonitor([deferred, untouched], {})
+    scheduler = TaskScheduler(monitor)
+    scheduler.schedule_site('site')
+    due = [scheduler.heap[0], scheduler.heap[1]]
+    dispatched = [deferred['next_check'], untouched['next_check']]
+
+    # 检查把a推迟1秒，整批结束时该时间已经到期
+    deferred['next_check'] = now - 1
+    scheduler._requeue(due, dispatched)
+
+    assert deferred['next_check'] == now - 1
+    assert untouched['next_check'] >= now + 3500
+
+
+def test_retry_deferral_runs_after_slow_batch():
+    now = datetime.now().timestamp()
+
+    def defer_once(data):
+        # 第一次检查连接失败，0.2秒后重试
+        if not data.get('retried'):
+            data['retried'] = True
+            data['next_check'] = datetime.now().timestamp() + 0.2
+
+    sections = [
+        {'name': 'retry', 'next_check': now, 'priority': 9},
+        {'name': 'slow', 'next_check': now, 'priority': 1},
+    ]
+    monitor = FakeMonitor(sections, {'retry': defer_once, 'slow': lambda data: time.sleep(0.5)})
+    scheduler = TaskScheduler(monitor)
+    scheduler.schedule_site('site')
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline and [name for name, _ in monitor.calls].count('retry') < 2:
+            time.sleep(0.05)
+    finally:
+        scheduler.stop()
+
+    names = [name for name, _ in monitor.calls]
+    assert names.count('retry') == 2
+    assert names.count('slow') == 1
+    assert sections[1]['next_check'] >= now + 3500
+
+
+def test_stats_are_reported_from_the_scheduler_loop():
+    now = datetime.now().timestamp()
+    sections = [{'name': 'a', 'next_check': now, 'check_interval': 0.1}]
+    monitor = FakeMonitor(sections, {'a': lambda data: None})
+    scheduler = TaskScheduler(monitor, stats_interval=0.2)
+    scheduler.schedule_site('site')
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 3
+        while time.monotonic() < deadline and monitor.reports < 2:
+            time.sleep(0.05)
+    finally:
+        scheduler.stop()
+
+    assert monitor.reports >= 2
+    # 统计间隔远小于检查次数，不会每批检查都输出
+    assert monitor.reports < len(monitor.calls)
@@ -0,0 +1,56 @@
+import logging
+
+import utils.seen_index as seen_index
+from utils.seen_index import SeenUrlIndex
+
+URLS = [f'https://www.ndrc.gov.cn/xxgk/zcfb/tz/202501/t20250101_{i}.html' for i in range(3)]
+
+
+def _entries(index):
+    return index.conn.execute('SELECT COUNT(*) FROM seen_urls').fetchone()[0]
+
+
+def test_false_positive_adds_are_counted(tmp_path, caplog):
+    db_path = str(tmp_path / 'seen_urls.db')
+    index = SeenUrlIndex(db_path, initial_capacity=100)
+    # 位数组全部置位：任何新URL都是布隆过滤器误判
+    for bloom in index.bloom.filters:
+        bloom.bits[:] = b'\xff' * len(bloom.bits)
+    for url in URLS + URLS[:1]:
+        assert index.add(url, 'hash')
+    assert len(index.bloom) == _entries(index) == 3
+    index.close()
+
+    with caplog.at_level(logging.INFO, logger='SeenUrlIndex'):
+        reopened = SeenUrlIndex(db_path, initial_capacity=100)
+    # 快照与磁盘集合条数一致，启动时直接加载，不重建
+    assert not [record for record in caplog.records if '重建' in record.getMessage()]
+    assert len(reopened.bloom) == 3
+    reopened.close()
+
+
+def test_unsaved_adds_reach_the_snapshot_on_close(tmp_path, caplog):
+    db_path = str(tmp_path / 'seen_urls.db')
+    index = SeenUrlIndex(db_path, initial_capacity=100, snapshot_every=1000)
+    for url in URLS:
+        index.add(url)
+    index.close()
+    index.close()
+
+    with caplog.at_level(logging.INFO, logger='SeenUrlIndex'):
+        reopened = SeenUrlIndex(db_path, initial_capacity=100)
+    assert not [record for record in caplog.records if '重建' in record.getMessage()]
+    assert all(reopened.contains(url) for url in URLS)
+    reopened.close()
+
+
+def test_shared_index_is_closed_at_exit(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(seen_index, '_seen_index', None)
+    monkeypatch.setattr(seen_index.atexit, 'register', registered.append)
+    monkeypatch.setattr(SeenUrlIndex, 'from_settings', classmethod(lambda cls: cls(str(tmp_path / 'seen_urls.db'))))
+
+    index = seen_index.get_seen_index()
+    assert seen_index.get_seen_index() is index
+    assert registered == [index.close]
+    index.close()
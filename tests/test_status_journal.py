@@ -0,0 +1,50 @@
+import csv
+
+import pytest
+
+from utils.status_journal import LinkPoolJournal
+
+URLS = ['https://a.gov.cn/', 'https://b.gov.cn/']
+
+
+@pytest.fixture
+def pool(tmp_path):
+    file_path = tmp_path / 'pool.csv'
+    file_path.write_text('名称,链接,优先级,上次爬取时间\n栏目一,https://a.gov.cn/,5,\n栏目二,https://b.gov.cn/,3,\n',
+                         encoding='utf-8')
+    return str(file_path)
+
+
+def _last_crawled(file_path):
+    with open(file_path, encoding='utf-8', newline='') as f:
+        return {row['链接']: row['上次爬取时间'] for row in csv.DictReader(f)}
+
+
+def test_updates_are_coalesced_into_one_file_write(pool, tmp_path):
+    journal = LinkPoolJournal(str(tmp_path / 'journal.log'), flush_interval=3600, fsync=False)
+    for i in range(100):
+        journal.record(pool, URLS[i % 2], {'last_crawled': f'2025-01-01 08:00:{i:02d}'})
+    assert _last_crawled(pool) == {URLS[0]: '', URLS[1]: ''}
+    assert journal.pending_for(pool) == {URLS[0]: {'last_crawled': '2025-01-01 08:00:98'},
+                                         URLS[1]: {'last_crawled': '2025-01-01 08:00:99'}}
+
+    assert journal.flush() == 1
+    assert _last_crawled(pool) == {URLS[0]: '2025-01-01 08:00:98', URLS[1]: '2025-01-01 08:00:99'}
+    assert journal.stats()['file_writes'] == 1
+    journal.close()
+    assert (tmp_path / 'journal.log').read_bytes() == b''
+
+
+def test_unflushed_updates_are_replayed_after_crash(pool, tmp_path):
+    journal_path = str(tmp_path / 'journal.log')
+    crashed = LinkPoolJournal(journal_path, flush_interval=3600, fsync=False)
+    crashed.record(pool, URLS[1], {'last_crawled': '2025-01-02 09:00:00'})
+    # 模拟崩溃：不写回直接停止，日志末尾还有一行未写完
+    crashed.stop_event.set()
+    crashed.journal_file.write(b'{"path":')
+    crashed.journal_file.close()
+
+    journal = LinkPoolJournal(journal_path, flush_interval=3600, fsync=False)
+    assert _last_crawled(pool) == {URLS[0]: '', URLS[1]: '2025-01-02 09:00:00'}
+    assert journal.stats()['pending_files'] == 0
+    journal.close()
@@ -0,0 +1,127 @@
+import os
+import types
+import sqlite3
+
+import pytest
+
+import core.db_client as db_client
+from core.sqlite_store import POLICY_COLLECTION
+from utils.seen_index import SeenUrlIndex
+
+URL = 'https://www.ndrc.gov.cn/xxgk/zcfb/tz/202501/t20250101_1.html'
+POLICY = {'source_url': URL, 'title': '关于做好2025年工作的通知', 'content': '正文', 'section_name': '通知'}
+
+
+@pytest.fixture
+def make_client(tmp_path, monkeypatch):
+    """在临时目录中创建存储客户端，已入库索引不使用进程内共享实例"""
+    clients = []
+    monkeypatch.setattr(db_client, 'get_seen_index', lambda: SeenUrlIndex(str(tmp_path / 'seen_urls.db')))
+    monkeypatch.setattr(db_client, 'get_section_resolver', lambda: types.SimpleNamespace(resolve=lambda url: '其他'))
+
+    def make(storage_type):
+        client = db_client.DBClient(storage_type=storage_type, base_path=str(tmp_path / 'policy_data'))
+        clients.append(client)
+        return client
+
+    yield make
+    for client in clients:
+        client.close()
+        client.seen_index.close()
+
+
+def _recorded(client):
+    return client.seen_index.contains(URL), client.catalog.lookup(client._content_hash(POLICY)) is not None
+
+
+def test_segment_records_seen_url_only_after_flush(make_client):
+    client = make_client('segment')
+    assert client.save_policy(dict(POLICY))
+    assert _recorded(client) == (False, False)
+    # 写盘前再次保存相同内容不会重复写入
+    assert not client.save_policy(dict(POLICY))
+
+    client.segment_store.flush()
+    assert _recorded(client) == (True, True)
+    assert len(list(client.iter_policies())) == 1
+
+
+def test_segment_keeps_records_for_retry_when_write_fails(make_client, monkeypatch):
+    client = make_client('segment')
+    store = client.segment_store
+    write = store._write
+    calls = []
+
+    def failing_write(data_parts, index_parts):
+        calls.append(len(data_parts))
+        if len(calls) == 1:
+            # 数据写入一半时磁盘出错
+            store.data_file.write(data_parts[0][:10])
+            store.data_file.flush()
+            raise OSError(28, 'No space left on device')
+        write(data_parts, index_parts)
+
+    monkeypatch.setattr(store, '_write', failing_write)
+    client.save_policy(dict(POLICY))
+    store.flush()
+    assert _recorded(client) == (False, False)
+    assert len(store.pending) == 1
+    assert os.path.getsize(store._data_path(store.segment_id)) == 0
+
+    store.flush()
+    assert _recorded(client) == (True, True)
+    assert [record['source_url'] for record in client.iter_policies()] == [URL]
+
+
+class FailingConnection:
+    """第一次批量插入时报错的数据库连接"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.failures = 1
+
+    def __getattr__(self, name):
+        return getattr(self.conn, name)
+
+    def __enter__(self):
+        return self.conn.__enter__()
+
+    def __exit__(self, *exc_info):
+        return self.conn.__exit__(*exc_info)
+
+    def executemany(self, sql, rows):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError('database or disk is full')
+        return self.conn.executemany(sql, rows)
+
+
+def test_sqlite_records_seen_url_only_after_commit(make_client):
+    client = make_client('sqlite')
+    assert client.save_policy(dict(POLICY))
+    assert _recorded(client) == (False, False)
+    assert not client.save_policy(dict(POLICY))
+
+    client.sqlite_store.flush()
+    assert _recorded(client) == (True, True)
+    assert client.sqlite_store.stats()['policies'] == 1
+
+
+def test_sqlite_keeps_failed_batch_for_retry(make_client):
+    client = make_client('sqlite')
+    store = client.sqlite_store
+    store.conn = FailingConnection(store.conn)
+    assert client.insert_many(POLICY_COLLECTION, [dict(POLICY)]) == 1
+    assert _recorded(client) == (False, False)
+    assert len(store.pending_policies) == 1
+
+    store.flush()
+    assert _recorded(client) == (True, True)
+    assert [record['source_url'] for record in store.query_policies()] == [URL]
+
+
+def test_file_storage_reads_return_empty_results(make_client):
+    client = make_client('file')
+    client.save_policy(dict(POLICY))
+    assert list(client.iter_policies()) == []
+    assert client.search_policies('通知') == []
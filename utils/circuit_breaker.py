@@ -0,0 +1,156 @@
+import time
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+from config.settings import CIRCUIT_BREAKER_SETTINGS
+from utils.logger import setup_logger
+
+
+class HostCircuitBreaker:
+    """按主机的熔断器，并统计各主机的健康状况
+
+    连续失败达到阈值后熔断(open)，该主机所有栏目在恢复时间内直接跳过；
+    到期后进入半开(half_open)状态，只放行一个探测请求，成功则恢复(closed)，
+    失败则再次熔断并延长恢复时间。同时记录滚动窗口内的延迟和错误率。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, recovery_timeout=300, max_recovery_timeout=3600,
+                 probe_timeout=120, window=50):
+        self.logger = setup_logger('HostCircuitBreaker')
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.max_recovery_timeout = max_recovery_timeout
+        self.probe_timeout = probe_timeout  # 探测请求未回报结果时，超过该时间允许新的探测
+        self.window = window
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建熔断器"""
+        settings = settings or CIRCUIT_BREAKER_SETTINGS
+        return cls(
+            failure_threshold=settings.get('failure_threshold', 5),
+            recovery_timeout=settings.get('recovery_timeout', 300),
+            max_recovery_timeout=settings.get('max_recovery_timeout', 3600),
+            probe_timeout=settings.get('probe_timeout', 120),
+            window=settings.get('window', 50)
+        )
+
+    def _get_host(self, url):
+        host = urlparse(url).netloc
+        state = self.hosts.get(host)
+        if state is None:
+            state = {
+                'state': self.CLOSED,
+                'consecutive_failures': 0,
+                'trips': 0,             # 连续熔断次数，用于延长恢复时间
+                'open_until': 0,
+                'probe_started': None,
+                'results': deque(maxlen=self.window),    # True为成功
+                'latencies': deque(maxlen=self.window),
+            }
+            self.hosts[host] = state
+        return host, state
+
+    def before_request(self, url):
+        """请求前检查主机是否可用
+
+        Returns:
+            float: 0表示放行，否则为需要推迟的秒数
+        """
+        now = time.monotonic()
+        with self.lock:
+            host, state = self._get_host(url)
+            if state['state'] == self.CLOSED:
+                return 0.0
+
+            if state['state'] == self.OPEN:
+                if now < state['open_until']:
+                    return state['open_until'] - now
+                # 恢复时间已到，进入半开状态并放行一个探测请求
+                state['state'] = self.HALF_OPEN
+                state['probe_started'] = now
+                self.logger.info(f"主机进入半开状态，发送探测请求: {host}")
+                return 0.0
+
+            # 半开状态下只允许一个探测请求
+            if state['probe_started'] is not None and now - state['probe_started'] < self.probe_timeout:
+                return self.probe_timeout - (now - state['probe_started'])
+            state['probe_started'] = now
+            return 0.0
+
+    def release_probe(self, url):
+        """before_request放行的探测请求最终没有发送时归还探测机会"""
+        with self.lock:
+            _, state = self._get_host(url)
+            if state['state'] == self.HALF_OPEN:
+                state['probe_started'] = None
+
+    def retry_after(self, url):
+        """主机处于熔断状态时返回剩余的恢复时间，否则返回0"""
+        now = time.monotonic()
+        with self.lock:
+            _, state = self._get_host(url)
+            if state['state'] == self.OPEN and now < state['open_until']:
+                return state['open_until'] - now
+            return 0.0
+
+    def record_success(self, url, latency=None):
+        """记录一次成功请求"""
+        with self.lock:
+            host, state = self._get_host(url)
+            state['results'].append(True)
+            if latency is not None:
+                state['latencies'].append(latency)
+            state['consecutive_failures'] = 0
+            if state['state'] != self.CLOSED:
+                self.logger.info(f"主机恢复正常，关闭熔断: {host}")
+            state['state'] = self.CLOSED
+            state['trips'] = 0
+            state['probe_started'] = None
+
+    def record_failure(self, url, latency=None):
+        """记录一次失败请求，达到阈值或探测失败时熔断"""
+        now = time.monotonic()
+        with self.lock:
+            host, state = self._get_host(url)
+            state['results'].append(False)
+            if latency is not None:
+                state['latencies'].append(latency)
+            state['consecutive_failures'] += 1
+
+            if state['state'] == self.HALF_OPEN or state['consecutive_failures'] >= self.failure_threshold:
+                if state['state'] != self.OPEN:
+                    state['trips'] += 1
+                timeout = min(self.recovery_timeout * (2 ** (state['trips'] - 1)), self.max_recovery_timeout)
+                state['state'] = self.OPEN
+                state['open_until'] = now + timeout
+                state['probe_started'] = None
+                self.logger.warning(f"主机熔断: {host} - 连续失败 {state['consecutive_failures']} 次, {timeout} 秒后探测")
+
+    def stats(self):
+        """获取各主机的状态、错误率和延迟统计"""
+        with self.lock:
+            result = {}
+            for host, state in self.hosts.items():
+                results = state['results']
+                latencies = sorted(state['latencies'])
+                result[host] = {
+                    'state': state['state'],
+                    'consecutive_failures': state['consecutive_failures'],
+                    'requests': len(results),
+                    'error_rate': round(results.count(False) / len(results), 3) if results else 0.0,
+                    'avg_latency': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                    'p95_latency': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3) if latencies else None,
+                }
+            return result
+
+
+# 全局熔断器实例
+circuit_breaker = HostCircuitBreaker.from_settings()
@@ -1,44 +1,69 @@
 import requests
 from utils.logger import setup_logger
+from utils.http_pool import session_registry
+from utils.rate_limiter import rate_limiter
+from utils.http_cache import get_http_cache
+from config.settings import HTTP_CACHE_SETTINGS
 import urllib3
-import ssl
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class PageDownloader:
-    def __init__(self):
+    def __init__(self, sessions=None, limiter=None, cache=None):
         self.logger = setup_logger('PageDownloader')
         
-        # 创建自定义SSL上下文
-        self.session = requests.Session()
-        # 为会话全局禁用SSL验证
-        self.session.verify = False
-        
-        # 创建更宽松的SSL适配器
-        try:
-            # 创建自定义SSL上下文
-            ctx = ssl.create_default_context()
-            ctx.check_hostname = False
-            ctx.verify_mode = ssl.CERT_NONE
-            # 设置更宽松的密码套件
-            ctx.set_ciphers('DEFAULT@SECLEVEL=1')
-            
-            # 创建适配器并挂载到会话
-            adapter = requests.adapters.HTTPAdapter()
-            self.session.mount('https://', adapter)
-        except Exception as e:
-            self.logger.warning(f"配置SSL适配器失败: {str(e)}")
+        # 使用进程级会话注册表，与监测器、爬虫共享同一主机的连接池
+        self.sessions = sessions or session_registry
+        # 按主机限速，与监测器共享令牌桶
+        self.limiter = limiter or rate_limiter
+        # 可选的磁盘HTTP缓存，未传入时按配置决定是否启用共享缓存
+        if cache is None and HTTP_CACHE_SETTINGS.get('enabled'):
+            cache = get_http_cache()
+        self.cache = cache
     
     def fetch(self, url, headers=None, timeout=30):
         """下载页面内容"""
+        entry = None
         try:
-            # 使用session进行请求，而不是直接使用requests.get
-            response = self.session.get(url, headers=headers, timeout=timeout)
+            # 新鲜的缓存直接返回，不占用请求配额
+            if self.cache is not None:
+                entry = self.cache.lookup(url, headers)
+                if entry and entry['fresh']:
+                    self.cache.record('hits')
+                    return entry['body']
+            
+            # 过期的缓存携带校验头重新验证
+            request_headers = dict(headers or {})
+            if entry:
+                request_headers.update(self.cache.conditional_headers(entry))
+            
+            # 等待主机请求配额
+            self.limiter.acquire(url)
+            
+            # 使用按主机共享的会话进行请求，复用已建立的连接
+            session = self.sessions.get_session(url)
+            response = session.get(url, headers=request_headers, timeout=timeout, verify=False)
+            if response.status_code == 304 and entry:
+                self.cache.refresh(entry, response)
+                self.cache.record('revalidated')
+                return entry['body']
             if response.status_code == 200:
+                if self.cache is not None:
+                    self.cache.record('misses')
+                    self.cache.store(url, headers, response)
                 return response.content
             else:
                 self.logger.error(f"下载失败 {url} - 状态码: {response.status_code}")
         except Exception as e:
+            # 网络异常时，未要求必须重新验证的过期缓存仍可使用
+            if entry and not entry['must_revalidate']:
+                self.cache.record('stale_served')
+                self.logger.warning(f"下载失败，使用过期缓存 {url} - {str(e)}")
+                return entry['body']
             self.logger.error(f"下载失败 {url} - {str(e)}")
-        return None
\ No newline at end of file
+        return None
+    
+    def cache_stats(self):
+        """获取缓存命中、未命中和重新验证次数，未启用缓存时返回None"""
+        return self.cache.stats() if self.cache is not None else None
\ No newline at end of file
@@ -0,0 +1,243 @@
+import re
+import hashlib
+import threading
+from collections import Counter
+from lxml import etree, html
+
+from config.settings import FINGERPRINT_SETTINGS
+from utils.logger import setup_logger
+
+# 提取页面可见文本，忽略脚本和样式（注释不是文本节点，天然被排除）
+VISIBLE_TEXT = etree.XPath('//text()[not(ancestor::script) and not(ancestor::style)]')
+
+# 遍历时整体跳过的标签
+SKIP_TAGS = {'script', 'style'}
+
+# 划分SimHash条目的块级标签（表格按行划分，单元格属于所在行）
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'body', 'br', 'center', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol',
+    'p', 'pre', 'section', 'table', 'tbody', 'tfoot', 'thead', 'tr', 'ul',
+}
+
+WHITESPACE_RE = re.compile(r'\s+')
+# 条目中易变的数字：日期、时间及三位以上的数字（访问量、点击数等）
+VOLATILE_NUMBER_RE = re.compile(r'\d{4}[-/.年]\d{1,2}[-/.月]\d{1,2}日?|\d{1,2}:\d{2}(?::\d{2})?|\d{3,}')
+
+# SimHash签名前缀：特征或位数变化后旧签名不可比较
+SIMHASH_SCHEME = 'i256'
+SIMHASH_BYTES = 32
+
+
+def hamming_distance(a, b):
+    """两个SimHash签名之间不同的位数"""
+    return bin(int(a.rsplit(':', 1)[-1], 16) ^ int(b.rsplit(':', 1)[-1], 16)).count('1')
+
+
+class FingerprintEngine:
+    """页面指纹引擎
+
+    只做一次lxml解析，使用预编译的XPath提取可见文本，按忽略规则去掉访问量、
+    当前日期等动态片段后用blake2b计算指纹。指纹带有"算法-规则"前缀，
+    算法或忽略规则变化后旧指纹视为不可比较，由调用方重新建立基线。
+    SimHash签名以监测区域中的条目（块级元素的文本）为特征，见extract_items。
+    """
+
+    ALGORITHM = 'b2'
+
+    def __init__(self, ignore_xpaths=None, ignore_patterns=None, digest_size=16):
+        self.logger = setup_logger('FingerprintEngine')
+        self.ignore_xpaths = list(ignore_xpaths or [])
+        self.ignore_patterns = list(ignore_patterns or [])
+        self.digest_size = digest_size
+        self._xpaths = {}
+        self._patterns = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建指纹引擎"""
+        settings = settings or FINGERPRINT_SETTINGS
+        return cls(
+            ignore_xpaths=settings.get('ignore_xpaths', []),
+            ignore_patterns=settings.get('ignore_patterns', []),
+            digest_size=settings.get('digest_size', 16)
+        )
+
+    def _compile_xpath(self, expression):
+        compiled = self._xpaths.get(expression)
+        if compiled is None:
+            with self._lock:
+                compiled = self._xpaths.setdefault(expression, etree.XPath(expression))
+        return compiled
+
+    def _compile_pattern(self, pattern):
+        compiled = self._patterns.get(pattern)
+        if compiled is None:
+            with self._lock:
+                compiled = self._patterns.setdefault(pattern, re.compile(pattern))
+        return compiled
+
+    def _rules(self, ignore_xpaths=None, ignore_patterns=None):
+        """合并全局忽略规则与站点/栏目自定义规则"""
+        xpaths = self.ignore_xpaths + [x for x in (ignore_xpaths or []) if x not in self.ignore_xpaths]
+        patterns = self.ignore_patterns + [p for p in (ignore_patterns or []) if p not in self.ignore_patterns]
+        return xpaths, patterns
+
+    def scheme(self, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """指纹前缀：算法及规则摘要，用于判断两个指纹是否可比较"""
+        xpaths, patterns = self._rules(ignore_xpaths, ignore_patterns)
+        rules = '\x00'.join([xpath or ''] + xpaths + ['\x01'] + patterns)
+        return f"{self.ALGORITHM}-{hashlib.blake2b(rules.encode('utf-8'), digest_size=4).hexdigest()}"
+
+    @staticmethod
+    def is_comparable(old_fingerprint, new_fingerprint):
+        """两个指纹是否由相同算法和规则生成"""
+        if not old_fingerprint or not new_fingerprint:
+            return False
+        return old_fingerprint.split(':', 1)[0] == new_fingerprint.split(':', 1)[0]
+
+    def parse(self, content):
+        """解析HTML内容，返回lxml根元素"""
+        if isinstance(content, str):
+            # 带编码声明的字符串lxml无法直接解析
+            content = content.encode('utf-8')
+            parser = html.HTMLParser(encoding='utf-8')
+            return html.fromstring(content, parser=parser)
+        return html.fromstring(content)
+
+    def _walk_text(self, element, skip, parts):
+        """遍历元素收集文本，跳过脚本、样式和忽略的元素"""
+        if element.tag in SKIP_TAGS or element in skip or not isinstance(element.tag, str):
+            return
+        if element.text:
+            parts.append(element.text)
+        for child in element:
+            self._walk_text(child, skip, parts)
+            if child.tail:
+                parts.append(child.tail)
+
+    def _regions(self, tree, xpath):
+        """监测区域的根元素，未指定或未匹配到时为空列表"""
+        roots = self._compile_xpath(xpath)(tree) if xpath else None
+        return [root for root in roots or [] if isinstance(root, etree._Element)]
+
+    def _ignored_elements(self, tree, xpaths):
+        skip = set()
+        for expression in xpaths:
+            skip.update(e for e in self._compile_xpath(expression)(tree) if isinstance(e, etree._Element))
+        return skip
+
+    def extract_text(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """提取参与指纹计算的规范化文本
+
+        Args:
+            tree: lxml.html解析得到的根元素
+            xpath: 可选，只计算该区域的文本，未匹配到时使用整个页面
+            ignore_xpaths: 额外忽略的元素XPath（如访问量计数器）
+            ignore_patterns: 额外从文本中去除的正则（如当前日期）
+        """
+        xpaths, patterns = self._rules(ignore_xpaths, ignore_patterns)
+        roots = self._regions(tree, xpath)
+
+        if xpaths:
+            skip = self._ignored_elements(tree, xpaths)
+            parts = []
+            for root in roots or [tree]:
+                self._walk_text(root, skip, parts)
+                parts.append(' ')
+            text = ''.join(parts)
+        elif roots:
+            text = ' '.join(root.text_content() for root in roots)
+        else:
+            text = ''.join(VISIBLE_TEXT(tree))
+
+        for pattern in patterns:
+            text = self._compile_pattern(pattern).sub('', text)
+        return WHITESPACE_RE.sub(' ', text).strip()
+
+    def fingerprint_tree(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """基于已解析的文档树计算指纹"""
+        text = self.extract_text(tree, xpath, ignore_xpaths, ignore_patterns)
+        digest = hashlib.blake2b(text.encode('utf-8'), digest_size=self.digest_size).hexdigest()
+        return f"{self.scheme(xpath, ignore_xpaths, ignore_patterns)}:{digest}"
+
+    def signatures_tree(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """基于同一文档树计算精确指纹和SimHash签名"""
+        fingerprint = self.fingerprint_tree(tree, xpath, ignore_xpaths, ignore_patterns)
+        return fingerprint, self.simhash(self.extract_items(tree, xpath, ignore_xpaths, ignore_patterns))
+
+    def extract_items(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """将监测区域按块级元素切分为条目，返回各条目的规范化特征
+
+        列表页的一条记录（li、表格行、div等）为一个条目。链接文字保留原样，标题中的
+        期号、文号仍能区分不同条目；其余文字去掉忽略片段后，日期、时间和三位以上的
+        数字替换为0，访问量、发布日期、页脚更新时间等变化不改变条目特征。
+        """
+        xpaths, patterns = self._rules(ignore_xpaths, ignore_patterns)
+        patterns = [self._compile_pattern(pattern) for pattern in patterns]
+        skip = self._ignored_elements(tree, xpaths) if xpaths else set()
+        items, current = [], []
+        for root in self._regions(tree, xpath) or [tree]:
+            self._walk_items(root, skip, False, current, items, patterns)
+            self._close_item(current, items, patterns)
+        return items
+
+    def _walk_items(self, element, skip, in_link, current, items, patterns):
+        """遍历元素收集 (文本, 是否链接文字)，遇到块级元素时结束当前条目"""
+        if element.tag in SKIP_TAGS or element in skip or not isinstance(element.tag, str):
+            return
+        block = element.tag in BLOCK_TAGS
+        if block:
+            self._close_item(current, items, patterns)
+        in_link = in_link or element.tag == 'a'
+        if element.text:
+            current.append((element.text, in_link))
+        for child in element:
+            self._walk_items(child, skip, in_link, current, items, patterns)
+            if child.tail:
+                current.append((child.tail, in_link))
+        if block:
+            self._close_item(current, items, patterns)
+
+    def _close_item(self, current, items, patterns):
+        if not current:
+            return
+        link_text = ' '.join(text for text, in_link in current if in_link)
+        other_text = ' '.join(text for text, in_link in current if not in_link)
+        current.clear()
+        for pattern in patterns:
+            link_text = pattern.sub('', link_text)
+            other_text = pattern.sub('', other_text)
+        link_text = WHITESPACE_RE.sub(' ', link_text).strip()
+        other_text = WHITESPACE_RE.sub(' ', VOLATILE_NUMBER_RE.sub('0', other_text)).strip()
+        if link_text or other_text:
+            items.append(f"{link_text}\x1f{other_text}")
+
+    def simhash(self, features):
+        """计算特征的128位SimHash签名，返回带方案前缀的十六进制字符串
+
+        每个条目为一个特征（重复条目按次数加权）。新增一个条目会改变若干位，
+        条目内数字变化、条目重新排序时签名不变，用汉明距离衡量变化幅度。
+        """
+        counts = Counter(features)
+        total = sum(counts.values())
+
+        # 按字节分桶累加权重，避免对每个特征逐位循环
+        tables = [Counter() for _ in range(SIMHASH_BYTES)]
+        for feature, weight in counts.items():
+            digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=SIMHASH_BYTES).digest()
+            for i, byte in enumerate(digest):
+                tables[i][byte] += weight
+
+        value = 0
+        for i, table in enumerate(tables):
+            for bit in range(8):
+                ones = sum(weight for byte, weight in table.items() if byte >> bit & 1)
+                if ones * 2 > total:
+                    value |= 1 << (i * 8 + bit)
+        return f"{SIMHASH_SCHEME}:{value:0{SIMHASH_BYTES * 2}x}"
+
+    def fingerprint(self, content, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """解析HTML内容并计算指纹"""
+        return self.fingerprint_tree(self.parse(content), xpath, ignore_xpaths, ignore_patterns)
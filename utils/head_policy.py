@@ -0,0 +1,105 @@
+import threading
+from utils.logger import setup_logger
+
+
+class HeadPolicy:
+    """按主机学习是否值得先发送HEAD请求
+
+    默认直接发送单次条件GET。只有当主机在HEAD响应中提供校验头（ETag/Last-Modified），
+    却忽略条件GET（带校验头仍返回200且校验头未变）时，才先发HEAD在本地比较校验头，
+    未变化则省去GET。只有内容指纹也未变时才算忽略条件GET；校验头不变而内容变化
+    说明校验头不可信，该主机不再依据校验头跳过GET。连续max_head_only次只靠HEAD
+    判定后强制发送一次完整GET，以便纠正错误的判断。HEAD不被支持或不返回校验头
+    的主机不再发送HEAD。
+    """
+
+    # HEAD不被支持时服务器常见的状态码
+    UNSUPPORTED_STATUS = (400, 403, 404, 405, 501)
+
+    def __init__(self, min_samples=2, max_head_only=10):
+        self.logger = setup_logger('HeadPolicy')
+        self.min_samples = min_samples
+        self.max_head_only = max_head_only
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _get_profile(self, host):
+        profile = self.hosts.get(host)
+        if profile is None:
+            profile = {
+                'conditional_sent': 0,     # 携带校验头的GET次数
+                'not_modified': 0,         # 条件GET返回304的次数
+                'ignored_conditional': 0,  # 条件GET被忽略(200且校验头和内容均未变)的次数
+                'stale_validators': 0,     # 校验头未变但内容已变化的次数
+                'head_only': 0,            # 连续只靠HEAD判定(省去GET)的次数
+                'head_without_validators': 0,  # HEAD返回200但无校验头的次数
+                'head_unsupported': False,  # HEAD是否不被支持
+                'head_requests': 0,
+                'get_requests': 0,
+            }
+            self.hosts[host] = profile
+        return profile
+
+    def should_head(self, host):
+        """判断该主机是否值得先发送HEAD请求"""
+        with self.lock:
+            profile = self.hosts.get(host)
+            if profile is None or profile['head_unsupported']:
+                return False
+            if profile['head_without_validators'] >= self.min_samples:
+                return False
+            if profile['stale_validators'] or profile['head_only'] >= self.max_head_only:
+                return False
+            return profile['not_modified'] == 0 and profile['ignored_conditional'] >= self.min_samples
+
+    def record_get(self, host, request_headers, response, content_changed=None):
+        """记录一次GET请求的结果
+        
+        Args:
+            content_changed: 响应内容指纹是否变化，未比较内容时为None
+        """
+        sent_etag = request_headers.get('If-None-Match')
+        sent_modified = request_headers.get('If-Modified-Since')
+        with self.lock:
+            profile = self._get_profile(host)
+            profile['get_requests'] += 1
+            profile['head_only'] = 0
+            if not (sent_etag or sent_modified):
+                return
+            profile['conditional_sent'] += 1
+            if response.status_code == 304:
+                profile['not_modified'] += 1
+            elif response.status_code == 200:
+                etag_same = sent_etag and response.headers.get('ETag') == sent_etag
+                modified_same = sent_modified and response.headers.get('Last-Modified') == sent_modified
+                if not (etag_same or modified_same):
+                    return
+                if content_changed is False:
+                    profile['ignored_conditional'] += 1
+                elif content_changed:
+                    if not profile['stale_validators']:
+                        self.logger.info(f"主机校验头未随内容变化，不再依据校验头跳过GET: {host}")
+                    profile['stale_validators'] += 1
+
+    def record_head(self, host, response):
+        """记录一次HEAD请求的结果"""
+        with self.lock:
+            profile = self._get_profile(host)
+            profile['head_requests'] += 1
+            if response.status_code in self.UNSUPPORTED_STATUS:
+                if not profile['head_unsupported']:
+                    self.logger.info(f"主机不支持HEAD请求，后续直接使用GET: {host} - HTTP状态码: {response.status_code}")
+                profile['head_unsupported'] = True
+            elif response.status_code == 200:
+                if not (response.headers.get('ETag') or response.headers.get('Last-Modified')):
+                    profile['head_without_validators'] += 1
+
+    def record_head_only(self, host):
+        """记录一次只靠HEAD校验头判定未更新、省去GET的检查"""
+        with self.lock:
+            self._get_profile(host)['head_only'] += 1
+
+    def stats(self):
+        """获取各主机的请求统计"""
+        with self.lock:
+            return {host: dict(profile) for host, profile in self.hosts.items()}
@@ -0,0 +1,311 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from email.utils import parsedate_to_datetime
+from requests.structures import CaseInsensitiveDict
+
+from config.settings import HTTP_CACHE_SETTINGS
+from utils.logger import setup_logger
+
+
+def parse_cache_control(value):
+    """解析Cache-Control头，返回{指令: 值}，无值的指令为True"""
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, arg = part.partition('=')
+        directives[name.strip().lower()] = arg.strip().strip('"') if arg else True
+    return directives
+
+
+def parse_http_date(value):
+    """解析HTTP日期为时间戳，无效时返回None"""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+def _seconds(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpCache:
+    """基于磁盘的HTTP缓存（私有缓存，遵循RFC 7234）
+
+    响应体按URL哈希存放在缓存目录，元数据（响应头、校验头、新鲜期、访问时间）
+    保存在SQLite索引中。新鲜的缓存直接返回；过期的缓存携带If-None-Match/
+    If-Modified-Since重新验证，304时沿用缓存内容。总大小超过上限时按最近最少
+    访问淘汰。
+    """
+
+    # 可缓存的响应状态码
+    CACHEABLE_STATUS = (200, 203)
+
+    def __init__(self, cache_dir='data/http_cache', max_size=512 * 1024 * 1024,
+                 heuristic_fraction=0.1, max_heuristic=86400):
+        self.logger = setup_logger('HttpCache')
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.heuristic_fraction = heuristic_fraction  # 只有Last-Modified时，按其距今时长的比例估算新鲜期
+        self.max_heuristic = max_heuristic
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'revalidated': 0, 'stale_served': 0, 'stored': 0, 'evicted': 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(cache_dir, 'index.db'), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            'key TEXT PRIMARY KEY, '
+            'url TEXT NOT NULL, '
+            'status INTEGER, '
+            'headers TEXT, '
+            'vary TEXT, '
+            'etag TEXT, '
+            'last_modified TEXT, '
+            'stored_at REAL, '
+            'expires_at REAL, '
+            'must_revalidate INTEGER, '
+            'last_access REAL, '
+            'size INTEGER)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access)')
+        self.conn.commit()
+        self.total_size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建缓存"""
+        settings = settings or HTTP_CACHE_SETTINGS
+        return cls(
+            cache_dir=settings.get('cache_dir', 'data/http_cache'),
+            max_size=int(settings.get('max_size_mb', 512) * 1024 * 1024),
+            heuristic_fraction=settings.get('heuristic_fraction', 0.1),
+            max_heuristic=settings.get('max_heuristic', 86400)
+        )
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode('utf-8')).hexdigest()
+
+    def _body_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + '.body')
+
+    def _freshness(self, headers, directives, now):
+        """计算响应的过期时间戳，无法确定新鲜期时返回now（立即过期）"""
+        headers = CaseInsensitiveDict(headers)
+        date = parse_http_date(headers.get('Date')) or now
+        age = _seconds(headers.get('Age')) or 0
+        # 响应在路上及上游缓存中已经存在的时间
+        current_age = age + max(now - date, 0)
+
+        if 'no-cache' in directives:
+            return now
+        max_age = _seconds(directives.get('max-age'))
+        if max_age is not None:
+            return now + max_age - current_age
+        expires = headers.get('Expires')
+        if expires is not None:
+            expires_at = parse_http_date(expires)
+            # 无效的Expires视为已过期
+            return now + (expires_at - date) - current_age if expires_at else now
+        last_modified = parse_http_date(headers.get('Last-Modified'))
+        if last_modified and last_modified < date:
+            lifetime = min((date - last_modified) * self.heuristic_fraction, self.max_heuristic)
+            return now + lifetime - current_age
+        return now
+
+    def _vary_values(self, vary, request_headers):
+        """提取Vary指定的请求头取值，用于匹配缓存"""
+        request_headers = {k.lower(): v for k, v in (request_headers or {}).items()}
+        return {name: request_headers.get(name) for name in vary}
+
+    def lookup(self, url, request_headers=None):
+        """查找缓存
+
+        Returns:
+            dict: 缓存条目(body/headers/etag/last_modified/fresh)，未命中时返回None
+        """
+        key = self._key(url)
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM entries WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+
+        vary = json.loads(row['vary'] or '{}')
+        if vary and self._vary_values(vary, request_headers) != vary:
+            return None
+
+        try:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+        except OSError:
+            self._delete(key)
+            return None
+
+        now = time.time()
+        with self.lock:
+            self.conn.execute('UPDATE entries SET last_access = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+        return {
+            'key': key,
+            'url': row['url'],
+            'status': row['status'],
+            'headers': json.loads(row['headers'] or '{}'),
+            'etag': row['etag'],
+            'last_modified': row['last_modified'],
+            'body': body,
+            'fresh': now < (row['expires_at'] or 0),
+            'must_revalidate': bool(row['must_revalidate']),
+        }
+
+    def conditional_headers(self, entry):
+        """生成重新验证缓存所需的条件请求头"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, request_headers, response, body=None):
+        """按响应头决定是否缓存，可缓存时写入磁盘"""
+        if response.status_code not in self.CACHEABLE_STATUS:
+            return False
+        directives = parse_cache_control(response.headers.get('Cache-Control'))
+        if 'no-store' in directives:
+            return False
+        vary_header = response.headers.get('Vary', '')
+        vary_names = [name.strip().lower() for name in vary_header.split(',') if name.strip()]
+        if '*' in vary_names:
+            return False
+
+        now = time.time()
+        headers = dict(response.headers)
+        expires_at = self._freshness(headers, directives, now)
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        # 既不新鲜也无法重新验证的响应缓存下来也用不上
+        if expires_at <= now and not (etag or last_modified):
+            return False
+
+        body = response.content if body is None else body
+        key = self._key(url)
+        path = self._body_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.error(f"写入缓存失败: {url} - {str(e)}")
+            return False
+
+        must_revalidate = 'must-revalidate' in directives or 'no-cache' in directives
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO entries (key, url, status, headers, vary, etag, last_modified, '
+                'stored_at, expires_at, must_revalidate, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, response.status_code, json.dumps(headers, ensure_ascii=False),
+                 json.dumps(self._vary_values(vary_names, request_headers)) if vary_names else None,
+                 etag, last_modified, now, expires_at, int(must_revalidate), now, len(body))
+            )
+            self.conn.commit()
+            self.total_size += len(body) - (old['size'] if old else 0)
+            self.counters['stored'] += 1
+        self._evict()
+        return True
+
+    def refresh(self, entry, response):
+        """304响应后更新缓存条目的响应头和新鲜期"""
+        headers = CaseInsensitiveDict(entry['headers'])
+        for name, value in response.headers.items():
+            # 304中的实体头描述的是空响应体，不能覆盖
+            if name.lower() not in ('content-length', 'content-encoding', 'transfer-encoding', 'content-type'):
+                headers[name] = value
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        now = time.time()
+        expires_at = self._freshness(headers, directives, now)
+        with self.lock:
+            self.conn.execute(
+                'UPDATE entries SET headers = ?, etag = ?, last_modified = ?, expires_at = ?, last_access = ? '
+                'WHERE key = ?',
+                (json.dumps(dict(headers), ensure_ascii=False), headers.get('ETag') or entry['etag'],
+                 headers.get('Last-Modified') or entry['last_modified'], expires_at, now, entry['key'])
+            )
+            self.conn.commit()
+
+    def record(self, event):
+        """记录命中/未命中/重新验证次数"""
+        with self.lock:
+            self.counters[event] += 1
+
+    def _delete(self, key):
+        with self.lock:
+            row = self.conn.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return
+            self.conn.execute('DELETE FROM entries WHERE key = ?', (key,))
+            self.conn.commit()
+            self.total_size -= row['size'] or 0
+        try:
+            os.remove(self._body_path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """总大小超过上限时，按最近最少访问淘汰缓存"""
+        while self.total_size > self.max_size:
+            with self.lock:
+                rows = self.conn.execute('SELECT key FROM entries ORDER BY last_access LIMIT 100').fetchall()
+            if not rows:
+                break
+            for row in rows:
+                if self.total_size <= self.max_size:
+                    break
+                self._delete(row['key'])
+                self.record('evicted')
+
+    def stats(self):
+        """获取缓存命中统计和占用空间"""
+        with self.lock:
+            result = dict(self.counters)
+            result['entries'] = self.conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+            result['size'] = self.total_size
+        lookups = result['hits'] + result['misses'] + result['revalidated']
+        result['hit_rate'] = round((result['hits'] + result['revalidated']) / lookups, 3) if lookups else 0.0
+        return result
+
+    def close(self):
+        """关闭索引数据库"""
+        with self.lock:
+            self.conn.close()
+
+
+_http_cache = None
+_http_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """获取进程内共享的HTTP缓存，首次使用时创建"""
+    global _http_cache
+    if _http_cache is None:
+        with _http_cache_lock:
+            if _http_cache is None:
+                _http_cache = HttpCache.from_settings()
+    return _http_cache
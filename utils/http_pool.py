@@ -0,0 +1,167 @@
+import ssl
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.ssl_ import create_urllib3_context, resolve_cert_reqs
+from urllib.parse import urlparse
+
+from config.settings import HTTP_POOL_SETTINGS
+from utils.logger import setup_logger
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """带连接统计的HTTP适配器
+
+    按证书校验模式使用独立的SSL上下文（urllib3会修改上下文的校验模式，
+    不能在校验与不校验的连接之间共享），并统计新建连接与复用连接的次数。
+    """
+
+    def __init__(self, ssl_context_factory=None, **kwargs):
+        self.ssl_context_factory = ssl_context_factory
+        self._ssl_contexts = {}
+        super().__init__(**kwargs)
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        if self.ssl_context_factory is not None and host_params.get('scheme') == 'https':
+            cert_reqs = pool_kwargs.get('cert_reqs')
+            if cert_reqs not in self._ssl_contexts:
+                self._ssl_contexts[cert_reqs] = self.ssl_context_factory(cert_reqs)
+            pool_kwargs['ssl_context'] = self._ssl_contexts[cert_reqs]
+        return host_params, pool_kwargs
+
+    def connection_stats(self):
+        """统计当前连接池的连接使用情况
+
+        Returns:
+            dict: {'opened': 新建连接数, 'reused': 复用连接数, 'requests': 请求总数}
+        """
+        opened = 0
+        total = 0
+        pools = self.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            opened += pool.num_connections
+            total += pool.num_requests
+        return {
+            'opened': opened,
+            'reused': max(total - opened, 0),
+            'requests': total,
+        }
+
+
+class SessionRegistry:
+    """进程级会话注册表：按主机复用requests会话与连接池
+
+    监测器、下载器和爬虫通过同一个注册表获取会话，同一主机的请求
+    共享keep-alive连接，避免每次检查都重新建立TCP/TLS连接。
+    只有legacy_ssl_hosts白名单中的主机使用放宽的SSL上下文，其他主机使用默认上下文。
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=10, max_retries=0,
+                 legacy_ssl_hosts=None, host_settings=None):
+        self.logger = setup_logger('SessionRegistry')
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.host_settings = host_settings or {}
+        self.legacy_ssl_hosts = list(legacy_ssl_hosts or [])
+        self._sessions = {}
+        self._adapters = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建注册表"""
+        settings = settings or HTTP_POOL_SETTINGS
+        return cls(
+            pool_connections=settings.get('pool_connections', 4),
+            pool_maxsize=settings.get('pool_maxsize', 10),
+            max_retries=settings.get('max_retries', 0),
+            legacy_ssl_hosts=settings.get('legacy_ssl_hosts', []),
+            host_settings=settings.get('hosts', {})
+        )
+
+    def _create_ssl_context(self, cert_reqs=None):
+        """创建更宽松的SSL上下文，兼容老旧的政府网站"""
+        context = create_urllib3_context(cert_reqs=resolve_cert_reqs(cert_reqs))
+        context.options |= getattr(ssl, 'OP_LEGACY_SERVER_CONNECT', 0x4)
+        try:
+            # 放宽密码套件安全级别，兼容使用旧证书的站点
+            context.set_ciphers('DEFAULT@SECLEVEL=1')
+        except ssl.SSLError as e:
+            self.logger.warning(f"设置SSL密码套件失败: {str(e)}")
+        return context
+
+    def _match_domain(self, host, domain):
+        return host == domain or host.endswith('.' + domain)
+
+    def _use_legacy_ssl(self, host):
+        """主机是否在放宽SSL的白名单中"""
+        return any(self._match_domain(host, domain) for domain in self.legacy_ssl_hosts)
+
+    def _get_host_settings(self, host):
+        """获取主机的连接池配置，支持按域名后缀匹配"""
+        for domain, settings in self.host_settings.items():
+            if self._match_domain(host, domain):
+                return settings
+        return {}
+
+    def get_session(self, url):
+        """获取URL所属主机的共享会话"""
+        parsed = urlparse(url)
+        key = f"{parsed.scheme}://{parsed.netloc}"
+
+        session = self._sessions.get(key)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                host = parsed.hostname or ''
+                settings = self._get_host_settings(host)
+                legacy_ssl = self._use_legacy_ssl(host)
+                adapter = PooledHTTPAdapter(
+                    ssl_context_factory=self._create_ssl_context if legacy_ssl else None,
+                    pool_connections=settings.get('pool_connections', self.pool_connections),
+                    pool_maxsize=settings.get('pool_maxsize', self.pool_maxsize),
+                    max_retries=settings.get('max_retries', self.max_retries)
+                )
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._adapters[key] = adapter
+                self._sessions[key] = session
+                self.logger.debug(f"创建主机会话: {key}{' (兼容旧版SSL)' if legacy_ssl else ''}")
+        return session
+
+    def stats(self):
+        """获取各主机及全局的连接统计"""
+        hosts = {}
+        totals = {'opened': 0, 'reused': 0, 'requests': 0}
+        for key, adapter in list(self._adapters.items()):
+            host_stats = adapter.connection_stats()
+            hosts[key] = host_stats
+            for field in totals:
+                totals[field] += host_stats[field]
+        return {'hosts': hosts, 'total': totals}
+
+    def close_all(self):
+        """关闭所有会话及其连接池"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._adapters.clear()
+
+
+# 全局会话注册表实例
+session_registry = SessionRegistry.from_settings()
+
+
+def get_session(url):
+    """获取URL所属主机的共享会话"""
+    return session_registry.get_session(url)
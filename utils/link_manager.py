@@ -1,60 +1,156 @@
 import os
 import json
 import csv
+import threading
 from datetime import datetime
-import pandas as pd
 from utils.logger import setup_logger
+from utils.status_journal import get_link_pool_journal
 
 class LinkPoolManager:
+    """链接库管理
+    
+    解析后的链接库按文件路径缓存，文件修改时间或大小变化后重新解析；
+    站点名称到文件的解析（精确匹配及模糊匹配）按目录修改时间缓存，
+    目录中文件增删后重新计算。爬取时间的更新记录到链接库状态日志，
+    由日志合并后定时写回文件，读取时叠加尚未写回的变更。
+    """
     def __init__(self, base_path='data/link_pool'):
         self.logger = setup_logger('LinkPoolManager')
         self.base_path = base_path
         os.makedirs(base_path, exist_ok=True)
+        self.lock = threading.RLock()
+        # 已解析的链接库: {文件路径: ((修改时间, 大小), 链接列表)}
+        self.links_cache = {}
+        # 站点名称解析结果: {站点名称: 文件路径}，目录版本变化时清空
+        self.path_cache = {}
+        self.dir_version = None
+        self.filenames = []
         
     # 在现有代码中添加深圳政府网站的处理逻辑
     def get_site_links(self, site_name):
         """获取指定网站的链接列表"""
         file_path = self._get_file_path(site_name)
-        if not os.path.exists(file_path):
+        version = self._file_version(file_path)
+        if version is None:
             self.logger.error(f"链接库文件不存在: {file_path}")
             return []
-            
-        if file_path.endswith('.json'):
-            return self._read_json_links(file_path)
-        elif file_path.endswith('.csv'):
-            return self._read_csv_links(file_path)
-        else:
-            self.logger.error(f"不支持的链接库文件格式: {file_path}")
-            return []
+        
+        with self.lock:
+            cached = self.links_cache.get(file_path)
+        if cached is None or cached[0] != version:
+            if file_path.endswith('.json'):
+                links = self._read_json_links(file_path)
+            elif file_path.endswith('.csv'):
+                links = self._read_csv_links(file_path)
+            else:
+                self.logger.error(f"不支持的链接库文件格式: {file_path}")
+                return []
+            cached = (version, links)
+            with self.lock:
+                self.links_cache[file_path] = cached
+        # 返回副本，避免调用方修改缓存；叠加尚未写回文件的爬取时间
+        links = [dict(link) for link in cached[1]]
+        patches = get_link_pool_journal().pending_for(file_path)
+        if patches:
+            for link in links:
+                for url in (None, link.get('url')):
+                    if 'last_crawled' in patches.get(url, {}):
+                        link['last_crawled'] = patches[url]['last_crawled']
+        return links
+    
+    def _file_version(self, file_path):
+        """文件的(修改时间, 大小)，文件不存在时返回None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
     
     def update_crawl_time(self, site_name, url=None):
-        """更新指定网站或URL的爬取时间"""
+        """更新指定网站或URL的爬取时间（记录到状态日志，延迟写回链接库文件）"""
         file_path = self._get_file_path(site_name)
         if not os.path.exists(file_path):
             self.logger.error(f"链接库文件不存在: {file_path}")
             return False
             
+        if not (file_path.endswith('.json') or file_path.endswith('.csv')):
+            self.logger.error(f"不支持的链接库文件格式: {file_path}")
+            return False
+        
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            return get_link_pool_journal().record(file_path, url, {'last_crawled': current_time})
+        except Exception as e:
+            self.logger.error(f"记录爬取时间失败: {str(e)}")
+            return False
+    
+    def export_links(self, site_name, output_path):
+        """导出站点链接为CSV或Excel（按扩展名），需要安装pandas"""
+        links = self.get_site_links(site_name)
+        if not links:
+            self.logger.error(f"链接库为空，无法导出: {site_name}")
+            return False
+        try:
+            import pandas as pd
+        except ImportError:
+            self.logger.error("导出链接库需要安装pandas: pip install pandas")
+            return False
         
-        if file_path.endswith('.json'):
-            return self._update_json_crawl_time(file_path, url, current_time)
-        elif file_path.endswith('.csv'):
-            return self._update_csv_crawl_time(file_path, url, current_time)
-        else:
-            self.logger.error(f"不支持的链接库文件格式: {file_path}")
+        try:
+            df = pd.DataFrame([{
+                '名称': link['name'],
+                '链接': link['url'],
+                '优先级': link['priority'],
+                '上次爬取时间': link['last_crawled'],
+                '爬取频率': link['crawl_frequency'],
+            } for link in links])
+            if output_path.endswith('.xlsx'):
+                df.to_excel(output_path, index=False)
+            else:
+                df.to_csv(output_path, index=False, encoding='utf-8')
+            self.logger.info(f"已导出 {len(links)} 条链接: {site_name} -> {output_path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"导出链接库失败: {str(e)}")
             return False
     
     def _get_file_path(self, site_name):
-        """获取链接库文件路径"""
+        """获取链接库文件路径，结果按目录版本缓存"""
+        with self.lock:
+            self._refresh_dir()
+            file_path = self.path_cache.get(site_name)
+            if file_path is None:
+                file_path = self._resolve_file_path(site_name)
+                self.path_cache[site_name] = file_path
+            return file_path
+    
+    def _refresh_dir(self):
+        """链接库目录中文件增删（目录修改时间变化）后重新列出文件并清空解析结果"""
+        version = self._file_version(self.base_path)
+        if version == self.dir_version:
+            return
+        try:
+            filenames = os.listdir(self.base_path)
+        except OSError:
+            filenames = []
+        self.dir_version = version
+        self.filenames = [(filename, filename.lower()) for filename in filenames]
+        self.path_cache.clear()
+        # 已删除文件的解析缓存一并清理
+        existing = {os.path.join(self.base_path, filename) for filename in filenames}
+        self.links_cache = {path: cached for path, cached in self.links_cache.items() if path in existing}
+    
+    def _resolve_file_path(self, site_name):
+        names = {filename for filename, _ in self.filenames}
         # 先尝试直接匹配文件名
         for ext in ['.json', '.csv']:
-            file_path = os.path.join(self.base_path, f"{site_name}{ext}")
-            if os.path.exists(file_path):
-                return file_path
+            if f"{site_name}{ext}" in names:
+                return os.path.join(self.base_path, f"{site_name}{ext}")
         
         # 如果没有直接匹配，尝试模糊匹配
-        for filename in os.listdir(self.base_path):
-            if site_name.lower() in filename.lower():
+        lowered = site_name.lower()
+        for filename, lower_name in self.filenames:
+            if lowered in lower_name:
                 return os.path.join(self.base_path, filename)
         
         # 默认返回JSON格式路径
@@ -67,8 +163,10 @@ class LinkPoolManager:
                 data = json.load(f)
             
             links = []
-            if 'policy_sections' in data:
-                for section in data['policy_sections']:
+            # 兼容sections和旧格式的policy_sections
+            sections = data.get('sections') or data.get('policy_sections') or []
+            if sections:
+                for section in sections:
                     links.append({
                         'name': section.get('name', ''),
                         'url': section.get('url', ''),
@@ -99,46 +197,19 @@ class LinkPoolManager:
         except Exception as e:
             self.logger.error(f"读取CSV链接库失败: {str(e)}")
             return []
-    
-    def _update_json_crawl_time(self, file_path, url, current_time):
-        """更新JSON格式链接库的爬取时间"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            if url is None:
-                # 更新整个网站的爬取时间
-                data['last_crawled'] = current_time
-            else:
-                # 更新特定URL的爬取时间
-                for section in data.get('policy_sections', []):
-                    if section.get('url') == url:
-                        section['last_crawled'] = current_time
-                        break
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            return True
-        except Exception as e:
-            self.logger.error(f"更新JSON链接库爬取时间失败: {str(e)}")
-            return False
-    
-    def _update_csv_crawl_time(self, file_path, url, current_time):
-        """更新CSV格式链接库的爬取时间"""
-        try:
-            df = pd.read_csv(file_path)
-            
-            if url is None:
-                # 更新整个网站的爬取时间
-                df['上次爬取时间'] = current_time
-            else:
-                # 更新特定URL的爬取时间
-                df.loc[df['链接'] == url, '上次爬取时间'] = current_time
-            
-            df.to_csv(file_path, index=False, encoding='utf-8')
-            
-            return True
-        except Exception as e:
-            self.logger.error(f"更新CSV链接库爬取时间失败: {str(e)}")
-            return False
\ No newline at end of file
+
+
+_link_managers = {}
+_link_managers_lock = threading.Lock()
+
+
+def get_link_manager(base_path='data/link_pool'):
+    """获取进程内共享的链接库管理器（按链接库目录），首次使用时创建"""
+    key = os.path.abspath(base_path)
+    manager = _link_managers.get(key)
+    if manager is None:
+        with _link_managers_lock:
+            manager = _link_managers.get(key)
+            if manager is None:
+                manager = _link_managers[key] = LinkPoolManager(base_path)
+    return manager
@@ -0,0 +1,129 @@
+import csv
+import json
+from datetime import datetime
+
+from utils.logger import setup_logger
+
+# CSV链接库各字段可用的列名（按优先顺序），缺少名称/URL列时按列位置取
+CSV_COLUMNS = {
+    'name': ('section_name', '名称'),
+    'url': ('url', '链接'),
+    'priority': ('priority', '优先级'),
+    'last_crawled': ('last_crawled', '上次爬取时间'),
+    'check_interval': ('check_interval', '爬取频率'),
+}
+CSV_FALLBACK_POSITIONS = {'name': 0, 'url': 1}
+
+# 爬取频率对应的检查间隔（秒），其他取值使用默认检查间隔
+FREQUENCY_SECONDS = {
+    'daily': 86400,     # 一天的秒数
+    'weekly': 604800,   # 一周的秒数
+    'monthly': 2592000, # 30天的秒数
+}
+
+DEFAULT_PRIORITY = 5  # 默认中等优先级
+
+
+def detect_csv_schema(header):
+    """根据表头确定各字段所在的列序号，没有对应列的字段为None"""
+    schema = {}
+    for field, columns in CSV_COLUMNS.items():
+        schema[field] = next((header.index(column) for column in columns if column in header), None)
+        if schema[field] is None and field in CSV_FALLBACK_POSITIONS and len(header) > CSV_FALLBACK_POSITIONS[field]:
+            schema[field] = CSV_FALLBACK_POSITIONS[field]
+    return schema
+
+
+class LinkPoolLoader:
+    """链接库文件加载
+
+    CSV按行流式读取，表头只解析一次确定各字段的列序号，每行直接按序号取值；
+    JSON一次读入后补充下次检查时间。不依赖pandas。
+    """
+
+    def __init__(self, default_check_interval=300):
+        self.logger = setup_logger('LinkPoolLoader')
+        self.default_check_interval = default_check_interval
+
+    def load(self, file_path, site_name):
+        """加载链接库文件，返回站点数据；格式不支持时返回None"""
+        if file_path.endswith('.json'):
+            return self._load_json(file_path)
+        if file_path.endswith('.csv'):
+            return self._load_csv(file_path, site_name)
+        self.logger.error(f"不支持的链接库文件格式: {file_path}")
+        return None
+
+    def _load_json(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            site_data = json.load(f)
+
+        # 初始化下次检查时间
+        now = datetime.now().timestamp()
+        if 'sections' in site_data:
+            entries = site_data['sections']
+        elif 'policy_sections' in site_data:
+            # 兼容旧格式
+            entries = site_data['policy_sections']
+        else:
+            entries = [site_data]
+        for entry in entries:
+            entry.setdefault('next_check', now)
+        return site_data
+
+    def _load_csv(self, file_path, site_name):
+        site_data = {
+            'name': site_name,
+            'sections': []
+        }
+        now = datetime.now().timestamp()
+        with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return site_data
+            schema = detect_csv_schema(header)
+            self.logger.debug(f"CSV链接库列: {site_name} - {schema}")
+
+            name_index = schema['name']
+            url_index = schema['url']
+            priority_index = schema['priority']
+            interval_index = schema['check_interval']
+            width = len(header)
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < width:
+                    row.extend([''] * (width - len(row)))
+                name = row[name_index] if name_index is not None else ''
+                site_data['sections'].append({
+                    'name': name,
+                    'url': row[url_index] if url_index is not None else '',
+                    'priority': self._parse_priority(site_name, name, row[priority_index])
+                    if priority_index is not None else DEFAULT_PRIORITY,
+                    'next_check': now,
+                    'check_interval': self._parse_interval(row[interval_index])
+                    if interval_index is not None else self.default_check_interval
+                })
+        return site_data
+
+    def _parse_priority(self, site_name, name, value):
+        value = value.strip()
+        if not value:
+            return DEFAULT_PRIORITY
+        try:
+            return int(float(value))
+        except ValueError as e:
+            self.logger.warning(f"优先级格式错误: {site_name} - {name} - 值: {value} - 错误: {str(e)}")
+            return DEFAULT_PRIORITY
+
+    def _parse_interval(self, value):
+        """检查间隔可以是秒数或 daily/weekly/monthly"""
+        value = value.strip()
+        if not value:
+            return self.default_check_interval
+        try:
+            return int(float(value))
+        except ValueError:
+            pass
+        return FREQUENCY_SECONDS.get(value.lower(), self.default_check_interval)
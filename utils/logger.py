@@ -4,6 +4,9 @@ from pathlib import Path
 
 def setup_logger(name):
     logger = logging.getLogger(name)
+    # 已配置过的logger直接返回，避免重复创建handler和打开日志文件
+    if logger.handlers:
+        return logger
     logger.setLevel(logging.DEBUG)
     
     # 统一日志格式
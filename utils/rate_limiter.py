@@ -0,0 +1,117 @@
+import time
+import threading
+from urllib.parse import urlparse
+
+from config.settings import RATE_LIMIT_SETTINGS
+from utils.logger import setup_logger
+
+
+class TokenBucket:
+    """令牌桶：按固定速率补充令牌，允许一定的突发请求"""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def reserve(self, now):
+        """尝试取出一个令牌，成功返回0，否则返回需要等待的秒数"""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return float('inf')
+        return (1 - self.tokens) / self.rate
+
+
+class HostRateLimiter:
+    """按主机限速的礼貌性控制器
+
+    监测器和爬虫共享同一个实例。reserve()不会阻塞，令牌不足时返回需要等待的
+    秒数，由调用方推迟请求；acquire()供爬虫工作线程使用，会等待到拿到令牌。
+    """
+
+    def __init__(self, default_rate=1.0, default_burst=2, domains=None):
+        self.logger = setup_logger('HostRateLimiter')
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.domains = dict(domains or {})
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建限速器"""
+        settings = settings or RATE_LIMIT_SETTINGS
+        default = settings.get('default', {})
+        return cls(
+            default_rate=default.get('rate', 1.0),
+            default_burst=default.get('burst', 2),
+            domains=settings.get('domains', {})
+        )
+
+    def _get_limit(self, host):
+        """获取主机的速率配置，支持按域名后缀匹配"""
+        for domain, limit in self.domains.items():
+            if host == domain or host.endswith('.' + domain):
+                return limit.get('rate', self.default_rate), limit.get('burst', self.default_burst)
+        return self.default_rate, self.default_burst
+
+    def _get_bucket(self, host):
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            rate, burst = self._get_limit(host)
+            bucket = TokenBucket(rate, burst)
+            self.buckets[host] = bucket
+        return bucket
+
+    def set_domain_limit(self, domain, rate, burst=1, override=True):
+        """设置域名的速率限制，已创建的令牌桶会按新配置重建
+
+        Args:
+            override: 为False时，已配置过的域名保持原配置不变
+        """
+        with self.lock:
+            current = self.domains.get(domain)
+            if current and not override:
+                return
+            if current and current.get('rate') == rate and current.get('burst') == burst:
+                return
+            self.domains[domain] = {'rate': rate, 'burst': burst}
+            for host in list(self.buckets):
+                if host == domain or host.endswith('.' + domain):
+                    del self.buckets[host]
+        self.logger.info(f"设置域名限速: {domain} - 每秒 {rate} 次, 突发 {burst} 次")
+
+    def reserve(self, url):
+        """非阻塞地申请一次请求配额
+
+        Returns:
+            float: 0表示可以立即请求，否则为需要推迟的秒数
+        """
+        host = urlparse(url).netloc
+        with self.lock:
+            return self._get_bucket(host).reserve(time.monotonic())
+
+    def acquire(self, url, timeout=None):
+        """阻塞等待直到拿到请求配额，超时返回False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self.reserve(url)
+            if wait <= 0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+# 全局限速器实例
+rate_limiter = HostRateLimiter.from_settings()
@@ -0,0 +1,157 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from config.settings import DATA_PATHS, SECTION_RESOLVER_SETTINGS
+from utils.link_manager import get_link_manager
+from utils.logger import setup_logger
+
+
+def url_key(url):
+    """将URL拆分为(主机, 路径段列表)，主机小写并去掉默认端口"""
+    parts = urlsplit((url or '').strip())
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((parts.scheme == 'http' and port == 80) or (parts.scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    segments = [segment for segment in parts.path.split('/') if segment]
+    return host, segments
+
+
+class SectionTrie:
+    """按主机+路径段构建的前缀树，查找URL所属的最长前缀栏目"""
+
+    def __init__(self):
+        self.root = {}
+        self.size = 0
+
+    def insert(self, url, section_name):
+        host, segments = url_key(url)
+        if not host:
+            return
+        # 栏目链接以文件结尾（如index.html）时按所在目录匹配
+        if segments and '.' in segments[-1]:
+            segments = segments[:-1]
+        node = self.root.setdefault(host, {})
+        for segment in segments:
+            node = node.setdefault(segment, {})
+        # 同一前缀配置了多个栏目时保留先出现的
+        if None not in node:
+            node[None] = section_name
+            self.size += 1
+
+    def lookup(self, url):
+        """返回最长前缀匹配的栏目名称，没有匹配时返回None"""
+        host, segments = url_key(url)
+        node = self.root.get(host)
+        if node is None:
+            return None
+        section_name = node.get(None)
+        for segment in segments:
+            node = node.get(segment)
+            if node is None:
+                break
+            section_name = node.get(None, section_name)
+        return section_name
+
+
+class SectionResolver:
+    """根据详情页URL确定所属栏目
+
+    从链接库所有站点的栏目链接构建主机+路径前缀树，按最长前缀匹配栏目；
+    链接库文件变化（增删、修改时间或大小变化）后重建前缀树。
+    解析结果保存在有容量上限的LRU缓存中。
+    """
+
+    def __init__(self, link_pool_dir='data/link_pool', cache_size=10000, refresh_interval=5):
+        self.logger = setup_logger('SectionResolver')
+        self.link_pool_dir = link_pool_dir
+        self.cache_size = cache_size
+        self.refresh_interval = refresh_interval  # 检查链接库是否变化的最小间隔（秒）
+        self.link_manager = get_link_manager(link_pool_dir)
+        self.lock = threading.Lock()
+        self.cache = OrderedDict()
+        self.trie = SectionTrie()
+        self.version = None
+        self.last_check = 0
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建栏目解析器，链接库目录相对项目根目录"""
+        settings = settings or SECTION_RESOLVER_SETTINGS
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return cls(
+            link_pool_dir=os.path.join(root, DATA_PATHS.get('link_pool', 'data/link_pool')),
+            cache_size=settings.get('cache_size', 10000),
+            refresh_interval=settings.get('refresh_interval', 5)
+        )
+
+    def _pool_version(self):
+        """链接库目录下各文件的(文件名, 修改时间, 大小)"""
+        try:
+            entries = []
+            for filename in sorted(os.listdir(self.link_pool_dir)):
+                if filename.endswith('.json') or filename.endswith('.csv'):
+                    stat = os.stat(os.path.join(self.link_pool_dir, filename))
+                    entries.append((filename, stat.st_mtime_ns, stat.st_size))
+            return tuple(entries)
+        except OSError:
+            return ()
+
+    def _refresh(self):
+        """到达检查间隔时检查链接库，变化后重建前缀树并清空缓存"""
+        now = time.monotonic()
+        if self.version is not None and now - self.last_check < self.refresh_interval:
+            return
+        self.last_check = now
+        version = self._pool_version()
+        if version == self.version:
+            return
+
+        start = time.perf_counter()
+        trie = SectionTrie()
+        for filename, _, _ in version:
+            site_name = os.path.splitext(filename)[0]
+            for link in self.link_manager.get_site_links(site_name):
+                trie.insert(link.get('url', ''), link.get('name') or '未知栏目')
+        self.trie = trie
+        self.version = version
+        self.cache.clear()
+        self.logger.info(f"重建栏目前缀树: {len(version)} 个链接库, {trie.size} 个栏目, "
+                         f"耗时 {(time.perf_counter() - start) * 1000:.1f}毫秒")
+
+    def resolve(self, url):
+        """根据URL确定栏目名称，没有匹配的栏目时使用URL的最后一级目录名，都没有时返回"其他" """
+        with self.lock:
+            self._refresh()
+            section_name = self.cache.get(url)
+            if section_name is not None:
+                self.cache.move_to_end(url)
+                return section_name
+
+            section_name = self.trie.lookup(url)
+            if section_name is None:
+                # 如果没有匹配的栏目，使用URL的最后一级目录名
+                _, segments = url_key(url)
+                section_name = segments[-1] if segments else "其他"
+
+            self.cache[url] = section_name
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return section_name
+
+
+_section_resolver = None
+_section_resolver_lock = threading.Lock()
+
+
+def get_section_resolver():
+    """获取进程内共享的栏目解析器，首次使用时创建"""
+    global _section_resolver
+    if _section_resolver is None:
+        with _section_resolver_lock:
+            if _section_resolver is None:
+                _section_resolver = SectionResolver.from_settings()
+    return _section_resolver
@@ -0,0 +1,325 @@
+import os
+import math
+import atexit
+import struct
+import time
+import sqlite3
+import hashlib
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from config.settings import DATA_PATHS, SEEN_INDEX_SETTINGS
+from utils.logger import setup_logger
+
+
+def normalize_url(url):
+    """规范化URL：协议和主机小写、去掉默认端口和锚点、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    port = parts.port
+    if port and not ((scheme == 'http' and port == 80) or (scheme == 'https' and port == 443)):
+        host = f"{host}:{port}"
+    path = parts.path or '/'
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class BloomFilter:
+    """定长布隆过滤器，使用blake2b双重哈希计算位置"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        # 按容量和误判率计算位数组大小和哈希次数
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, hashes):
+        h1, h2 = hashes
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, hashes):
+        for pos in self._positions(hashes):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, hashes):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(hashes))
+
+    @property
+    def full(self):
+        return self.count >= self.capacity
+
+
+class ScalableBloomFilter:
+    """可扩容的布隆过滤器：当前层写满后追加一层容量翻倍、误判率减半的过滤器"""
+
+    def __init__(self, initial_capacity=100000, error_rate=0.001):
+        self.error_rate = error_rate
+        self.filters = [BloomFilter(initial_capacity, error_rate / 2)]
+
+    @staticmethod
+    def _hashes(key):
+        """每个键只计算一次blake2b，各层共用两个64位哈希值"""
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def add(self, key):
+        current = self.filters[-1]
+        if current.full:
+            current = BloomFilter(current.capacity * 2, current.error_rate / 2)
+            self.filters.append(current)
+        current.add(self._hashes(key))
+
+    def __contains__(self, key):
+        hashes = self._hashes(key)
+        return any(hashes in bloom for bloom in self.filters)
+
+    def __len__(self):
+        return sum(bloom.count for bloom in self.filters)
+
+    @property
+    def memory_bytes(self):
+        return sum(len(bloom.bits) for bloom in self.filters)
+
+    # 快照文件格式: 层数，每层(容量, 误判率, 位数, 哈希次数, 元素数)及位数组
+    _HEADER = struct.Struct('<I')
+    _LAYER = struct.Struct('<QdQIQ')
+
+    def dump(self, f):
+        """将各层位数组写入文件"""
+        f.write(self._HEADER.pack(len(self.filters)))
+        for bloom in self.filters:
+            f.write(self._LAYER.pack(bloom.capacity, bloom.error_rate, bloom.num_bits,
+                                     bloom.num_hashes, bloom.count))
+            f.write(bloom.bits)
+
+    @classmethod
+    def load(cls, f, error_rate=0.001):
+        """从快照文件恢复过滤器"""
+        instance = cls.__new__(cls)
+        instance.error_rate = error_rate
+        instance.filters = []
+        (layers,) = cls._HEADER.unpack(f.read(cls._HEADER.size))
+        for _ in range(layers):
+            capacity, layer_error, num_bits, num_hashes, count = cls._LAYER.unpack(f.read(cls._LAYER.size))
+            bloom = BloomFilter.__new__(BloomFilter)
+            bloom.capacity = capacity
+            bloom.error_rate = layer_error
+            bloom.num_bits = num_bits
+            bloom.num_hashes = num_hashes
+            bloom.count = count
+            bloom.bits = bytearray(f.read((num_bits + 7) // 8))
+            if len(bloom.bits) != (num_bits + 7) // 8:
+                raise ValueError('布隆过滤器快照不完整')
+            instance.filters.append(bloom)
+        if not instance.filters:
+            raise ValueError('布隆过滤器快照为空')
+        return instance
+
+
+class SeenUrlIndex:
+    """已入库详情页URL索引
+
+    内存中的布隆过滤器在前，绝大多数未见过的URL不访问磁盘即可判定；
+    布隆过滤器命中时再查询SQLite中的精确集合排除误判。以规范化URL为键，
+    可同时记录内容哈希，内容变化的页面不视为已入库。
+    布隆过滤器定期保存快照，启动时条目数一致则直接加载，否则从磁盘集合重建。
+    """
+
+    # 批量查询时每条SQL的最大参数个数
+    QUERY_CHUNK = 500
+
+    def __init__(self, db_path='data/seen_urls.db', initial_capacity=100000, error_rate=0.001,
+                 snapshot_every=1000):
+        self.logger = setup_logger('SeenUrlIndex')
+        self.db_path = db_path
+        self.snapshot_path = db_path + '.bloom'
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.snapshot_every = snapshot_every
+        self.unsaved_adds = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.stats_counters = {'lookups': 0, 'bloom_rejects': 0, 'false_positives': 0, 'hits': 0}
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS seen_urls ('
+            'url TEXT PRIMARY KEY, '
+            'content_hash TEXT, '
+            'first_seen REAL, '
+            'last_seen REAL) WITHOUT ROWID'
+        )
+        self.conn.commit()
+
+        self.bloom = self._load_bloom()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建索引"""
+        settings = settings or SEEN_INDEX_SETTINGS
+        return cls(
+            db_path=DATA_PATHS.get('seen_urls', 'data/seen_urls.db'),
+            initial_capacity=settings.get('initial_capacity', 100000),
+            error_rate=settings.get('error_rate', 0.001),
+            snapshot_every=settings.get('snapshot_every', 1000)
+        )
+
+    def _load_bloom(self):
+        """加载布隆过滤器快照，快照缺失或与磁盘集合不一致时重建"""
+        start = time.time()
+        (entries,) = self.conn.execute('SELECT COUNT(*) FROM seen_urls').fetchone()
+
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'rb') as f:
+                    bloom = ScalableBloomFilter.load(f, self.error_rate)
+                if len(bloom) == entries:
+                    return bloom
+                self.logger.info(f"布隆过滤器快照已过期，重建索引: 快照 {len(bloom)} 条, 磁盘 {entries} 条")
+            except (OSError, ValueError, struct.error) as e:
+                self.logger.warning(f"读取布隆过滤器快照失败，重建索引: {str(e)}")
+
+        # 流式读取磁盘集合，避免一次性加载全部URL
+        bloom = ScalableBloomFilter(max(self.initial_capacity, entries), self.error_rate)
+        cursor = self.conn.execute('SELECT url FROM seen_urls')
+        while True:
+            rows = cursor.fetchmany(10000)
+            if not rows:
+                break
+            for (url,) in rows:
+                bloom.add(url)
+        if entries:
+            self.logger.info(f"重建已入库URL索引: {entries} 条, "
+                             f"布隆过滤器 {bloom.memory_bytes / 1024:.0f}KB, 耗时 {time.time() - start:.2f}秒")
+            self.bloom = bloom
+            self._save_snapshot()
+        return bloom
+
+    def _save_snapshot(self):
+        """原子地写入布隆过滤器快照"""
+        tmp_path = self.snapshot_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                self.bloom.dump(f)
+            os.replace(tmp_path, self.snapshot_path)
+            self.unsaved_adds = 0
+        except OSError as e:
+            self.logger.error(f"保存布隆过滤器快照失败: {str(e)}")
+
+    def contains(self, url, content_hash=None):
+        """判断URL是否已入库
+
+        Args:
+            content_hash: 提供时还要求已记录的内容哈希一致
+        """
+        if not url:
+            return False
+        key = normalize_url(url)
+        with self.lock:
+            self.stats_counters['lookups'] += 1
+            if key not in self.bloom:
+                self.stats_counters['bloom_rejects'] += 1
+                return False
+            row = self.conn.execute('SELECT content_hash FROM seen_urls WHERE url = ?', (key,)).fetchone()
+            if row is None:
+                self.stats_counters['false_positives'] += 1
+                return False
+            if content_hash and row[0] != content_hash:
+                return False
+            self.stats_counters['hits'] += 1
+            return True
+
+    def filter_new(self, urls):
+        """过滤掉已入库的URL，保持原有顺序"""
+        keys = [normalize_url(url) for url in urls]
+        with self.lock:
+            self.stats_counters['lookups'] += len(keys)
+            candidates = [key for key in set(keys) if key in self.bloom]
+            self.stats_counters['bloom_rejects'] += len(set(keys)) - len(candidates)
+
+            seen = set()
+            for i in range(0, len(candidates), self.QUERY_CHUNK):
+                chunk = candidates[i:i + self.QUERY_CHUNK]
+                placeholders = ', '.join(['?'] * len(chunk))
+                rows = self.conn.execute(f'SELECT url FROM seen_urls WHERE url IN ({placeholders})', chunk)
+                seen.update(row[0] for row in rows)
+            self.stats_counters['false_positives'] += len(candidates) - len(seen)
+            self.stats_counters['hits'] += len(seen)
+
+        return [url for url, key in zip(urls, keys) if key not in seen]
+
+    def add(self, url, content_hash=None):
+        """记录已入库的URL及其内容哈希"""
+        if not url:
+            return False
+        key = normalize_url(url)
+        now = time.time()
+        try:
+            with self.lock:
+                cursor = self.conn.execute(
+                    'INSERT INTO seen_urls (url, content_hash, first_seen, last_seen) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT(url) DO NOTHING',
+                    (key, content_hash, now, now)
+                )
+                inserted = cursor.rowcount == 1
+                if not inserted:
+                    self.conn.execute(
+                        'UPDATE seen_urls SET content_hash = COALESCE(?, content_hash), last_seen = ? WHERE url = ?',
+                        (content_hash, now, key)
+                    )
+                self.conn.commit()
+                # 按实际新增的行计数，新URL恰好是布隆过滤器误判时也要计入，保持与磁盘集合条数一致
+                if inserted:
+                    self.bloom.add(key)
+                    self.unsaved_adds += 1
+                    if self.unsaved_adds >= self.snapshot_every:
+                        self._save_snapshot()
+            return True
+        except sqlite3.Error as e:
+            self.logger.error(f"记录已入库URL失败: {url} - {str(e)}")
+            return False
+
+    def stats(self):
+        """获取索引规模、内存占用和命中统计"""
+        with self.lock:
+            result = dict(self.stats_counters)
+            result['entries'] = len(self.bloom)
+            result['bloom_bytes'] = self.bloom.memory_bytes
+            result['bloom_layers'] = len(self.bloom.filters)
+            return result
+
+    def close(self):
+        """保存快照并关闭数据库连接"""
+        with self.lock:
+            if self.closed:
+                return
+            if self.unsaved_adds:
+                self._save_snapshot()
+            self.closed = True
+            self.conn.close()
+
+
+_seen_index = None
+_seen_index_lock = threading.Lock()
+
+
+def get_seen_index():
+    """获取进程内共享的已入库URL索引，首次使用时创建，进程退出时保存快照"""
+    global _seen_index
+    if _seen_index is None:
+        with _seen_index_lock:
+            if _seen_index is None:
+                _seen_index = SeenUrlIndex.from_settings()
+                atexit.register(_seen_index.close)
+    return _seen_index
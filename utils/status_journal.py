@@ -0,0 +1,287 @@
+import io
+import os
+import csv
+import json
+import atexit
+import threading
+
+from config.settings import DATA_PATHS, LINK_POOL_JOURNAL_SETTINGS
+from utils.logger import setup_logger
+
+# 状态字段在CSV链接库中对应的列名（按优先顺序）
+CSV_COLUMNS = {
+    'last_crawled': ('上次爬取时间', 'last_crawled'),
+}
+CSV_URL_COLUMNS = ('链接', 'url')
+
+
+class LinkPoolJournal:
+    """链接库状态的延迟写回日志
+
+    爬取时间等状态变更先以一行JSON追加到日志文件，并在内存中按文件和栏目URL合并，
+    同一栏目多次更新只保留最新值。后台线程定时将每个有变更的链接库文件读入、
+    应用全部变更后写入临时文件再原子替换，同一站点的多次更新只产生一次文件写入。
+    写回成功后日志压缩为仍未写回的变更（通常为空）；启动时重放日志，
+    崩溃前未写回的变更不会丢失。写回后记录文件版本，供文件监听区分自身的写入。
+    """
+
+    def __init__(self, journal_path='data/link_pool_journal.log', flush_interval=30, fsync=True):
+        self.logger = setup_logger('LinkPoolJournal')
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        # 待写回的变更: {文件路径: {栏目URL(None表示整个站点): {字段: 值}}}
+        self.pending = {}
+        self.stats_counter = {'records': 0, 'flushes': 0, 'file_writes': 0}
+        # 自身写回后的文件版本: {文件路径: (inode, 修改时间, 大小)}
+        self.written_versions = {}
+        # 可确认为自身写入（不含其他程序修改）的文件版本
+        self.own_writes = {}
+        self.closed = False
+
+        journal_dir = os.path.dirname(journal_path)
+        if journal_dir:
+            os.makedirs(journal_dir, exist_ok=True)
+        self.journal_file = None
+        self._replay()
+        self.journal_file = open(journal_path, 'ab')
+
+        # 后台定时写回
+        self.stop_event = threading.Event()
+        self.flusher = threading.Thread(target=self._flush_loop, name='LinkPoolJournalFlusher', daemon=True)
+        self.flusher.start()
+
+    @classmethod
+    def from_settings(cls, settings=None):
+        """根据配置创建日志，日志路径相对项目根目录"""
+        settings = settings or LINK_POOL_JOURNAL_SETTINGS
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return cls(
+            journal_path=os.path.join(root, DATA_PATHS.get('link_pool_journal', 'data/link_pool_journal.log')),
+            flush_interval=settings.get('flush_interval', 30),
+            fsync=settings.get('fsync', True)
+        )
+
+    def _merge(self, file_path, url, fields):
+        patches = self.pending.setdefault(file_path, {})
+        # 重新插入到末尾，写回时按最后更新的顺序应用
+        entry = patches.pop(url, {})
+        entry.update(fields)
+        patches[url] = entry
+
+    def _replay(self):
+        """重放日志中崩溃前未写回的变更，忽略未完整写入的行"""
+        if not os.path.exists(self.journal_path):
+            return
+        replayed = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                self._merge(record['path'], record.get('url'), record['fields'])
+                replayed += 1
+        if replayed:
+            self.logger.info(f"重放链接库状态日志: {replayed} 条变更, {len(self.pending)} 个文件")
+            self._write_back()
+
+    def record(self, file_path, url, fields):
+        """记录一条状态变更，由后台线程合并写回链接库文件
+
+        Args:
+            file_path: 链接库文件路径
+            url: 栏目URL，None表示更新整个站点
+            fields: 要更新的字段，如 {'last_crawled': '2024-01-02 08:00:00'}
+        """
+        file_path = os.path.abspath(file_path)
+        line = json.dumps({'path': file_path, 'url': url, 'fields': fields},
+                          ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+        with self.lock:
+            if self.closed:
+                raise RuntimeError('链接库状态日志已关闭')
+            self.journal_file.write(line)
+            self.journal_file.flush()
+            if self.fsync:
+                os.fsync(self.journal_file.fileno())
+            self._merge(file_path, url, fields)
+            self.stats_counter['records'] += 1
+        return True
+
+    def pending_for(self, file_path):
+        """获取指定文件尚未写回的变更 {栏目URL: {字段: 值}}"""
+        with self.lock:
+            patches = self.pending.get(os.path.abspath(file_path), {})
+            return {url: dict(fields) for url, fields in patches.items()}
+
+    @staticmethod
+    def _file_version(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def is_own_write(self, file_path):
+        """文件当前内容是否正是本日志最近一次写回的结果（之后未被其他程序修改）"""
+        file_path = os.path.abspath(file_path)
+        with self.lock:
+            version = self.own_writes.get(file_path)
+        return version is not None and version == self._file_version(file_path)
+
+    def flush(self):
+        """将合并后的变更写回链接库文件，然后压缩日志"""
+        with self.lock:
+            if self.closed or not self.pending:
+                return 0
+            written = self._write_back()
+            self.stats_counter['flushes'] += 1
+            return written
+
+    def _write_back(self):
+        written = 0
+        for file_path, patches in list(self.pending.items()):
+            try:
+                before = self._file_version(file_path)
+                if before is None:
+                    self.logger.warning(f"链接库文件不存在，丢弃状态变更: {file_path}")
+                elif file_path.endswith('.json') or file_path.endswith('.csv'):
+                    if file_path.endswith('.json'):
+                        self._apply_json(file_path, patches)
+                    else:
+                        self._apply_csv(file_path, patches)
+                    written += 1
+                    self._mark_written(file_path, before)
+                else:
+                    self.logger.error(f"不支持的链接库文件格式: {file_path}")
+                del self.pending[file_path]
+            except Exception as e:
+                # 写回失败的变更保留在日志中，下次继续写回
+                self.logger.error(f"写回链接库状态失败: {file_path} - {str(e)}")
+        self.stats_counter['file_writes'] += written
+        self._compact_journal()
+        if written:
+            self.logger.info(f"写回链接库状态: {written} 个文件")
+        return written
+
+    def _mark_written(self, file_path, before):
+        """记录写回后的文件版本
+
+        只有读入的文件正是上次自身写回的版本时才确认为自身写入；首次写回或文件
+        在此之前被其他程序修改过时，写回结果中可能含有监测器尚未加载的修改，
+        不确认为自身写入，由文件监听照常重新加载。
+        """
+        after = self._file_version(file_path)
+        trusted = self.written_versions.get(file_path) == before
+        self.written_versions[file_path] = after
+        if trusted:
+            self.own_writes[file_path] = after
+        else:
+            self.own_writes.pop(file_path, None)
+
+    def _compact_journal(self):
+        """用仍未写回的变更重写日志"""
+        lines = [json.dumps({'path': file_path, 'url': url, 'fields': fields},
+                            ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+                 for file_path, patches in self.pending.items() for url, fields in patches.items()]
+        if self.journal_file:
+            self.journal_file.close()
+        self._atomic_write(self.journal_path, b''.join(lines))
+        if self.journal_file:
+            self.journal_file = open(self.journal_path, 'ab')
+
+    def _atomic_write(self, file_path, body):
+        """写入同目录下的隐藏临时文件后原子替换，读取方不会看到写了一半的文件"""
+        directory, filename = os.path.split(file_path)
+        tmp_path = os.path.join(directory, f".{filename}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(body)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+
+    def _apply_json(self, file_path, patches):
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        # 兼容sections和旧格式的policy_sections
+        sections = data.get('sections') or data.get('policy_sections') or []
+        by_url = {section.get('url'): section for section in sections}
+        for url, fields in patches.items():
+            if url is None:
+                data.update(fields)
+            elif url in by_url:
+                by_url[url].update(fields)
+            else:
+                self.logger.warning(f"链接库中未找到栏目，忽略状态变更: {file_path} - {url}")
+        body = json.dumps(data, ensure_ascii=False, indent=2)
+        self._atomic_write(file_path, body.encode('utf-8'))
+
+    def _apply_csv(self, file_path, patches):
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            rows = list(csv.reader(f))
+        if not rows:
+            return
+        header = rows[0]
+        url_index = next((header.index(column) for column in CSV_URL_COLUMNS if column in header), 1)
+        for url, fields in patches.items():
+            for field, value in fields.items():
+                columns = CSV_COLUMNS.get(field, (field,))
+                column = next((column for column in columns if column in header), None)
+                if column is None:
+                    # 缺少对应列时追加
+                    column = columns[0]
+                    header.append(column)
+                index = header.index(column)
+                for row in rows[1:]:
+                    if url is not None and (len(row) <= url_index or row[url_index] != url):
+                        continue
+                    row.extend([''] * (len(header) - len(row)))
+                    row[index] = value
+
+        # 与原pandas写出的格式一致（\n换行）
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        self._atomic_write(file_path, buffer.getvalue().encode('utf-8'))
+
+    def _flush_loop(self):
+        while not self.stop_event.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                self.logger.error(f"链接库状态定时写回失败: {str(e)}")
+
+    def stats(self):
+        """获取记录数、写回次数和实际写入的文件数"""
+        with self.lock:
+            stats = dict(self.stats_counter)
+            stats['pending_files'] = len(self.pending)
+            return stats
+
+    def close(self):
+        """写回全部变更并关闭日志"""
+        self.stop_event.set()
+        with self.lock:
+            if self.closed:
+                return
+            self.flush()
+            self.closed = True
+            self.journal_file.close()
+
+
+_link_pool_journal = None
+_link_pool_journal_lock = threading.Lock()
+
+
+def get_link_pool_journal():
+    """获取进程内共享的链接库状态日志，首次使用时创建，进程退出前写回全部变更"""
+    global _link_pool_journal
+    if _link_pool_journal is None:
+        with _link_pool_journal_lock:
+            if _link_pool_journal is None:
+                _link_pool_journal = LinkPoolJournal.from_settings()
+                atexit.register(_link_pool_journal.close)
+    return _link_pool_journal
@@ -1,58 +1,66 @@
 import re
-import hashlib
 import logging
-from bs4 import BeautifulSoup
 from lxml import html
 import requests
 from urllib.parse import urlparse
+from utils.fingerprint import FingerprintEngine
 
 class WebPageValidator:
     """网页结构验证器：用于判断页面是否发生变化"""
     
     def __init__(self):
         self.logger = logging.getLogger('WebPageValidator')
+        # 基于lxml单次解析和blake2b的指纹引擎
+        self.fingerprint = FingerprintEngine.from_settings()
     
-    def calculate_content_hash(self, content, xpath=None):
+    def calculate_content_hash(self, content, xpath=None, ignore_xpaths=None, ignore_patterns=None):
         """计算内容哈希值
         
         Args:
             content: HTML内容
             xpath: 可选，指定要计算哈希的内容区域XPath
+            ignore_xpaths: 可选，计算时忽略的动态元素XPath
+            ignore_patterns: 可选，计算前从文本中去除的动态片段正则
             
         Returns:
-            str: 内容的MD5哈希值
+            str: 带算法前缀的内容指纹
         """
         try:
-            if xpath:
-                # 如果提供了XPath，只计算特定区域的哈希
-                tree = html.fromstring(content)
-                elements = tree.xpath(xpath)
-                if elements:
-                    # 将所有匹配元素的文本内容连接起来
-                    content_text = ' '.join([elem.text_content().strip() for elem in elements if elem.text_content()])
-                else:
-                    content_text = content
-            else:
-                # 否则计算整个页面的哈希，但去除一些动态内容
-                soup = BeautifulSoup(content, 'lxml')
-                
-                # 移除脚本、样式和注释
-                for script in soup(['script', 'style']):
-                    script.extract()
-                
-                # 获取文本内容
-                content_text = soup.get_text()
-                
-                # 规范化空白字符
-                content_text = re.sub(r'\s+', ' ', content_text).strip()
-            
-            # 计算MD5哈希
-            return hashlib.md5(content_text.encode('utf-8')).hexdigest()
+            return self.fingerprint.fingerprint(content, xpath, ignore_xpaths, ignore_patterns)
+        except Exception as e:
+            self.logger.error(f"计算内容哈希失败: {str(e)}")
+            return None
+    
+    def calculate_tree_hash(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """基于已解析的lxml文档树计算内容哈希值
+        
+        Args:
+            tree: lxml.html解析得到的根元素
+            xpath: 可选，指定要计算哈希的内容区域XPath
+            ignore_xpaths: 可选，计算时忽略的动态元素XPath
+            ignore_patterns: 可选，计算前从文本中去除的动态片段正则
             
+        Returns:
+            str: 带算法前缀的内容指纹
+        """
+        try:
+            return self.fingerprint.fingerprint_tree(tree, xpath, ignore_xpaths, ignore_patterns)
         except Exception as e:
             self.logger.error(f"计算内容哈希失败: {str(e)}")
             return None
     
+    def calculate_tree_signatures(self, tree, xpath=None, ignore_xpaths=None, ignore_patterns=None):
+        """基于已解析的lxml文档树同时计算内容哈希和SimHash签名
+        
+        Returns:
+            tuple: (带算法前缀的内容指纹, 十六进制SimHash签名)，失败时为(None, None)
+        """
+        try:
+            return self.fingerprint.signatures_tree(tree, xpath, ignore_xpaths, ignore_patterns)
+        except Exception as e:
+            self.logger.error(f"计算内容哈希失败: {str(e)}")
+            return None, None
+    
     def compare_dom_structure(self, old_content, new_content, key_elements):
         """比较两个页面的DOM结构是否发生变化
         